@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Full-text airport search over airports.db
+基于airport_fts全文索引（由csv_to_sqlite.py生成）搜索机场：
+- bm25 排序，代码字段权重高于名称，名称高于城市、关键词和国家
+- 与 IATA/ICAO/ident 完全相同的查询排在最前
+- 最后一个词按前缀匹配，适合输入即搜索
+并提供与 LIKE '%q%' 查询（web端 searchAirports 的做法）的延迟对比
+"""
+
+import argparse
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+RESULT_COLUMNS = (
+    "id", "ident", "type", "name", "municipality", "iso_country",
+    "icao_code", "iata_code", "latitude_deg", "longitude_deg",
+)
+
+# bm25 列权重，顺序与airport_fts的列一致：
+# name, municipality, keywords, iata_code, icao_code, ident, country_name
+BM25_WEIGHTS = (10.0, 4.0, 2.0, 20.0, 20.0, 15.0, 1.0)
+
+TYPE_ORDER = """
+    CASE a.type
+        WHEN 'large_airport' THEN 0
+        WHEN 'medium_airport' THEN 1
+        WHEN 'small_airport' THEN 2
+        WHEN 'seaplane_base' THEN 3
+        WHEN 'heliport' THEN 4
+        WHEN 'balloonport' THEN 5
+        ELSE 6
+    END
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# 单个词短于此长度时只匹配代码字段
+MIN_FULL_PREFIX = 3
+CODE_COLUMNS = ("iata_code", "icao_code", "ident")
+
+
+def build_match_query(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    将用户输入转换为FTS5 MATCH表达式
+
+    每个词作为带引号的短语，避免用户输入中的 AND/OR/NEAR 等被当作语法；
+    prefix 为True时最后一个词按前缀匹配。只有一个很短的词时（如输入的前两个字母）
+    只匹配代码字段，避免对几乎全部记录计算bm25。
+
+    Returns:
+        MATCH表达式，输入中没有可搜索的词时返回None
+    """
+    tokens = TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    if prefix:
+        terms[-1] += "*"
+    if len(tokens) == 1 and len(tokens[0]) < MIN_FULL_PREFIX:
+        # 过短的单个前缀几乎匹配所有名称，只在代码字段中搜索
+        return f"{{{' '.join(CODE_COLUMNS)}}} : {terms[0]}"
+    return " ".join(terms)
+
+
+def search_airports(conn: sqlite3.Connection, query: str, limit: int = 20, prefix: bool = True,
+                    types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    全文搜索机场
+
+    Args:
+        conn: airports.db 数据库连接
+        query: 搜索词，如 "pek"、"san fran"、"KJFK"
+        limit: 最多返回的记录数
+        prefix: 最后一个词是否按前缀匹配
+        types: 只返回这些类型的机场，为None时不过滤
+
+    Returns:
+        机场字典列表，按匹配程度排序
+    """
+    match = build_match_query(query, prefix)
+    if match is None:
+        return []
+
+    code = query.strip().upper()
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    params: List[Any] = [code, match]
+    type_filter = ""
+    if types:
+        type_filter = f"AND a.type IN ({', '.join('?' for _ in types)})"
+        params.extend(types)
+    params.append(limit)
+
+    columns = ", ".join(f"a.{c}" for c in RESULT_COLUMNS)
+    cursor = conn.execute(f"""
+        SELECT {columns}
+        FROM (
+            SELECT rowid, bm25(airport_fts, {weights}) AS score
+            FROM airport_fts
+            WHERE airport_fts MATCH ?2
+        ) f
+        JOIN airport a ON a.id = f.rowid
+        WHERE 1 {type_filter}
+        ORDER BY
+            CASE WHEN ?1 IN (a.iata_code, a.icao_code, a.ident) THEN 0 ELSE 1 END,
+            f.score,
+            {TYPE_ORDER}
+        LIMIT ?
+    """, params)
+    return [dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def search_airports_like(conn: sqlite3.Connection, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    与web端 searchAirports 相同的 LIKE '%q%' 查询，用于性能对比
+    """
+    pattern = f"%{query}%"
+    columns = ", ".join(f"a.{c}" for c in RESULT_COLUMNS)
+    cursor = conn.execute(f"""
+        SELECT {columns}
+        FROM airport a
+        LEFT JOIN address addr ON a.address_id = addr.id
+        WHERE a.iata_code LIKE ? OR a.icao_code LIKE ? OR a.name LIKE ?
+           OR a.municipality LIKE ? OR addr.country_name LIKE ?
+        LIMIT ?
+    """, (pattern, pattern, pattern, pattern, pattern, limit))
+    return [dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def sample_queries(conn: sqlite3.Connection, count: int, seed: int = 42) -> List[str]:
+    """
+    从数据库中抽样生成搜索词：代码、名称和城市的逐字前缀，模拟逐键输入
+    """
+    rng = random.Random(seed)
+    rows = conn.execute("""
+        SELECT name, municipality, iata_code, icao_code FROM airport
+        WHERE type IN ('large_airport', 'medium_airport') ORDER BY id
+    """).fetchall() or conn.execute("SELECT name, municipality, iata_code, icao_code FROM airport ORDER BY id").fetchall()
+    queries = []
+    while len(queries) < count:
+        name, municipality, iata, icao = rng.choice(rows)
+        source = rng.choice([name, municipality, iata, icao])
+        if not source:
+            continue
+        for end in range(2, min(len(source), 10) + 1):
+            queries.append(source[:end])
+    return queries[:count]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def benchmark(db_path: str, queries: int = 500, limit: int = 20) -> None:
+    """
+    对比FTS5全文索引与LIKE查询的p50/p99延迟
+    """
+    conn = sqlite3.connect(db_path)
+    terms = sample_queries(conn, queries)
+    print(f"数据库: {db_path}，{len(terms)} 次查询，limit={limit}")
+    results = {}
+    for label, func in (("FTS5", search_airports), ("LIKE", search_airports_like)):
+        elapsed = []
+        for term in terms:
+            start = time.perf_counter()
+            func(conn, term, limit=limit)
+            elapsed.append((time.perf_counter() - start) * 1000)
+        results[label] = elapsed
+        print(f"{label:<6} p50: {percentile(elapsed, 50):8.3f} ms  p99: {percentile(elapsed, 99):8.3f} ms  "
+              f"平均: {statistics.mean(elapsed):8.3f} ms")
+    p50_speedup = percentile(results["LIKE"], 50) / percentile(results["FTS5"], 50)
+    p99_speedup = percentile(results["LIKE"], 99) / percentile(results["FTS5"], 99)
+    print(f"加速比 p50: {p50_speedup:.1f}x  p99: {p99_speedup:.1f}x")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文搜索机场")
+    parser.add_argument("db", help="airports.db 路径")
+    parser.add_argument("query", nargs="?", default="", help="搜索词")
+    parser.add_argument("--limit", type=int, default=20, help="最多返回的记录数")
+    parser.add_argument("--types", type=str, default="", help="机场类型，逗号分隔")
+    parser.add_argument("--benchmark", action="store_true", help="对比FTS5与LIKE查询的延迟")
+    parser.add_argument("--queries", type=int, default=500, help="基准测试的查询次数")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.db, args.queries, args.limit)
+        return
+    if not args.query:
+        parser.error("需要提供搜索词")
+
+    conn = sqlite3.connect(args.db)
+    types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+    rows = search_airports(conn, args.query, limit=args.limit, types=types)
+    for row in rows:
+        codes = "/".join(c for c in (row["iata_code"], row["icao_code"] or row["ident"]) if c)
+        print(f"{codes:<12} {row['type'] or '':<15} {row['name']} ({row['municipality'] or ''}, {row['iso_country'] or ''})")
+    print(f"共 {len(rows)} 个机场")
+    conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.OperationalError as e:
+        print(f"错误: 查询失败: {e}", file=sys.stderr)
+        print("请先使用 csv_to_sqlite.py 重新生成 airports.db 以创建 airport_fts 全文索引", file=sys.stderr)
+        sys.exit(1)
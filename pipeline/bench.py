@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark harness for the airport pipeline
+用确定性生成的合成数据对 pipeline 的各阶段计时：
+- generate: 按随机种子生成 OurAirports 格式的 airports.csv（1x 约 8.3 万行，可放大到 10x、100x），
+  类型和国家分布取自真实数据，包含 ICAO/IATA 代码冲突、重复的 ident 和各种格式错误的行，
+  并生成引用这些机场代码的 destinations.json
+- run: 每个阶段在独立子进程中运行，记录耗时、CPU时间和峰值RSS，结果写成JSON
+- compare: 对比两次结果，任一阶段的耗时或峰值RSS超过基线的 (1 + threshold) 倍时以状态码1退出
+
+示例:
+    python bench.py run --scale 1 --output bench-new.json --baseline bench-old.json --threshold 0.1
+    python bench.py compare bench-old.json bench-new.json
+    python bench.py generate --scale 10 --workdir bench-data
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from iso_mappings import country_codes, region_codes
+from json_stream import write_json_array
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 1x 规模与真实 airports.csv 的行数相同；destinations.json 的出发机场数按同样比例放大
+BASE_ROWS = 83248
+BASE_DEPARTURES = 4000
+
+CSV_FIELDS = (
+    "id", "ident", "type", "name", "latitude_deg", "longitude_deg", "elevation_ft",
+    "continent", "iso_country", "iso_region", "municipality", "scheduled_service",
+    "icao_code", "iata_code", "gps_code", "local_code", "home_link", "wikipedia_link", "keywords",
+)
+
+# 类型和前10个国家的机场数取自 DATABASE_SCHEMA.md 中的真实数据统计，其余机场均分给其他国家
+TYPE_WEIGHTS = {
+    "small_airport": 42249,
+    "heliport": 21914,
+    "closed": 12623,
+    "medium_airport": 4687,
+    "seaplane_base": 1232,
+    "large_airport": 485,
+    "balloonport": 57,
+}
+TOP_COUNTRIES = {
+    "US": 32123, "BR": 7555, "JP": 3744, "CA": 3288, "AU": 2754,
+    "MX": 2685, "RU": 1738, "FR": 1718, "GB": 1571, "KR": 1408,
+}
+CONTINENTS = ("AF", "AN", "AS", "EU", "NA", "OC", "SA")
+ICAO_PREFIXES = {
+    "US": "K", "CA": "C", "BR": "S", "JP": "RJ", "KR": "RK",
+    "AU": "Y", "MX": "MM", "RU": "U", "FR": "LF", "GB": "EG",
+}
+
+NAME_SUFFIXES = {
+    "small_airport": ("Airport", "Airfield", "Airstrip", "Field", "Ranch Airport"),
+    "heliport": ("Heliport", "Hospital Heliport", "Helipad"),
+    "closed": ("Airport", "Airfield", "Army Airfield"),
+    "medium_airport": ("Airport", "Regional Airport", "Municipal Airport"),
+    "seaplane_base": ("Seaplane Base", "Harbor Seaplane Base"),
+    "large_airport": ("International Airport", "Airport"),
+    "balloonport": ("Balloonport",),
+}
+SYLLABLES = (
+    "ba", "ko", "ri", "san", "ta", "lu", "mi", "do", "ve", "chen",
+    "gu", "po", "ner", "al", "is", "ton", "ville", "berg", "ma", "sel",
+)
+# 带变音符号的名称，检验全文索引的 remove_diacritics 分词
+DIACRITIC_WORDS = ("Zürich", "São", "Québec", "Malmö", "Kraków", "Český", "Île", "Åre")
+
+# 各类格式错误的行所占比例（按顺序累加）
+MALFORMED_RATES = (
+    ("latitude_text", 0.002),    # 纬度不是数字
+    ("out_of_range", 0.001),     # 经纬度超出范围
+    ("missing_coords", 0.003),   # 缺少经纬度
+    ("missing_ident", 0.0005),   # 缺少ident
+    ("elevation_text", 0.002),   # 海拔不是数字
+)
+DUPLICATE_IDENT_RATE = 0.001
+REUSED_ICAO_RATE = 0.005
+REUSED_IATA_RATE = 0.02
+
+STAGES = ("csv_to_sqlite", "csv_to_sqlite_incremental", "csv_to_geojson", "enrich_destinations")
+# 依赖 airports.db 的阶段，单独运行时先（不计时地）生成数据库
+NEEDS_DB = ("csv_to_sqlite_incremental", "enrich_destinations")
+
+RESULT_VERSION = 1
+
+
+def word(n: int) -> str:
+    """由整数确定地生成一个地名"""
+    parts = []
+    n += len(SYLLABLES)
+    while n:
+        n, digit = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return "".join(parts).capitalize()
+
+
+def country_table() -> Tuple[List[str], List[int]]:
+    """国家代码及其累计权重"""
+    others = [code for code in country_codes() if code not in TOP_COUNTRIES]
+    rest = max(1, (BASE_ROWS - sum(TOP_COUNTRIES.values())) // len(others))
+    weights = dict(TOP_COUNTRIES, **{code: rest for code in others})
+    return list(weights), list(accumulate(weights.values()))
+
+
+def regions_by_country() -> Dict[str, List[str]]:
+    """国家代码 -> 该国的 ISO 3166-2 地区代码"""
+    regions: Dict[str, List[str]] = {}
+    for code in region_codes():
+        regions.setdefault(code.split("-", 1)[0], []).append(code)
+    return regions
+
+
+def random_letters(rng: random.Random, count: int) -> str:
+    return "".join(chr(65 + rng.randrange(26)) for _ in range(count))
+
+
+class AirportGenerator:
+    """
+    逐行生成合成机场记录，同一 (scale, seed) 生成的文件逐字节相同
+
+    有定期航班的机场（大型和部分中型）的 (icao, iata, name, municipality) 收集在 scheduled 中，
+    供 generate_destinations 引用。
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.countries, self.country_weights = country_table()
+        self.regions = regions_by_country()
+        self.types = list(TYPE_WEIGHTS)
+        self.type_weights = list(accumulate(TYPE_WEIGHTS.values()))
+        self.centers: Dict[str, Tuple[float, float]] = {}
+        self.icao_seen: set = set()
+        self.recent_idents: List[str] = []
+        self.recent_icao: List[str] = []
+        self.recent_iata: List[str] = []
+        self.scheduled: List[Tuple[str, str, str, str]] = []
+
+    def center(self, region: str) -> Tuple[float, float]:
+        """地区的中心坐标，机场围绕它分布"""
+        if region not in self.centers:
+            rng = random.Random(f"{self.seed}:{region}")
+            self.centers[region] = (rng.uniform(-55, 70), rng.uniform(-180, 180))
+        return self.centers[region]
+
+    def remember(self, items: List[str], value: str) -> None:
+        """保留最近的一些代码，用于制造冲突"""
+        if len(items) < 1000:
+            items.append(value)
+        else:
+            items[self.rng.randrange(1000)] = value
+
+    def codes(self, airport_type: str, country: str, index: int) -> Tuple[str, str, str, str, str]:
+        """返回 (ident, icao_code, iata_code, gps_code, local_code)"""
+        rng = self.rng
+        icao = iata = local = ""
+        major = airport_type in ("large_airport", "medium_airport")
+        if major or rng.random() < 0.03:
+            if self.recent_icao and rng.random() < REUSED_ICAO_RATE:
+                icao = rng.choice(self.recent_icao)
+            else:
+                prefix = ICAO_PREFIXES.get(country, random_letters(rng, 1))
+                icao = prefix + random_letters(rng, 4 - len(prefix))
+                self.remember(self.recent_icao, icao)
+        if (major and rng.random() < 0.9) or rng.random() < 0.03:
+            if self.recent_iata and rng.random() < REUSED_IATA_RATE:
+                iata = rng.choice(self.recent_iata)
+            else:
+                iata = random_letters(rng, 3)
+                self.remember(self.recent_iata, iata)
+        if country == "US" and not icao:
+            local = f"{rng.randrange(100):02d}{random_letters(rng, 2)}"
+
+        if icao and icao not in self.icao_seen:
+            ident = icao
+            self.icao_seen.add(icao)
+        elif self.recent_idents and rng.random() < DUPLICATE_IDENT_RATE:
+            # 与之前的某一行ident相同，导入时以后出现的一行为准
+            ident = rng.choice(self.recent_idents)
+        else:
+            ident = f"{country}-{index:07d}"
+        self.remember(self.recent_idents, ident)
+        return ident, icao, iata, icao or local or ident, local
+
+    def row(self, index: int) -> list:
+        rng = self.rng
+        airport_type = rng.choices(self.types, cum_weights=self.type_weights)[0]
+        country = rng.choices(self.countries, cum_weights=self.country_weights)[0]
+        regions = self.regions.get(country)
+        region = rng.choice(regions) if regions else f"{country}-U-A"
+        # 同一地区内城市名的分布有长尾，多个机场共用同一地址
+        municipality = "" if rng.random() < 0.1 else word(int(rng.expovariate(1 / 150)))
+
+        center_lat, center_lon = self.center(region)
+        latitude = round(max(-89.9, min(89.9, rng.gauss(center_lat, 2.0))), 6)
+        longitude = round((rng.gauss(center_lon, 2.0) + 180) % 360 - 180, 6)
+        elevation: Any = "" if rng.random() < 0.05 else int(abs(rng.gauss(800, 1500)))
+
+        name = f"{word(rng.randrange(5000))} {rng.choice(NAME_SUFFIXES[airport_type])}"
+        if rng.random() < 0.05:
+            name = f"{rng.choice(DIACRITIC_WORDS)} {name}"
+        ident, icao, iata, gps, local = self.codes(airport_type, country, index)
+        scheduled = airport_type == "large_airport" or (airport_type == "medium_airport" and rng.random() < 0.7)
+        if scheduled and (icao or iata):
+            self.scheduled.append((icao, iata, name, municipality))
+
+        keywords = ""
+        draw = rng.random()
+        if draw < 0.003:
+            keywords = f'Old "{word(index)}" field,\nformerly {word(index + 1)}'
+        elif draw < 0.2:
+            keywords = f"{word(rng.randrange(5000))}, {iata or ident}"
+        home_link = f"https://www.{word(index).lower()}.example/" if rng.random() < 0.1 else ""
+        wikipedia = ""
+        if scheduled and rng.random() < 0.5:
+            wikipedia = "https://en.wikipedia.org/wiki/" + name.replace(" ", "_")
+
+        draw = rng.random()
+        for kind, rate in MALFORMED_RATES:
+            if draw < rate:
+                break
+            draw -= rate
+        else:
+            kind = None
+        if kind == "latitude_text":
+            latitude = "N/A"
+        elif kind == "out_of_range":
+            latitude, longitude = 91.5, 200.25
+        elif kind == "missing_coords":
+            latitude = longitude = ""
+        elif kind == "missing_ident":
+            ident = ""
+        elif kind == "elevation_text":
+            elevation = f"{rng.randrange(1, 9)},{rng.randrange(1000):03d}"
+
+        return [
+            index, ident, airport_type, name, latitude, longitude, elevation,
+            CONTINENTS[sum(map(ord, country)) % len(CONTINENTS)], country, region, municipality,
+            "yes" if scheduled else "no", icao, iata, gps, local, home_link, wikipedia, keywords,
+        ]
+
+
+def scale_rows(scale: float) -> int:
+    return max(1, round(BASE_ROWS * scale))
+
+
+def generate_airports(path: str, scale: float, seed: int) -> List[Tuple[str, str, str, str]]:
+    """
+    生成合成的 airports.csv
+
+    Returns:
+        有定期航班的机场 (icao, iata, name, municipality)
+    """
+    generator = AirportGenerator(seed)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(CSV_FIELDS)
+        for index in range(1, scale_rows(scale) + 1):
+            writer.writerow(generator.row(index))
+    os.replace(tmp_path, path)
+    return generator.scheduled
+
+
+def destination_airport(rng: random.Random, pool: List[Tuple[str, str, str, str]]) -> Dict[str, str]:
+    """目的地机场条目：大多引用已有代码，也有只给一种代码、小写代码和不存在的代码"""
+    icao, iata, name, _ = pool[rng.randrange(len(pool))]
+    draw = rng.random()
+    if draw < 0.03:
+        icao, iata, name = f"X{rng.randrange(1000):03d}", f"9{random_letters(rng, 2)}", "Nowhere"
+    elif draw < 0.06:
+        icao = ""
+    elif draw < 0.08:
+        iata = ""
+    elif draw < 0.12:
+        icao, iata = icao.lower(), iata.lower()
+    return {"name": name, "iata": iata, "icao": icao}
+
+
+def generate_destinations(path: str, pool: List[Tuple[str, str, str, str]], scale: float, seed: int) -> int:
+    """
+    生成与合成机场对应的 destinations.json（与 get_destinations.py 的输出格式相同）
+
+    Returns:
+        出发机场数
+    """
+    if not pool:
+        pool = [("XXXX", "XXX", "Nowhere", "")]
+    rng = random.Random(seed + 1)
+    count = min(len(pool), max(1, round(BASE_DEPARTURES * scale)))
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for index in rng.sample(range(len(pool)), count):
+            icao, iata, name, municipality = pool[index]
+            flights = []
+            # 航线数呈长尾分布，少数枢纽机场有上百个目的地城市
+            for city in range(min(int(rng.paretovariate(1.1) * 4), 200)):
+                airports = [destination_airport(rng, pool) for _ in range(1 if rng.random() < 0.8 else 2)]
+                flights.append({"city": word(rng.randrange(5000)), "airports": airports})
+            yield {
+                "departure_airport": {"name": name, "iata": iata, "icao": icao},
+                "direct_flights": flights,
+            }
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        written = write_json_array(f, records())
+    os.replace(tmp_path, path)
+    return written
+
+
+def input_paths(workdir: str, scale: float, seed: int) -> Tuple[str, str]:
+    stem = f"{scale:g}x-s{seed}"
+    return os.path.join(workdir, f"airports-{stem}.csv"), os.path.join(workdir, f"destinations-{stem}.json")
+
+
+def ensure_inputs(workdir: str, scale: float, seed: int) -> Tuple[str, str, Optional[float]]:
+    """
+    生成（或复用已生成的）输入文件
+
+    Returns:
+        (airports.csv 路径, destinations.json 路径, 生成耗时秒数，复用时为None)
+    """
+    csv_path, json_path = input_paths(workdir, scale, seed)
+    if os.path.exists(csv_path) and os.path.exists(json_path):
+        print(f"复用已生成的输入: {csv_path}")
+        return csv_path, json_path, None
+
+    print(f"正在生成 {scale:g}x 规模的输入（{scale_rows(scale)} 行，种子 {seed}）...")
+    start = time.perf_counter()
+    pool = generate_airports(csv_path, scale, seed)
+    departures = generate_destinations(json_path, pool, scale, seed)
+    elapsed = time.perf_counter() - start
+    print(f"已生成 {csv_path}（{os.path.getsize(csv_path) / 1024 / 1024:.1f} MB）和 "
+          f"{json_path}（{departures} 个出发机场），耗时 {elapsed:.1f} 秒")
+    return csv_path, json_path, elapsed
+
+
+def run_command(argv: List[str], log_path: str) -> Dict[str, Any]:
+    """
+    在子进程中运行命令，用 wait4 取得该进程自己的资源占用
+
+    Returns:
+        {"seconds", "cpu_seconds", "peak_rss_mb", "returncode"}
+    """
+    with open(log_path, "w", encoding="utf-8") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, cwd=PIPELINE_DIR, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss 在 Linux 上以KB为单位，在 macOS 上以字节为单位
+    rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {
+        "seconds": elapsed,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": rss_bytes / 1024 / 1024,
+        "returncode": proc.returncode,
+    }
+
+
+def stage_command(stage: str, csv_path: str, json_path: str, workdir: str) -> List[str]:
+    """各阶段的命令行；运行前由 prepare_stage 准备好输入"""
+    db_path = os.path.join(workdir, "airports.db")
+    if stage == "csv_to_sqlite":
+        return [sys.executable, "csv_to_sqlite.py", csv_path, db_path]
+    if stage == "csv_to_sqlite_incremental":
+        return [sys.executable, "csv_to_sqlite.py", csv_path, db_path, "--incremental"]
+    if stage == "csv_to_geojson":
+        return [sys.executable, "csv_to_geojson.py", csv_path, os.path.join(workdir, "airports.geojson")]
+    if stage == "enrich_destinations":
+        return [sys.executable, "enrich_destinations.py", "--db", db_path,
+                "--json", os.path.join(workdir, "destinations.json"),
+                "--backup", os.path.join(workdir, "destinations.backup.json")]
+    raise ValueError(f"未知的阶段: {stage}")
+
+
+def prepare_stage(stage: str, json_path: str, workdir: str) -> None:
+    """每次运行前恢复阶段的输入，使重复运行的条件相同"""
+    if stage == "csv_to_sqlite":
+        db_path = os.path.join(workdir, "airports.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+    elif stage == "enrich_destinations":
+        shutil.copyfile(json_path, os.path.join(workdir, "destinations.json"))
+
+
+def run_stages(stages: List[str], csv_path: str, json_path: str, workdir: str, repeat: int) -> Dict[str, Any]:
+    """
+    依次运行各阶段，每个阶段重复 repeat 次，取最短耗时和最大峰值RSS
+
+    Returns:
+        阶段名 -> 结果，失败的阶段含 "error"
+    """
+    results: Dict[str, Any] = {}
+    if any(stage in NEEDS_DB for stage in stages) and "csv_to_sqlite" not in stages:
+        print("正在准备 airports.db（不计时）...")
+        prepare_stage("csv_to_sqlite", json_path, workdir)
+        setup = run_command(stage_command("csv_to_sqlite", csv_path, json_path, workdir),
+                            os.path.join(workdir, "setup.log"))
+        if setup["returncode"] != 0:
+            raise RuntimeError(f"生成 airports.db 失败，见 {os.path.join(workdir, 'setup.log')}")
+
+    for stage in stages:
+        argv = stage_command(stage, csv_path, json_path, workdir)
+        log_path = os.path.join(workdir, f"{stage}.log")
+        runs = []
+        for attempt in range(repeat):
+            prepare_stage(stage, json_path, workdir)
+            run = run_command(argv, log_path)
+            if run["returncode"] != 0:
+                results[stage] = {"error": f"退出码 {run['returncode']}，日志: {log_path}"}
+                print(f"  {stage}: 失败（退出码 {run['returncode']}），日志: {log_path}")
+                break
+            runs.append(run)
+        else:
+            results[stage] = {
+                "seconds": min(run["seconds"] for run in runs),
+                "cpu_seconds": min(run["cpu_seconds"] for run in runs),
+                "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+                "runs": [round(run["seconds"], 4) for run in runs],
+            }
+            result = results[stage]
+            print(f"  {stage}: {result['seconds']:.2f} 秒（CPU {result['cpu_seconds']:.2f} 秒），"
+                  f"峰值RSS {result['peak_rss_mb']:.1f} MB")
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """当前代码的git提交，不在git仓库中时返回None"""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PIPELINE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PIPELINE_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output + ("-dirty" if dirty else "")
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    输出两次结果的对比表
+
+    Returns:
+        超过阈值的退化描述，没有退化时为空列表
+    """
+    for key in ("scale", "seed", "rows"):
+        if baseline.get(key) != current.get(key):
+            print(f"警告: 两次结果的 {key} 不同（{baseline.get(key)} / {current.get(key)}），对比可能没有意义")
+
+    regressions = []
+    # 中文标题每个字占两列宽，填充宽度相应减小
+    print(f"{'阶段':<26}{'基线(秒)':>8}{'本次(秒)':>8}{'变化':>7}{'基线RSS':>8}{'本次RSS':>8}{'变化':>7}")
+    for stage, now in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None or "error" in before or "error" in now:
+            status = now.get("error") or (before or {}).get("error") or "基线中没有该阶段"
+            print(f"{stage:<28}{status}")
+            continue
+        changes = []
+        for metric, unit in (("seconds", "秒"), ("peak_rss_mb", "MB")):
+            change = now[metric] / before[metric] - 1 if before[metric] else 0.0
+            changes.append(change)
+            if change > threshold:
+                regressions.append(f"{stage} 的 {metric} 从 {before[metric]:.2f} {unit} 增加到 "
+                                   f"{now[metric]:.2f} {unit}（{change:+.1%}，阈值 {threshold:.0%}）")
+        print(f"{stage:<28}{before['seconds']:>10.2f}{now['seconds']:>10.2f}{changes[0]:>+9.1%}"
+              f"{before['peak_rss_mb']:>10.1f}{now['peak_rss_mb']:>10.1f}{changes[1]:>+9.1%}")
+    return regressions
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULT_VERSION or "stages" not in results:
+        raise ValueError(f"{path} 不是基准测试结果文件")
+    return results
+
+
+def report_regressions(regressions: List[str]) -> None:
+    if regressions:
+        print(f"\n❌ {len(regressions)} 项超过阈值:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\n✅ 没有超过阈值的退化")
+
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    os.makedirs(args.workdir, exist_ok=True)
+    ensure_inputs(args.workdir, args.scale, args.seed)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"错误: 未知的阶段 {', '.join(unknown)}，可选: {', '.join(STAGES)}")
+        sys.exit(1)
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"错误: 读取基线失败: {e}")
+            sys.exit(1)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="airport-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        csv_path, json_path, generate_seconds = ensure_inputs(workdir, args.scale, args.seed)
+        print(f"运行阶段（每个 {args.repeat} 次，取最短耗时）:")
+        stage_results = run_stages(stages, csv_path, json_path, workdir, args.repeat)
+        input_sizes = (os.path.getsize(csv_path), os.path.getsize(json_path))
+    except (OSError, RuntimeError) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "version": RESULT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "rows": scale_rows(args.scale),
+        "repeat": args.repeat,
+        "inputs": {
+            "airports_csv_bytes": input_sizes[0],
+            "destinations_json_bytes": input_sizes[1],
+            "generate_seconds": generate_seconds,
+        },
+        "stages": stage_results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    failed = [stage for stage, result in stage_results.items() if "error" in result]
+    if baseline is not None:
+        print()
+        regressions = compare_results(baseline, results, args.threshold)
+        report_regressions(regressions + [f"{stage} 运行失败" for stage in failed])
+    elif failed:
+        sys.exit(1)
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    try:
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    except (OSError, ValueError) as e:
+        print(f"错误: 读取结果失败: {e}")
+        sys.exit(1)
+    report_regressions(compare_results(baseline, current, args.threshold))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pipeline 基准测试: 生成合成数据、计时各阶段、对比结果")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("generate", help="生成合成的 airports.csv 和 destinations.json")
+    p.add_argument("--workdir", required=True, help="输出目录")
+    p.add_argument("--scale", type=float, default=1.0, help=f"数据规模，1 对应 {BASE_ROWS} 行（默认: 1）")
+    p.add_argument("--seed", type=int, default=0, help="随机种子（默认: 0）")
+
+    p = sub.add_parser("run", help="生成数据并运行各阶段，结果写成JSON")
+    p.add_argument("--scale", type=float, default=1.0, help=f"数据规模，1 对应 {BASE_ROWS} 行（默认: 1）")
+    p.add_argument("--seed", type=int, default=0, help="随机种子（默认: 0）")
+    p.add_argument("--stages", type=str, default="", help=f"要运行的阶段，逗号分隔（默认全部: {','.join(STAGES)}）")
+    p.add_argument("--repeat", type=int, default=3, help="每个阶段的运行次数，取最短耗时（默认: 3）")
+    p.add_argument("--workdir", type=str, default="", help="工作目录，指定时保留并复用已生成的输入（默认使用临时目录）")
+    p.add_argument("--keep", action="store_true", help="保留临时工作目录")
+    p.add_argument("--output", type=str, default="bench-results.json", help="结果JSON路径")
+    p.add_argument("--baseline", type=str, default="", help="与之对比的基线结果JSON")
+    p.add_argument("--threshold", type=float, default=0.1, help="允许的退化比例（默认: 0.1，即10%%）")
+
+    p = sub.add_parser("compare", help="对比两次结果")
+    p.add_argument("baseline", help="基线结果JSON")
+    p.add_argument("current", help="本次结果JSON")
+    p.add_argument("--threshold", type=float, default=0.1, help="允许的退化比例（默认: 0.1，即10%%）")
+
+    args = parser.parse_args()
+    if args.command == "run" and args.repeat < 1:
+        parser.error("--repeat 至少为1")
+    {"generate": cmd_generate, "run": cmd_run, "compare": cmd_compare}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consistency check for trigger-maintained statistics
+把airports.db中由触发器维护的country_stats/region_stats与从airport表全量重算的结果逐列比较，
+不一致时输出差异并以状态码1退出，--rebuild 用全量重算的结果覆盖统计表并重建触发器
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from csv_to_sqlite import build_stats, check_stats, has_stats_triggers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="检查触发器维护的国家和地区统计是否与全量重算一致",
+        epilog="示例: python check_stats.py airports.db",
+    )
+    parser.add_argument("db", help="airports.db 路径")
+    parser.add_argument("--rebuild", action="store_true", help="发现不一致时全量重算统计表并重建触发器")
+    parser.add_argument("--limit", type=int, default=20, help="最多输出的差异条数")
+    args = parser.parse_args()
+
+    try:
+        conn = sqlite3.connect(args.db)
+        cursor = conn.cursor()
+        if not has_stats_triggers(cursor):
+            print("警告: 数据库中没有统计触发器，统计表不会随airport表同步")
+
+        start = time.perf_counter()
+        problems = check_stats(cursor)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not problems:
+            print(f"country_stats 和 region_stats 与全量重算一致，检查耗时 {elapsed:.0f} ms")
+            return
+
+        print(f"发现 {len(problems)} 处不一致（检查耗时 {elapsed:.0f} ms）:")
+        for problem in problems[:args.limit]:
+            print(f"  {problem}")
+        if len(problems) > args.limit:
+            print(f"  ... 另有 {len(problems) - args.limit} 处")
+
+        if args.rebuild:
+            build_stats(cursor)
+            conn.commit()
+            print("已全量重算统计表并重建触发器")
+        else:
+            sys.exit(1)
+    except sqlite3.Error as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
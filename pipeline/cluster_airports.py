@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precomputed per-zoom airport clustering
+仿照supercluster预先计算各zoom的机场聚合点：
+- 从最大zoom向下逐级合并，每一级用网格索引查找聚合半径内的邻居，
+  每级 O(n)，不做两两比较
+- 每个聚合点记录包含的机场数、代表机场（优先大型、其次中型机场）和各类型数量
+- 每个节点（单个机场或聚合点）只输出一次，用 "tippecanoe": {"minzoom", "maxzoom"}
+  标明它在哪些zoom可见，输出为GeoJSONSeq，可直接交给 tile_builder.py 或 tippecanoe
+
+示例:
+    python cluster_airports.py airports.csv clusters.geojsonl
+    python tile_builder.py airports.csv clusters.geojsonl -o airports.pmtiles
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from csv_to_geojson import iter_features
+from tile_builder import TYPE_PRIORITY, project, read_geojson_features
+
+CLUSTER_LAYER = "clusters"
+
+# 与supercluster默认值相同：半径40像素，瓦片512像素
+DEFAULT_RADIUS = 40
+DEFAULT_EXTENT = 512
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 14
+# 从未被合并的单个机场在最大聚合zoom以上一直可见
+UNBOUNDED_ZOOM = 32
+
+
+class ClusterNode:
+    """聚合层级中的一个节点：单个机场，或若干节点合并成的聚合点"""
+
+    __slots__ = ("x", "y", "count", "type_counts", "representative", "max_zoom", "min_zoom", "node_id")
+
+    def __init__(self, x: float, y: float, count: int, type_counts: Dict[str, int],
+                 representative: Tuple[Tuple[int, int], Dict[str, Any]], max_zoom: int, node_id: int):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.type_counts = type_counts
+        # ((类型优先级, 输入顺序), 机场属性)
+        self.representative = representative
+        # 节点在 [min_zoom, max_zoom] 内可见，min_zoom 在被合并时确定
+        self.max_zoom = max_zoom
+        self.min_zoom = DEFAULT_MIN_ZOOM
+        self.node_id = node_id
+
+
+def unproject(x: float, y: float) -> Tuple[float, float]:
+    """Web Mercator世界坐标转回经纬度"""
+    longitude = x * 360.0 - 180.0
+    latitude = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return longitude, latitude
+
+
+def load_points(paths: Sequence[str], types: Optional[Sequence[str]]) -> List[Tuple[float, float, str, Dict[str, Any]]]:
+    """读取输入中的机场点，返回 (世界坐标x, 世界坐标y, 类型, 属性)"""
+    points = []
+    for path in paths:
+        source = iter_features(path) if path.lower().endswith(".csv") else read_geojson_features(path)
+        for feature in source:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            properties = feature.get("properties") or {}
+            airport_type = properties.get("type") or "unknown"
+            if types and airport_type not in types:
+                continue
+            longitude, latitude = geometry["coordinates"][:2]
+            x, y = project(longitude, latitude)
+            points.append((x, y, airport_type, properties))
+    return points
+
+
+def cluster_level(nodes: List[ClusterNode], zoom: int, radius: float, extent: int, min_points: int,
+                  next_id: int) -> Tuple[List[ClusterNode], int]:
+    """
+    在一个zoom上合并节点
+
+    以聚合半径为网格边长建立网格索引，每个节点只与相邻3x3格中的节点比较。
+    按输入顺序遍历，未被合并的节点以自身为中心吸收半径内的未处理邻居。
+
+    Returns:
+        (该zoom的节点列表, 下一个可用的节点ID)
+    """
+    r = radius / (extent * (1 << zoom))
+    r2 = r * r
+    grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for index, node in enumerate(nodes):
+        grid[(int(node.x / r), int(node.y / r))].append(index)
+
+    processed = [False] * len(nodes)
+    result = []
+    for index, node in enumerate(nodes):
+        if processed[index]:
+            continue
+        processed[index] = True
+        cx = int(node.x / r)
+        cy = int(node.y / r)
+        neighbors = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for other in grid.get((gx, gy), ()):
+                    if processed[other]:
+                        continue
+                    dx = nodes[other].x - node.x
+                    dy = nodes[other].y - node.y
+                    if dx * dx + dy * dy <= r2:
+                        neighbors.append(other)
+
+        count = node.count + sum(nodes[other].count for other in neighbors)
+        if not neighbors or count < min_points:
+            # 没有可合并的邻居，节点原样保留到更低的zoom
+            result.append(node)
+            continue
+
+        members = [node] + [nodes[other] for other in neighbors]
+        for other in neighbors:
+            processed[other] = True
+        type_counts: Dict[str, int] = defaultdict(int)
+        wx = wy = 0.0
+        for member in members:
+            member.min_zoom = zoom + 1
+            wx += member.x * member.count
+            wy += member.y * member.count
+            for airport_type, type_count in member.type_counts.items():
+                type_counts[airport_type] += type_count
+        representative = min((member.representative for member in members), key=lambda item: item[0])
+        result.append(ClusterNode(wx / count, wy / count, count, dict(type_counts), representative, zoom, next_id))
+        next_id += 1
+    return result, next_id
+
+
+def build_hierarchy(points: List[Tuple[float, float, str, Dict[str, Any]]], min_zoom: int = DEFAULT_MIN_ZOOM,
+                    max_zoom: int = DEFAULT_MAX_ZOOM, radius: float = DEFAULT_RADIUS, extent: int = DEFAULT_EXTENT,
+                    min_points: int = 2) -> List[ClusterNode]:
+    """
+    生成聚合层级
+
+    Returns:
+        所有节点（原始机场和各级聚合点），每个节点带有可见的zoom范围
+    """
+    nodes = []
+    for order, (x, y, airport_type, properties) in enumerate(points):
+        priority = (TYPE_PRIORITY.get(airport_type, len(TYPE_PRIORITY)), order)
+        nodes.append(ClusterNode(x, y, 1, {airport_type: 1}, (priority, properties), UNBOUNDED_ZOOM, order))
+
+    all_nodes = list(nodes)
+    next_id = len(nodes)
+    level = nodes
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        level, next_id = cluster_level(level, zoom, radius, extent, min_points, next_id)
+        all_nodes.extend(node for node in level if node.node_id >= len(points) and node.max_zoom == zoom)
+        print(f"zoom {zoom}: {len(level)} 个节点")
+    for node in level:
+        node.min_zoom = min_zoom
+    return all_nodes
+
+
+def node_to_feature(node: ClusterNode) -> Dict[str, Any]:
+    """将节点转换为带tippecanoe显示级别的GeoJSON Feature"""
+    longitude, latitude = unproject(node.x, node.y)
+    representative = node.representative[1]
+    properties: Dict[str, Any] = {
+        "cluster": node.count > 1,
+        "point_count": node.count,
+        "ident": representative.get("ident"),
+        "name": representative.get("name"),
+        "type": representative.get("type"),
+        "iata_code": representative.get("iata_code"),
+    }
+    for airport_type, type_count in sorted(node.type_counts.items()):
+        properties[f"{airport_type}_count"] = type_count
+    return {
+        "type": "Feature",
+        "tippecanoe": {"minzoom": node.min_zoom, "maxzoom": node.max_zoom, "layer": CLUSTER_LAYER},
+        "geometry": {"type": "Point", "coordinates": [round(longitude, 6), round(latitude, 6)]},
+        "properties": properties,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预计算各zoom的机场聚合点")
+    parser.add_argument("inputs", nargs="+", help="输入文件（CSV、GeoJSON或GeoJSONSeq），最后一个参数为输出GeoJSONSeq文件")
+    parser.add_argument("--minzoom", type=int, default=DEFAULT_MIN_ZOOM, help="最小缩放级别（默认: 0）")
+    parser.add_argument("--maxzoom", type=int, default=DEFAULT_MAX_ZOOM, help="最大缩放级别（默认: 14）")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS, help="聚合半径，像素（默认: 40）")
+    parser.add_argument("--extent", type=int, default=DEFAULT_EXTENT, help="瓦片像素大小（默认: 512）")
+    parser.add_argument("--min-points", type=int, default=2, help="形成聚合点的最少机场数（默认: 2）")
+    parser.add_argument("--types", type=str, default="", help="只聚合这些类型的机场，逗号分隔")
+    args = parser.parse_args()
+    if len(args.inputs) < 2:
+        parser.error("需要提供输入文件和输出文件")
+
+    *inputs, output_path = args.inputs
+    types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+    start = time.perf_counter()
+    try:
+        points = load_points(inputs, types)
+    except FileNotFoundError as e:
+        print(f"错误: 找不到文件 {e.filename}")
+        sys.exit(1)
+    print(f"已读取 {len(points)} 个机场")
+
+    nodes = build_hierarchy(points, args.minzoom, args.maxzoom, args.radius, args.extent, args.min_points)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for node in nodes:
+            f.write("\x1e" + json.dumps(node_to_feature(node), ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    per_zoom = [0] * (args.maxzoom + 1)
+    for node in nodes:
+        for zoom in range(node.min_zoom, min(node.max_zoom, args.maxzoom) + 1):
+            per_zoom[zoom] += 1
+    print(f"\n聚合完成！输出文件: {output_path}，共 {len(nodes)} 个要素")
+    print("各zoom可见要素数: " + ", ".join(f"z{z}={count}" for z, count in enumerate(per_zoom) if z >= args.minzoom))
+    print(f"耗时: {time.perf_counter() - start:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Airport code to coordinates resolver
+一次扫描 airports.db 的 airport 表，建立 ICAO/IATA/GPS/ident 代码到（纬度, 经度, 机场ID）的映射，
+之后每次解析都是字典查找，不再对每个目的地发起 UPPER(icao_code) = ? 这样无法使用索引的查询。
+
+代码冲突时的优先级：
+- 同一代码字段中多个机场使用同一代码时，按类型（大型 > 中型 > 小型 > 水上 > 直升机 > 气球 > 其他/关闭）、
+  再按机场ID选择，这些代码记录在 ambiguous 中
+- resolve(icao, iata) 先按ICAO依次查 icao_code、gps_code、ident，找不到再按IATA查 iata_code
+- 没有经纬度的机场不参与映射
+
+示例:
+    python code_resolver.py airports.db ZBAA PEK        # 解析代码
+    python code_resolver.py airports.db --ambiguous     # 列出有冲突的代码
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(ROOT, "pipeline", "airports.db")
+
+# 字段名 -> airport表的列，按ICAO查找时依次尝试 ICAO_FIELDS
+ICAO_FIELDS = ("icao_code", "gps_code", "ident")
+IATA_FIELDS = ("iata_code",)
+
+# 同一代码对应多个机场时优先选择的类型，与 spatial_query.TYPE_ORDER 一致
+TYPE_ORDER = """
+    CASE type
+        WHEN 'large_airport' THEN 0
+        WHEN 'medium_airport' THEN 1
+        WHEN 'small_airport' THEN 2
+        WHEN 'seaplane_base' THEN 3
+        WHEN 'heliport' THEN 4
+        WHEN 'balloonport' THEN 5
+        ELSE 6
+    END
+"""
+
+
+class Location(NamedTuple):
+    latitude_deg: float
+    longitude_deg: float
+    airport_id: int
+
+
+def normalize(code: Optional[str]) -> Optional[str]:
+    """去掉首尾空白并转为大写，空代码返回None"""
+    if not isinstance(code, str):
+        return None
+    code = code.strip().upper()
+    return code or None
+
+
+class CodeResolver:
+    """
+    代码到坐标的内存映射
+
+    Attributes:
+        maps: 字段名 -> {代码: Location}
+        ambiguous: (字段名, 代码) -> 使用该代码的所有机场ID，第一个为选中的机场
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        fields = ICAO_FIELDS + IATA_FIELDS
+        self.maps: Dict[str, Dict[str, Location]] = {field: {} for field in fields}
+        self.ambiguous: Dict[Tuple[str, str], List[int]] = {}
+        rows = conn.execute(f"""
+            SELECT id, latitude_deg, longitude_deg, {", ".join(fields)} FROM airport
+            WHERE latitude_deg IS NOT NULL AND longitude_deg IS NOT NULL
+            ORDER BY {TYPE_ORDER}, id
+        """)
+        for airport_id, latitude, longitude, *codes in rows:
+            location = Location(latitude, longitude, airport_id)
+            for field, code in zip(fields, codes):
+                code = normalize(code)
+                if code is None:
+                    continue
+                mapping = self.maps[field]
+                existing = mapping.setdefault(code, location)
+                if existing is not location:
+                    self.ambiguous.setdefault((field, code), [existing.airport_id]).append(airport_id)
+
+    @classmethod
+    def load(cls, db_path: str = DB_PATH) -> "CodeResolver":
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return cls(conn)
+        finally:
+            conn.close()
+
+    def match(self, icao: Optional[str], iata: Optional[str]) -> Optional[Tuple[str, str, Location]]:
+        """
+        按ICAO（icao_code、gps_code、ident）、再按IATA解析
+
+        Returns:
+            (命中的字段, 代码, Location)，找不到时返回None
+        """
+        for code, fields in ((normalize(icao), ICAO_FIELDS), (normalize(iata), IATA_FIELDS)):
+            if code is None:
+                continue
+            for field in fields:
+                location = self.maps[field].get(code)
+                if location is not None:
+                    return field, code, location
+        return None
+
+    def resolve(self, icao: Optional[str], iata: Optional[str]) -> Optional[Location]:
+        """解析为（纬度, 经度, 机场ID），找不到时返回None"""
+        matched = self.match(icao, iata)
+        return matched[2] if matched else None
+
+
+_resolvers: Dict[str, CodeResolver] = {}
+
+
+def get_resolver(db_path: str = DB_PATH) -> CodeResolver:
+    """每个数据库只加载一次的解析器"""
+    key = os.path.abspath(db_path)
+    if key not in _resolvers:
+        _resolvers[key] = CodeResolver.load(db_path)
+    return _resolvers[key]
+
+
+def resolve(icao: Optional[str], iata: Optional[str], db_path: str = DB_PATH) -> Optional[Location]:
+    """解析机场代码为（纬度, 经度, 机场ID），找不到时返回None"""
+    return get_resolver(db_path).resolve(icao, iata)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将ICAO/IATA/GPS/ident代码解析为经纬度")
+    parser.add_argument("db", nargs="?", default=DB_PATH, help="airports.db 路径")
+    parser.add_argument("codes", nargs="*", help="要解析的代码，按ICAO再按IATA查找")
+    parser.add_argument("--ambiguous", action="store_true", help="列出被多个机场使用的代码")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到数据库 {args.db}")
+        sys.exit(1)
+    start = time.perf_counter()
+    resolver = CodeResolver.load(args.db)
+    elapsed = (time.perf_counter() - start) * 1000
+    sizes = ", ".join(f"{field} {len(mapping)}" for field, mapping in resolver.maps.items())
+    print(f"加载 {elapsed:.0f} ms（{sizes}），冲突代码 {len(resolver.ambiguous)} 个")
+
+    for code in args.codes:
+        location = resolver.resolve(code, code)
+        if location is None:
+            print(f"{code}: 未找到")
+        else:
+            print(f"{code}: {location.latitude_deg:.6f}, {location.longitude_deg:.6f} (id {location.airport_id})")
+    if args.ambiguous:
+        for (field, code), ids in sorted(resolver.ambiguous.items()):
+            print(f"{field:<10} {code:<8} 选用 {ids[0]}，其他: {', '.join(map(str, ids[1:]))}")
+
+
+if __name__ == "__main__":
+    main()
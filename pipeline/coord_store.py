@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Column-oriented airport coordinate store
+将airports.db中的坐标导出为按列存储的NumPy数组目录：
+- latitude.npy / longitude.npy (float64)、elevation.npy (float32，缺失为NaN)、
+  type_code.npy (uint8)、country_index.npy (uint16)、airport_id.npy (int64)
+- index.json 保存类型表、国家表、ident列表以及 icao_code/gps_code/ident/iata_code 到行号的映射，
+  代码冲突的处理与 code_resolver.py 相同
+加载时使用 np.load(mmap_mode='r')，几乎不需要时间，多个短生命周期的进程共享页缓存，
+无需各自打开SQLite。查询（范围、半径、最近邻、距离矩阵）全部向量化。
+
+示例:
+    python coord_store.py export airports.db airports.coords
+    python coord_store.py near airports.coords ZBAA --radius 100
+    python coord_store.py bbox airports.coords 115 39 118 41
+    python coord_store.py benchmark airports.coords airports.db
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from code_resolver import IATA_FIELDS, ICAO_FIELDS, CodeResolver, normalize
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+# 1度纬度对应的距离（公里）
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+INDEX_FILE = "index.json"
+STORE_VERSION = 2
+
+# 列名 -> dtype
+COLUMNS = {
+    "airport_id": "int64",
+    "latitude": "float64",
+    "longitude": "float64",
+    "elevation": "float32",
+    "type_code": "uint8",
+    "country_index": "uint16",
+}
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("坐标存储需要NumPy，请先安装: pip install numpy")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    向量化的大圆距离（公里），参数可以是标量或可广播的数组
+    """
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlon = np.radians(lon2) - np.radians(lon1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _save_array(directory: str, name: str, values: Any) -> None:
+    """先写临时文件再替换，已打开旧文件的进程不受影响"""
+    path = os.path.join(directory, f"{name}.npy")
+    tmp_path = os.path.join(directory, f".{name}.tmp.npy")
+    np.save(tmp_path, values)
+    os.replace(tmp_path, path)
+
+
+def export_store(db_path: str, output_dir: str) -> Dict[str, Any]:
+    """
+    从airports.db导出坐标存储
+
+    Returns:
+        导出统计：airports、types、countries、bytes
+    """
+    require_numpy()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("""
+            SELECT id, ident, type, latitude_deg, longitude_deg, elevation_ft, iso_country
+            FROM airport ORDER BY id
+        """).fetchall()
+        resolver = CodeResolver(conn)
+    finally:
+        conn.close()
+
+    types: Dict[str, int] = {}
+    countries: Dict[str, int] = {}
+    idents: List[str] = []
+    columns = {name: np.empty(len(rows), dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    for index, (airport_id, ident, airport_type, lat, lon, elevation, country) in enumerate(rows):
+        columns["airport_id"][index] = airport_id
+        columns["latitude"][index] = lat if lat is not None else np.nan
+        columns["longitude"][index] = lon if lon is not None else np.nan
+        columns["elevation"][index] = elevation if elevation is not None else np.nan
+        columns["type_code"][index] = types.setdefault(airport_type or "", len(types))
+        columns["country_index"][index] = countries.setdefault(country or "", len(countries))
+        idents.append(ident)
+
+    # 代码映射直接取自 CodeResolver，冲突时选中的机场与 enrich_destinations.py、route_graph.py 相同
+    rows_by_id = {airport_id: index for index, airport_id in enumerate(columns["airport_id"].tolist())}
+    codes = {field: {code: rows_by_id[location.airport_id] for code, location in mapping.items()}
+             for field, mapping in resolver.maps.items()}
+
+    if len(types) > 256 or len(countries) > 65536:
+        raise ValueError("类型或国家数量超出列宽")
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, values in columns.items():
+        _save_array(output_dir, name, values)
+
+    sidecar = {
+        "version": STORE_VERSION,
+        "count": len(rows),
+        "types": list(types),
+        "countries": list(countries),
+        "idents": idents,
+        "codes": codes,
+    }
+    tmp_path = os.path.join(output_dir, f".{INDEX_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(output_dir, INDEX_FILE))
+
+    size = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+    return {"airports": len(rows), "types": len(types), "countries": len(countries), "bytes": size}
+
+
+class CoordStore:
+    """
+    只读的机场坐标存储
+
+    所有查询返回行号数组（np.ndarray[int64]），用 record()/idents 等转换为机场信息。
+    """
+
+    def __init__(self, directory: str, mmap: bool = True):
+        require_numpy()
+        self.directory = directory
+        mode = "r" if mmap else None
+        for name in COLUMNS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode))
+        self._sidecar: Optional[Dict[str, Any]] = None
+
+    @property
+    def sidecar(self) -> Dict[str, Any]:
+        """ident和代码映射在第一次用到时才读取，只做坐标查询的进程不需要解析JSON"""
+        if self._sidecar is None:
+            with open(os.path.join(self.directory, INDEX_FILE), "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            if sidecar.get("version") != STORE_VERSION:
+                raise ValueError(f"不支持的坐标存储版本: {sidecar.get('version')}")
+            self._sidecar = sidecar
+        return self._sidecar
+
+    @property
+    def types(self) -> List[str]:
+        return self.sidecar["types"]
+
+    @property
+    def countries(self) -> List[str]:
+        return self.sidecar["countries"]
+
+    @property
+    def idents(self) -> List[str]:
+        return self.sidecar["idents"]
+
+    @property
+    def codes(self) -> Dict[str, Dict[str, int]]:
+        """字段名（icao_code、gps_code、ident、iata_code）-> {代码: 行号}"""
+        return self.sidecar["codes"]
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def resolve(self, icao: Optional[str], iata: Optional[str]) -> Optional[int]:
+        """
+        与 CodeResolver.resolve 相同：按ICAO依次查 icao_code、gps_code、ident，再按IATA查 iata_code
+
+        Returns:
+            行号，找不到时返回None（没有经纬度的机场不参与映射）
+        """
+        for code, fields in ((normalize(icao), ICAO_FIELDS), (normalize(iata), IATA_FIELDS)):
+            if code is None:
+                continue
+            for field in fields:
+                index = self.codes[field].get(code)
+                if index is not None:
+                    return index
+        return None
+
+    def lookup(self, code: str) -> Optional[int]:
+        """按ICAO、ident或IATA查找行号（不区分大小写），找不到时返回None"""
+        return self.resolve(code, code)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """返回一行的机场信息"""
+        elevation = float(self.elevation[index])
+        return {
+            "id": int(self.airport_id[index]),
+            "ident": self.idents[index],
+            "type": self.types[self.type_code[index]] or None,
+            "latitude_deg": float(self.latitude[index]),
+            "longitude_deg": float(self.longitude[index]),
+            "elevation_ft": None if math.isnan(elevation) else int(elevation),
+            "iso_country": self.countries[self.country_index[index]] or None,
+        }
+
+    def type_mask(self, types: Optional[Sequence[str]]):
+        """指定类型的布尔掩码，types为空时返回None"""
+        if not types:
+            return None
+        codes = [self.types.index(t) for t in types if t in self.types]
+        return np.isin(self.type_code, codes)
+
+    def bbox(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float,
+             types: Optional[Sequence[str]] = None):
+        """
+        经纬度范围内的机场行号，min_lon > max_lon 表示范围跨越180°经线
+        """
+        lat = self.latitude
+        lon = self.longitude
+        mask = (lat >= min_lat) & (lat <= max_lat)
+        if min_lon <= max_lon:
+            mask &= (lon >= min_lon) & (lon <= max_lon)
+        else:
+            mask &= (lon >= min_lon) | (lon <= max_lon)
+        type_mask = self.type_mask(types)
+        if type_mask is not None:
+            mask &= type_mask
+        return np.flatnonzero(mask)
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float,
+                      types: Optional[Sequence[str]] = None) -> Tuple[Any, Any]:
+        """
+        半径内的机场，按距离排序
+
+        先按纬度带粗筛（纬度差不超过半径对应的度数），只对候选行计算大圆距离。
+
+        Returns:
+            (行号数组, 距离数组，公里)
+        """
+        band = radius_km / KM_PER_DEGREE
+        mask = (self.latitude >= latitude - band) & (self.latitude <= latitude + band)
+        type_mask = self.type_mask(types)
+        if type_mask is not None:
+            mask &= type_mask
+        candidates = np.flatnonzero(mask)
+        distances = haversine_km(latitude, longitude, self.latitude[candidates], self.longitude[candidates])
+        keep = distances <= radius_km
+        candidates = candidates[keep]
+        distances = distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, latitude: float, longitude: float, k: int = 10,
+                types: Optional[Sequence[str]] = None) -> Tuple[Any, Any]:
+        """
+        距离最近的k个机场
+
+        Returns:
+            (行号数组, 距离数组，公里)，按距离排序
+        """
+        candidates = np.flatnonzero(~np.isnan(self.latitude))
+        type_mask = self.type_mask(types)
+        if type_mask is not None:
+            candidates = candidates[type_mask[candidates]]
+        distances = haversine_km(latitude, longitude, self.latitude[candidates], self.longitude[candidates])
+        k = min(k, len(candidates))
+        if k == 0:
+            return candidates[:0], distances[:0]
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind="stable")]
+        return candidates[top], distances[top]
+
+    def distance_matrix(self, rows_a, rows_b=None):
+        """
+        两组机场之间的距离矩阵（公里），rows_b为None时计算rows_a两两之间的距离
+        """
+        rows_a = np.asarray(rows_a)
+        rows_b = rows_a if rows_b is None else np.asarray(rows_b)
+        return haversine_km(
+            self.latitude[rows_a][:, None], self.longitude[rows_a][:, None],
+            self.latitude[rows_b][None, :], self.longitude[rows_b][None, :],
+        )
+
+
+def sqlite_within_radius(conn: sqlite3.Connection, latitude: float, longitude: float,
+                         radius_km: float) -> List[Tuple[int, float]]:
+    """逐行计算距离的SQLite实现，用于对比"""
+    band = radius_km / KM_PER_DEGREE
+    result = []
+    for airport_id, lat, lon in conn.execute(
+            "SELECT id, latitude_deg, longitude_deg FROM airport WHERE latitude_deg BETWEEN ? AND ?",
+            (latitude - band, latitude + band)):
+        dlat = math.radians(lat - latitude)
+        dlon = math.radians(lon - longitude)
+        h = math.sin(dlat / 2) ** 2 + math.cos(math.radians(latitude)) * math.cos(math.radians(lat)) * math.sin(dlon / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+        if distance <= radius_km:
+            result.append((airport_id, distance))
+    result.sort(key=lambda item: item[1])
+    return result
+
+
+def benchmark(store_dir: str, db_path: str, queries: int = 200, radius_km: float = 100.0) -> None:
+    """
+    对比坐标存储与SQLite的加载时间和半径查询延迟
+    """
+    start = time.perf_counter()
+    store = CoordStore(store_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    conn.execute("SELECT COUNT(*) FROM airport").fetchone()
+    connect_ms = (time.perf_counter() - start) * 1000
+    print(f"坐标存储: {store_dir}（{len(store)} 个机场），加载 {load_ms:.2f} ms；SQLite 打开 {connect_ms:.2f} ms")
+
+    rng = random.Random(42)
+    valid = np.flatnonzero(~np.isnan(store.latitude))
+    centers = [(float(store.latitude[i]), float(store.longitude[i])) for i in (rng.choice(valid) for _ in range(queries))]
+
+    for label, func in (
+        ("NumPy", lambda lat, lon: store.within_radius(lat, lon, radius_km)),
+        ("SQLite", lambda lat, lon: sqlite_within_radius(conn, lat, lon, radius_km)),
+    ):
+        elapsed = []
+        for lat, lon in centers:
+            t = time.perf_counter()
+            func(lat, lon)
+            elapsed.append((time.perf_counter() - t) * 1000)
+        print(f"{label:<7} 半径{radius_km:g}km  中位数: {statistics.median(elapsed):8.3f} ms  "
+              f"平均: {statistics.mean(elapsed):8.3f} ms")
+
+    sample = valid[:2000]
+    t = time.perf_counter()
+    matrix = store.distance_matrix(sample)
+    print(f"距离矩阵 {matrix.shape[0]}x{matrix.shape[1]}: {(time.perf_counter() - t) * 1000:.1f} ms")
+    conn.close()
+
+
+def print_rows(store: CoordStore, rows, distances=None) -> None:
+    for position, index in enumerate(rows):
+        record = store.record(index)
+        line = f"{record['ident']:<10} {record['type'] or '':<15} {record['latitude_deg']:10.5f} {record['longitude_deg']:11.5f}"
+        if distances is not None:
+            line += f"  {distances[position]:8.1f} km"
+        print(line)
+    print(f"共 {len(rows)} 个机场")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按列存储的机场坐标（NumPy内存映射）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="从airports.db导出坐标存储")
+    export_parser.add_argument("db", help="airports.db 路径")
+    export_parser.add_argument("output", help="输出目录")
+
+    bbox_parser = subparsers.add_parser("bbox", help="按经纬度范围查询")
+    bbox_parser.add_argument("store", help="坐标存储目录")
+    bbox_parser.add_argument("bbox", nargs=4, type=float, help="min_lon min_lat max_lon max_lat")
+    bbox_parser.add_argument("--types", type=str, default="", help="机场类型，逗号分隔")
+
+    near_parser = subparsers.add_parser("near", help="查询某个机场附近的机场")
+    near_parser.add_argument("store", help="坐标存储目录")
+    near_parser.add_argument("code", help="ICAO、IATA或ident")
+    near_parser.add_argument("--radius", type=float, default=None, help="半径（公里），不指定时返回最近的k个")
+    near_parser.add_argument("-k", type=int, default=10, help="最近邻个数（默认: 10）")
+    near_parser.add_argument("--types", type=str, default="", help="机场类型，逗号分隔")
+
+    bench_parser = subparsers.add_parser("benchmark", help="与SQLite对比加载时间和半径查询延迟")
+    bench_parser.add_argument("store", help="坐标存储目录")
+    bench_parser.add_argument("db", help="airports.db 路径")
+    bench_parser.add_argument("--queries", type=int, default=200, help="查询次数")
+    bench_parser.add_argument("--radius", type=float, default=100.0, help="半径（公里）")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "export":
+            start = time.perf_counter()
+            stats = export_store(args.db, args.output)
+            print(f"已导出 {stats['airports']} 个机场（{stats['types']} 种类型，{stats['countries']} 个国家）到 {args.output}")
+            print(f"大小: {stats['bytes'] / 1024 / 1024:.1f} MB，耗时: {time.perf_counter() - start:.2f} 秒")
+        elif args.command == "benchmark":
+            benchmark(args.store, args.db, args.queries, args.radius)
+        else:
+            store = CoordStore(args.store)
+            types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+            if args.command == "bbox":
+                print_rows(store, store.bbox(*args.bbox, types=types))
+            else:
+                index = store.lookup(args.code)
+                if index is None:
+                    print(f"错误: 找不到机场 {args.code}")
+                    sys.exit(1)
+                latitude = float(store.latitude[index])
+                longitude = float(store.longitude[index])
+                if args.radius is not None:
+                    rows, distances = store.within_radius(latitude, longitude, args.radius, types)
+                else:
+                    rows, distances = store.nearest(latitude, longitude, args.k, types)
+                print_rows(store, rows, distances)
+    except (RuntimeError, ValueError, FileNotFoundError, sqlite3.Error) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,12 @@ CSV to GeoJSON Converter for Airport Data
 将机场CSV数据转换为GeoJSON格式，用于后续的tippecanoe处理
 """
 
+import argparse
 import csv
 import json
+import os
 import sys
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, Optional, TextIO
 
 zoom_rules = {
     "balloonport": 2,
@@ -21,6 +23,101 @@ zoom_rules = {
 }
 
 
+def row_to_feature(row: Dict[str, str], row_num: int) -> Optional[Dict[str, Any]]:
+    """
+    将一行CSV数据转换为GeoJSON Feature
+
+    Args:
+        row: csv.DictReader 读出的一行
+        row_num: 该行在CSV文件中的行号
+
+    Returns:
+        GeoJSON Feature字典，缺少或无效经纬度时返回None
+    """
+    # 获取经纬度
+    lat = row.get("latitude_deg", "").strip()
+    lon = row.get("longitude_deg", "").strip()
+
+    # 跳过没有经纬度的记录
+    if not lat or not lon or lat == "" or lon == "":
+        print(f"警告: 第{row_num}行缺少经纬度数据，跳过")
+        return None
+
+    # 转换为浮点数
+    try:
+        latitude = float(lat)
+        longitude = float(lon)
+    except ValueError:
+        print(f"警告: 第{row_num}行经纬度格式错误，跳过")
+        return None
+
+    # 验证经纬度范围
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        print(f"警告: 第{row_num}行经纬度超出有效范围，跳过")
+        return None
+
+    # 创建属性字典，排除经纬度字段
+    properties = {}
+    for key, value in row.items():
+        if key not in ["latitude_deg", "longitude_deg"]:
+            # 处理空值
+            if value.strip() == "":
+                properties[key] = None
+            else:
+                # 尝试转换数值类型
+                if key in ["id", "elevation_ft"]:
+                    try:
+                        properties[key] = (
+                            int(value) if value.strip() else None
+                        )
+                    except ValueError:
+                        properties[key] = value.strip()
+                else:
+                    properties[key] = value.strip()
+    del properties["scheduled_service"]
+    # del properties["icao_code"]
+    # del properties["iata_code"]
+    del properties["gps_code"]
+    del properties["local_code"]
+    del properties["continent"]
+    del properties["id"]
+    properties["minzoom"] = zoom_rules[properties["type"]]
+    # 创建GeoJSON Feature
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [
+                longitude,
+                latitude,
+            ],  # GeoJSON格式是[经度, 纬度]
+        },
+        "properties": properties,
+    }
+
+
+def iter_features(csv_file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取CSV文件并生成GeoJSON Feature，不在内存中保留已生成的Feature
+
+    Args:
+        csv_file_path: 输入CSV文件路径
+    """
+    with open(csv_file_path, "r", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+
+        for row_num, row in enumerate(
+            reader, start=2
+        ):  # 从第2行开始计数（第1行是标题）
+            try:
+                feature = row_to_feature(row, row_num)
+            except Exception as e:
+                print(f"错误: 处理第{row_num}行时出错: {e}")
+                continue
+            if feature is not None:
+                yield feature
+
+
 def csv_to_geojson(csv_file_path: str, output_file_path: str) -> None:
     """
     将CSV文件转换为GeoJSON格式
@@ -29,84 +126,10 @@ def csv_to_geojson(csv_file_path: str, output_file_path: str) -> None:
         csv_file_path: 输入CSV文件路径
         output_file_path: 输出GeoJSON文件路径
     """
-    features = []
     wiki_url = 0
     try:
-        with open(csv_file_path, "r", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-
-            for row_num, row in enumerate(
-                reader, start=2
-            ):  # 从第2行开始计数（第1行是标题）
-                try:
-                    # 获取经纬度
-                    lat = row.get("latitude_deg", "").strip()
-                    lon = row.get("longitude_deg", "").strip()
-
-                    # 跳过没有经纬度的记录
-                    if not lat or not lon or lat == "" or lon == "":
-                        print(f"警告: 第{row_num}行缺少经纬度数据，跳过")
-                        continue
-
-                    # 转换为浮点数
-                    try:
-                        latitude = float(lat)
-                        longitude = float(lon)
-                    except ValueError:
-                        print(f"警告: 第{row_num}行经纬度格式错误，跳过")
-                        continue
-
-                    # 验证经纬度范围
-                    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-                        print(f"警告: 第{row_num}行经纬度超出有效范围，跳过")
-                        continue
-
-                    # 创建属性字典，排除经纬度字段
-                    properties = {}
-                    for key, value in row.items():
-                        if key not in ["latitude_deg", "longitude_deg"]:
-                            # 处理空值
-                            if value.strip() == "":
-                                properties[key] = None
-                            else:
-                                # 尝试转换数值类型
-                                if key in ["id", "elevation_ft"]:
-                                    try:
-                                        properties[key] = (
-                                            int(value) if value.strip() else None
-                                        )
-                                    except ValueError:
-                                        properties[key] = value.strip()
-                                else:
-                                    properties[key] = value.strip()
-                    del properties["scheduled_service"]
-                    # del properties["icao_code"]
-                    # del properties["iata_code"]
-                    del properties["gps_code"]
-                    del properties["local_code"]
-                    del properties["continent"]
-                    del properties["id"]
-                    if properties["wikipedia_link"]:
-                        wiki_url += 1
-                    properties["minzoom"] = zoom_rules[properties["type"]]
-                    # 创建GeoJSON Feature
-                    feature = {
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [
-                                longitude,
-                                latitude,
-                            ],  # GeoJSON格式是[经度, 纬度]
-                        },
-                        "properties": properties,
-                    }
-
-                    features.append(feature)
-
-                except Exception as e:
-                    print(f"错误: 处理第{row_num}行时出错: {e}")
-                    continue
+        features = list(iter_features(csv_file_path))
+        wiki_url = sum(1 for f in features if f["properties"]["wikipedia_link"])
 
     except FileNotFoundError:
         print(f"错误: 找不到文件 {csv_file_path}")
@@ -134,19 +157,106 @@ def csv_to_geojson(csv_file_path: str, output_file_path: str) -> None:
         sys.exit(1)
 
 
-def main():
+def type_output_path(output_file_path: str, airport_type: str) -> str:
     """
-    主函数
+    按机场类型拆分输出时的文件名，如 airports.geojsonl -> airports.heliport.geojsonl
+    """
+    base, ext = os.path.splitext(output_file_path)
+    return f"{base}.{airport_type}{ext or '.geojsonl'}"
+
+
+def csv_to_geojsonseq(
+    csv_file_path: str,
+    output_file_path: str,
+    split_by_type: bool = False,
+    record_separator: bool = True,
+) -> None:
     """
-    if len(sys.argv) != 3:
-        print("用法: python csv_to_geojson.py <输入CSV文件> <输出GeoJSON文件>")
-        print("示例: python csv_to_geojson.py airports.csv airports.geojson")
+    将CSV文件流式转换为换行分隔的GeoJSON（RFC 8142 GeoJSONSeq），
+    每读一行就写出一个Feature，内存占用与输入大小无关，
+    输出可直接用 tippecanoe -P 并行读取
+
+    Args:
+        csv_file_path: 输入CSV文件路径
+        output_file_path: 输出文件路径，按类型拆分时作为文件名模板
+        split_by_type: 是否按机场类型输出到不同文件
+        record_separator: 是否在每条记录前写入RS(0x1E)字符，关闭时输出普通NDJSON
+    """
+    prefix = "\x1e" if record_separator else ""
+    outputs: Dict[str, TextIO] = {}
+    counts: Dict[str, int] = {}
+    wiki_url = 0
+    try:
+        for feature in iter_features(csv_file_path):
+            properties = feature["properties"]
+            key = properties["type"] if split_by_type else ""
+            outfile = outputs.get(key)
+            if outfile is None:
+                path = type_output_path(output_file_path, key) if split_by_type else output_file_path
+                outfile = outputs[key] = open(path, "w", encoding="utf-8")
+                counts[key] = 0
+            outfile.write(prefix + json.dumps(feature, separators=(",", ":")) + "\n")
+            counts[key] += 1
+            if properties["wikipedia_link"]:
+                wiki_url += 1
+
+    except FileNotFoundError:
+        print(f"错误: 找不到文件 {csv_file_path}")
         sys.exit(1)
+    except Exception as e:
+        print(f"错误: 转换GeoJSONSeq时出错: {e}")
+        sys.exit(1)
+    finally:
+        for outfile in outputs.values():
+            outfile.close()
+
+    print(f"转换完成！")
+    print(f"输入文件: {csv_file_path}")
+    for key, count in sorted(counts.items()):
+        path = type_output_path(output_file_path, key) if split_by_type else output_file_path
+        print(f"输出文件: {path} ({count} 个机场记录)")
+    print(f"成功转换 {sum(counts.values())} 个机场记录")
+    print(f"total wikipedia airports {wiki_url}")
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
 
-    csv_to_geojson(input_file, output_file)
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(
+        description="将机场CSV数据转换为GeoJSON格式",
+        epilog="示例: python csv_to_geojson.py airports.csv airports.geojson",
+    )
+    parser.add_argument("input_file", help="输入CSV文件")
+    parser.add_argument("output_file", help="输出GeoJSON文件")
+    parser.add_argument(
+        "--seq",
+        action="store_true",
+        help="流式输出换行分隔的GeoJSONSeq（RFC 8142），可用 tippecanoe -P 并行读取",
+    )
+    parser.add_argument(
+        "--split-by-type",
+        action="store_true",
+        help="配合 --seq 使用，按机场类型输出到不同文件",
+    )
+    parser.add_argument(
+        "--no-rs",
+        action="store_true",
+        help="配合 --seq 使用，不写入RS分隔符，输出普通NDJSON",
+    )
+    args = parser.parse_args()
+
+    if args.seq:
+        csv_to_geojsonseq(
+            args.input_file,
+            args.output_file,
+            split_by_type=args.split_by_type,
+            record_separator=not args.no_rs,
+        )
+    else:
+        if args.split_by_type or args.no_rs:
+            parser.error("--split-by-type 和 --no-rs 需要与 --seq 一起使用")
+        csv_to_geojson(args.input_file, args.output_file)
 
 
 if __name__ == "__main__":
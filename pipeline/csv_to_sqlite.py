@@ -5,14 +5,70 @@ CSV to SQLite Converter for Airport Data
 将机场CSV数据转换为SQLite数据库，包含airport表和地址表
 """
 
+import argparse
 import csv
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
 import sqlite3
 import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
 from iso_mappings import get_country_name, get_full_region_name
 
-def create_database_schema(conn: sqlite3.Connection) -> None:
+# airport表中由CSV直接得到的字段（不含id和address_id）
+AIRPORT_FIELDS = (
+    "ident", "type", "name", "latitude_deg", "longitude_deg",
+    "elevation_ft", "iso_country", "iso_region", "municipality",
+    "icao_code", "iata_code", "gps_code", "local_code",
+    "home_link", "wikipedia_link", "keywords",
+)
+
+INSERT_AIRPORT_SQL = """
+    INSERT OR REPLACE INTO airport (
+        ident, type, name, latitude_deg, longitude_deg, 
+        elevation_ft, iso_country, iso_region, municipality,
+        icao_code, iata_code, gps_code, local_code,
+        home_link, wikipedia_link, keywords, address_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 增量更新时按ident写入，保持已有记录的id不变
+UPSERT_AIRPORT_SQL = """
+    INSERT INTO airport (
+        ident, type, name, latitude_deg, longitude_deg, 
+        elevation_ft, iso_country, iso_region, municipality,
+        icao_code, iata_code, gps_code, local_code,
+        home_link, wikipedia_link, keywords, address_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ident) DO UPDATE SET
+        type = excluded.type, name = excluded.name,
+        latitude_deg = excluded.latitude_deg, longitude_deg = excluded.longitude_deg,
+        elevation_ft = excluded.elevation_ft, iso_country = excluded.iso_country,
+        iso_region = excluded.iso_region, municipality = excluded.municipality,
+        icao_code = excluded.icao_code, iata_code = excluded.iata_code,
+        gps_code = excluded.gps_code, local_code = excluded.local_code,
+        home_link = excluded.home_link, wikipedia_link = excluded.wikipedia_link,
+        keywords = excluded.keywords, address_id = excluded.address_id
+"""
+
+# country_stats/region_stats 中单独计数的机场类型，其余类型（含空值）计入 other_count
+STATS_TYPES = ("large_airport", "medium_airport", "small_airport", "heliport", "seaplane_base")
+STATS_COUNT_COLUMNS = ("airport_count",) + tuple(f"{t}_count" for t in STATS_TYPES) + ("other_count",)
+BBOX_COLUMNS = ("min_lat", "max_lat", "min_lon", "max_lon")
+
+# 批量导入模式下每个事务写入的机场记录数
+BULK_BATCH_SIZE = 50000
+
+# 并行解析时每个工作进程分到的数据块数，块越多写入进程越早开始工作
+CHUNKS_PER_WORKER = 4
+
+def create_tables(conn: sqlite3.Connection) -> None:
     """
-    创建数据库表结构
+    创建数据表（不含二级索引）
     
     Args:
         conn: SQLite数据库连接
@@ -74,15 +130,365 @@ def create_database_schema(conn: sqlite3.Connection) -> None:
         )
     """)
     
+    # 创建地区统计表，按airport.iso_region聚合，含机场坐标的外包矩形
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS region_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            region_code TEXT NOT NULL UNIQUE,
+            country_code TEXT,
+            region_name TEXT,
+            airport_count INTEGER DEFAULT 0,
+            large_airport_count INTEGER DEFAULT 0,
+            medium_airport_count INTEGER DEFAULT 0,
+            small_airport_count INTEGER DEFAULT 0,
+            heliport_count INTEGER DEFAULT 0,
+            seaplane_base_count INTEGER DEFAULT 0,
+            other_count INTEGER DEFAULT 0,
+            min_lat REAL,
+            max_lat REAL,
+            min_lon REAL,
+            max_lon REAL,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # 创建源数据哈希表，供增量更新比对每个ident的内容是否变化
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS airport_source_hash (
+            ident TEXT PRIMARY KEY,
+            hash TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """
+    创建二级索引，批量导入时在数据写入完成后再调用
+    
+    Args:
+        conn: SQLite数据库连接
+    """
+    cursor = conn.cursor()
+    
     # 创建索引以提高查询性能
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_airport_ident ON airport(ident)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_airport_country ON airport(iso_country)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_airport_region ON airport(iso_region)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_airport_type ON airport(type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_airport_location ON airport(latitude_deg, longitude_deg)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_address_country ON address(country)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_address_country_name ON address(country_name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_address_region_name ON address(region_name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_country_stats_code ON country_stats(country_code)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_country_stats_name ON country_stats(country_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_region_stats_country ON region_stats(country_code)")
+
+def drop_spatial_triggers(cursor: sqlite3.Cursor) -> None:
+    """
+    删除维护R*Tree空间索引的触发器，完整导入前调用，导入后由 build_spatial_index 重建
+    """
+    cursor.execute("DROP TRIGGER IF EXISTS airport_rtree_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_rtree_update")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_rtree_delete")
+
+def build_spatial_index(cursor: sqlite3.Cursor) -> None:
+    """
+    创建并重建airport_rtree空间索引（以airport.id为键的R*Tree虚拟表），
+    并创建在airport表增删改时同步该索引的触发器
+    
+    Args:
+        cursor: 数据库游标
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS airport_rtree USING rtree(
+            id,
+            min_lon, max_lon,
+            min_lat, max_lat
+        )
+    """)
+    drop_spatial_triggers(cursor)
+    cursor.execute("DELETE FROM airport_rtree")
+    cursor.execute("""
+        INSERT INTO airport_rtree (id, min_lon, max_lon, min_lat, max_lat)
+        SELECT id, longitude_deg, longitude_deg, latitude_deg, latitude_deg
+        FROM airport
+        WHERE latitude_deg IS NOT NULL AND longitude_deg IS NOT NULL
+    """)
+    
+    cursor.execute("""
+        CREATE TRIGGER airport_rtree_insert AFTER INSERT ON airport
+        WHEN NEW.latitude_deg IS NOT NULL AND NEW.longitude_deg IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO airport_rtree (id, min_lon, max_lon, min_lat, max_lat)
+            VALUES (NEW.id, NEW.longitude_deg, NEW.longitude_deg, NEW.latitude_deg, NEW.latitude_deg);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER airport_rtree_update AFTER UPDATE OF id, latitude_deg, longitude_deg ON airport
+        BEGIN
+            DELETE FROM airport_rtree WHERE id = OLD.id;
+            INSERT INTO airport_rtree (id, min_lon, max_lon, min_lat, max_lat)
+            SELECT NEW.id, NEW.longitude_deg, NEW.longitude_deg, NEW.latitude_deg, NEW.latitude_deg
+            WHERE NEW.latitude_deg IS NOT NULL AND NEW.longitude_deg IS NOT NULL;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER airport_rtree_delete AFTER DELETE ON airport
+        BEGIN
+            DELETE FROM airport_rtree WHERE id = OLD.id;
+        END
+    """)
+
+def drop_search_triggers(cursor: sqlite3.Cursor) -> None:
+    """
+    删除维护FTS5全文索引的触发器，完整导入前调用，导入后由 build_search_index 重建
+    """
+    cursor.execute("DROP TRIGGER IF EXISTS airport_fts_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_fts_update")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_fts_delete")
+
+def build_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    创建并重建airport_fts全文索引（rowid为airport.id的FTS5虚拟表），
+    覆盖名称、城市、关键词、各类代码和地址中的国家名称，
+    并创建在airport表增删改时同步该索引的触发器
+    
+    Args:
+        cursor: 数据库游标
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS airport_fts USING fts5(
+            name, municipality, keywords, iata_code, icao_code, ident, country_name,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    drop_search_triggers(cursor)
+    cursor.execute("DELETE FROM airport_fts")
+    cursor.execute("""
+        INSERT INTO airport_fts (rowid, name, municipality, keywords, iata_code, icao_code, ident, country_name)
+        SELECT a.id, a.name, a.municipality, a.keywords, a.iata_code, a.icao_code, a.ident, addr.country_name
+        FROM airport a
+        LEFT JOIN address addr ON a.address_id = addr.id
+    """)
+    
+    cursor.execute("""
+        CREATE TRIGGER airport_fts_insert AFTER INSERT ON airport
+        BEGIN
+            INSERT INTO airport_fts (rowid, name, municipality, keywords, iata_code, icao_code, ident, country_name)
+            VALUES (
+                NEW.id, NEW.name, NEW.municipality, NEW.keywords, NEW.iata_code, NEW.icao_code, NEW.ident,
+                (SELECT country_name FROM address WHERE id = NEW.address_id)
+            );
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER airport_fts_update AFTER UPDATE ON airport
+        BEGIN
+            DELETE FROM airport_fts WHERE rowid = OLD.id;
+            INSERT INTO airport_fts (rowid, name, municipality, keywords, iata_code, icao_code, ident, country_name)
+            VALUES (
+                NEW.id, NEW.name, NEW.municipality, NEW.keywords, NEW.iata_code, NEW.icao_code, NEW.ident,
+                (SELECT country_name FROM address WHERE id = NEW.address_id)
+            );
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER airport_fts_delete AFTER DELETE ON airport
+        BEGIN
+            DELETE FROM airport_fts WHERE rowid = OLD.id;
+        END
+    """)
+
+def type_flags(row: str) -> List[str]:
+    """
+    机场类型对应各计数列的0/1表达式，row 为 "NEW"、"OLD" 或表别名
+    """
+    other = ", ".join(f"'{t}'" for t in STATS_TYPES)
+    return (["1"] + [f"({row}.type IS '{t}')" for t in STATS_TYPES]
+            + [f"({row}.type IS NULL OR {row}.type NOT IN ({other}))"])
+
+def stats_select(table: str) -> str:
+    """
+    从airport表全量聚合country_stats或region_stats的SQL，列顺序与 STATS_COLUMNS 相同
+    
+    Args:
+        table: "country_stats" 或 "region_stats"
+    """
+    counts = ",\n            ".join(f"SUM({flag}) AS {column}"
+                                     for flag, column in zip(type_flags("a"), STATS_COUNT_COLUMNS))
+    if table == "country_stats":
+        key, columns = "a.iso_country", "MAX(addr.country_name) AS country_name"
+    else:
+        has_point = "a.latitude_deg IS NOT NULL AND a.longitude_deg IS NOT NULL"
+        key = "a.iso_region"
+        columns = """MAX(a.iso_country) AS country_code,
+            MAX(addr.region_name) AS region_name"""
+        counts += f""",
+            MIN(CASE WHEN {has_point} THEN a.latitude_deg END) AS min_lat,
+            MAX(CASE WHEN {has_point} THEN a.latitude_deg END) AS max_lat,
+            MIN(CASE WHEN {has_point} THEN a.longitude_deg END) AS min_lon,
+            MAX(CASE WHEN {has_point} THEN a.longitude_deg END) AS max_lon"""
+    return f"""
+        SELECT
+            {key} AS code,
+            {columns},
+            {counts}
+        FROM airport a
+        LEFT JOIN address addr ON a.address_id = addr.id
+        WHERE {key} IS NOT NULL
+        GROUP BY {key}
+    """
+
+# 各统计表除id和last_updated以外的列，与 stats_select 的列顺序相同
+STATS_COLUMNS = {
+    "country_stats": ("country_code", "country_name") + STATS_COUNT_COLUMNS,
+    "region_stats": ("region_code", "country_code", "region_name") + STATS_COUNT_COLUMNS + BBOX_COLUMNS,
+}
+
+def refresh_stats(cursor: sqlite3.Cursor) -> None:
+    """
+    根据airport表全量重新生成country_stats和region_stats
+    """
+    for table, columns in STATS_COLUMNS.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"""
+            INSERT INTO {table} ({", ".join(columns)}, last_updated)
+            SELECT *, CURRENT_TIMESTAMP FROM ({stats_select(table)})
+        """)
+
+def stats_add_sql(table: str) -> str:
+    """
+    把NEW行计入统计表的触发器语句
+    """
+    key = "iso_country" if table == "country_stats" else "iso_region"
+    columns = STATS_COLUMNS[table]
+    if table == "country_stats":
+        values = ["NEW.iso_country", "(SELECT country_name FROM address WHERE id = NEW.address_id)"]
+        names = ["country_name = COALESCE(excluded.country_name, country_name)"]
+    else:
+        point = "CASE WHEN NEW.latitude_deg IS NOT NULL AND NEW.longitude_deg IS NOT NULL THEN NEW.{} END"
+        values = ["NEW.iso_region", "NEW.iso_country",
+                  "(SELECT region_name FROM address WHERE id = NEW.address_id)"]
+        names = ["country_code = COALESCE(excluded.country_code, country_code)",
+                 "region_name = COALESCE(excluded.region_name, region_name)"]
+    values += type_flags("NEW")
+    updates = names + [f"{column} = {column} + excluded.{column}" for column in STATS_COUNT_COLUMNS]
+    if table == "region_stats":
+        values += [point.format("latitude_deg")] * 2 + [point.format("longitude_deg")] * 2
+        for column in BBOX_COLUMNS:
+            extreme = "min" if column.startswith("min") else "max"
+            updates.append(f"{column} = COALESCE({extreme}({column}, excluded.{column}), {column}, excluded.{column})")
+    updates.append("last_updated = excluded.last_updated")
+    return f"""
+            INSERT INTO {table} ({", ".join(columns)}, last_updated)
+            SELECT {", ".join(values)}, CURRENT_TIMESTAMP
+            WHERE NEW.{key} IS NOT NULL
+            ON CONFLICT ({columns[0]}) DO UPDATE SET
+                {", ".join(updates)};"""
+
+def stats_remove_sql(table: str) -> str:
+    """
+    把OLD行从统计表中减去的触发器语句，计数归零的行被删除；
+    OLD点位于外包矩形边界上时，从airport表重新计算该地区的外包矩形
+    """
+    key = "iso_country" if table == "country_stats" else "iso_region"
+    code = STATS_COLUMNS[table][0]
+    updates = [f"{column} = {column} - {flag}" for flag, column in zip(type_flags("OLD"), STATS_COUNT_COLUMNS)]
+    sql = f"""
+            UPDATE {table} SET {", ".join(updates)}, last_updated = CURRENT_TIMESTAMP
+            WHERE {code} = OLD.{key};"""
+    if table == "region_stats":
+        sql += f"""
+            UPDATE region_stats SET ({", ".join(BBOX_COLUMNS)}) = (
+                SELECT MIN(latitude_deg), MAX(latitude_deg), MIN(longitude_deg), MAX(longitude_deg)
+                FROM airport
+                WHERE iso_region = OLD.iso_region AND latitude_deg IS NOT NULL AND longitude_deg IS NOT NULL
+            )
+            WHERE region_code = OLD.iso_region
+                AND OLD.latitude_deg IS NOT NULL AND OLD.longitude_deg IS NOT NULL
+                AND (OLD.latitude_deg IN (min_lat, max_lat) OR OLD.longitude_deg IN (min_lon, max_lon));"""
+    sql += f"""
+            DELETE FROM {table} WHERE {code} = OLD.{key} AND airport_count <= 0;"""
+    return sql
+
+def drop_stats_triggers(cursor: sqlite3.Cursor) -> None:
+    """
+    删除维护统计表的触发器，完整导入前调用，导入后由 build_stats 重建
+    """
+    cursor.execute("DROP TRIGGER IF EXISTS airport_stats_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_stats_update")
+    cursor.execute("DROP TRIGGER IF EXISTS airport_stats_delete")
+
+def build_stats(cursor: sqlite3.Cursor) -> None:
+    """
+    全量重新生成country_stats和region_stats，并创建在airport表增删改时
+    增量维护这两张表的触发器，之后的增量更新不再需要全量聚合
+    
+    Args:
+        cursor: 数据库游标
+    """
+    drop_stats_triggers(cursor)
+    refresh_stats(cursor)
+    
+    add = stats_add_sql("country_stats") + stats_add_sql("region_stats")
+    remove = stats_remove_sql("country_stats") + stats_remove_sql("region_stats")
+    cursor.execute(f"""
+        CREATE TRIGGER airport_stats_insert AFTER INSERT ON airport
+        BEGIN{add}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER airport_stats_update
+        AFTER UPDATE OF type, iso_country, iso_region, latitude_deg, longitude_deg, address_id ON airport
+        BEGIN{remove}{add}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER airport_stats_delete AFTER DELETE ON airport
+        BEGIN{remove}
+        END
+    """)
+
+def check_stats(cursor: sqlite3.Cursor) -> List[str]:
+    """
+    比较country_stats/region_stats中触发器维护的值与从airport表全量重算的结果
+    
+    Returns:
+        不一致之处的描述，一致时为空列表
+    """
+    problems = []
+    for table, columns in STATS_COLUMNS.items():
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
+        stored = {row[0]: row for row in cursor.fetchall()}
+        cursor.execute(stats_select(table))
+        expected = {row[0]: row for row in cursor.fetchall()}
+        
+        for code in sorted(expected.keys() - stored.keys()):
+            problems.append(f"{table}: 缺少 {code}")
+        for code in sorted(stored.keys() - expected.keys()):
+            problems.append(f"{table}: 多余的 {code}")
+        for code in sorted(expected.keys() & stored.keys()):
+            for column, value, want in zip(columns, stored[code], expected[code]):
+                if value != want:
+                    problems.append(f"{table}: {code}.{column} 为 {value!r}，重算结果为 {want!r}")
+    return problems
+
+def has_stats_triggers(cursor: sqlite3.Cursor) -> bool:
+    """
+    判断数据库中是否已有维护统计表的触发器
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'airport_stats_insert'")
+    return cursor.fetchone() is not None
+
+def create_database_schema(conn: sqlite3.Connection) -> None:
+    """
+    创建数据库表结构
+    
+    Args:
+        conn: SQLite数据库连接
+    """
+    create_tables(conn)
+    create_indexes(conn)
     
     conn.commit()
     print("数据库表结构创建完成")
@@ -132,251 +538,673 @@ def get_or_create_address(cursor: sqlite3.Cursor, country: str, region: str, mun
     
     return cursor.lastrowid
 
-def convert_csv_to_sqlite(csv_file_path: str, db_file_path: str) -> None:
+class AddressCache:
+    """
+    地址ID的内存缓存，以 (country, region, municipality) 为键
+    
+    批量导入时用字典代替逐行的 SELECT 查询，新地址的ID在内存中预先分配，
+    并攒成一批后通过 executemany 写入address表。
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self.ids: Dict[Tuple[str, Optional[str], Optional[str]], int] = {}
+        self.pending: List[tuple] = []
+        self.created = 0
+
+        cursor.execute("SELECT id, country, region, municipality FROM address")
+        max_id = 0
+        for address_id, country, region, municipality in cursor.fetchall():
+            self.ids[(country, region, municipality)] = address_id
+            max_id = max(max_id, address_id)
+        self.next_id = max_id + 1
+
+    def resolve(self, country: Optional[str], region: Optional[str], municipality: Optional[str],
+                names: Optional[Tuple[Optional[str], Optional[str]]] = None) -> Optional[int]:
+        """
+        返回地址ID，不存在时分配新ID并加入待写入队列
+        
+        names 为预先转换好的 (country_name, region_name)，为None时在此转换
+        """
+        if not country:
+            return None
+
+        key = (country, region, municipality)
+        address_id = self.ids.get(key)
+        if address_id is not None:
+            return address_id
+
+        address_id = self.next_id
+        self.next_id += 1
+        self.ids[key] = address_id
+
+        if names is None:
+            names = address_names(country, region)
+        country_name, region_name = names
+        self.pending.append((address_id, country, region, municipality, country_name, region_name))
+        self.created += 1
+        return address_id
+
+    def flush(self, cursor: sqlite3.Cursor) -> None:
+        """
+        将待写入的新地址批量插入address表
+        """
+        if not self.pending:
+            return
+        cursor.executemany("""
+            INSERT INTO address (id, country, region, municipality, country_name, region_name)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, self.pending)
+        self.pending = []
+
+def address_names(country: Optional[str], region: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    转换ISO代码为真实名称，返回 (country_name, region_name)
+    """
+    country_name = get_country_name(country) if country else None
+    region_name = get_full_region_name(country, region) if region else None
+    return country_name, region_name
+
+def parse_airport_row(row: Dict[str, str], row_num: int, warnings: List[Tuple[int, str]]) -> Optional[tuple]:
+    """
+    清洗并校验一行CSV数据
+    
+    Args:
+        row: csv.DictReader 读出的一行
+        row_num: 该行在CSV文件中的行号
+        warnings: 警告列表，追加 (行号, 警告内容)
+        
+    Returns:
+        按 AIRPORT_FIELDS 顺序排列的字段元组，缺少ident时返回None
+    """
+    # 获取经纬度
+    lat_str = row.get('latitude_deg', '').strip()
+    lon_str = row.get('longitude_deg', '').strip()
+    
+    latitude = None
+    longitude = None
+    
+    if lat_str and lon_str:
+        try:
+            latitude = float(lat_str)
+            longitude = float(lon_str)
+            
+            # 验证经纬度范围
+            if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+                warnings.append((row_num, "经纬度超出有效范围"))
+                latitude = longitude = None
+        except ValueError:
+            warnings.append((row_num, "经纬度格式错误"))
+    
+    # 处理海拔高度
+    elevation_ft = None
+    elevation_str = row.get('elevation_ft', '').strip()
+    if elevation_str:
+        try:
+            elevation_ft = int(float(elevation_str))
+        except ValueError:
+            pass
+    
+    # 处理其他字段
+    ident = row.get('ident', '').strip()
+    if not ident:
+        warnings.append((row_num, "缺少ident字段，跳过"))
+        return None
+    
+    return (
+        ident,
+        row.get('type', '').strip() or None,
+        row.get('name', '').strip() or None,
+        latitude,
+        longitude,
+        elevation_ft,
+        row.get('iso_country', '').strip() or None,
+        row.get('iso_region', '').strip() or None,
+        row.get('municipality', '').strip() or None,
+        row.get('icao_code', '').strip() or None,
+        row.get('iata_code', '').strip() or None,
+        row.get('gps_code', '').strip() or None,
+        row.get('local_code', '').strip() or None,
+        row.get('home_link', '').strip() or None,
+        row.get('wikipedia_link', '').strip() or None,
+        row.get('keywords', '').strip() or None,
+    )
+
+def table_exists(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    """
+    判断数据库中是否存在指定的表
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+    return cursor.fetchone() is not None
+
+def record_hash(record: tuple) -> str:
+    """
+    计算机场记录（AIRPORT_FIELDS 字段元组）的内容哈希
+    """
+    return hashlib.blake2b(repr(record).encode('utf-8'), digest_size=16).hexdigest()
+
+def print_warnings(warnings: List[Tuple[int, str]], row_offset: int = 0) -> None:
+    """
+    输出并清空警告列表
+    """
+    for row_num, message in warnings:
+        print(f"警告: 第{row_num + row_offset}行{message}")
+    warnings.clear()
+
+def load_row_by_row(conn: sqlite3.Connection, csv_file_path: str) -> Tuple[int, int, int]:
+    """
+    逐行导入：每行查询/创建地址并单独插入机场记录，每1000条提交一次
+    
+    Returns:
+        (机场记录数, 新地址数, 错误记录数)
+    """
+    cursor = conn.cursor()
+    airport_count = 0
+    address_count = 0
+    error_count = 0
+    warnings: List[Tuple[int, str]] = []
+    
+    with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        
+        for row_num, row in enumerate(reader, start=2):
+            try:
+                record = parse_airport_row(row, row_num, warnings)
+                print_warnings(warnings)
+                if record is None:
+                    continue
+                
+                # 获取或创建地址记录
+                country, region, municipality = record[6], record[7], record[8]
+                address_id = None
+                if country:
+                    address_id = get_or_create_address(cursor, country, region, municipality)
+                    if cursor.rowcount > 0:  # 新创建的地址
+                        address_count += 1
+                
+                # 插入机场记录
+                cursor.execute(INSERT_AIRPORT_SQL, record + (address_id,))
+                
+                airport_count += 1
+                
+                # 每1000条记录提交一次
+                if airport_count % 1000 == 0:
+                    conn.commit()
+                    print(f"已处理 {airport_count} 条机场记录...")
+                    
+            except Exception as e:
+                error_count += 1
+                print(f"错误: 处理第{row_num}行时出错: {e}")
+                continue
+    
+    conn.commit()
+    return airport_count, address_count, error_count
+
+def load_bulk(conn: sqlite3.Connection, csv_file_path: str, batch_size: int = BULK_BATCH_SIZE) -> Tuple[int, int, int]:
+    """
+    批量导入：地址ID通过内存字典解析，机场记录缓存后用 executemany 分大事务写入
+    
+    Returns:
+        (机场记录数, 新地址数, 错误记录数)
+    """
+    cursor = conn.cursor()
+    addresses = AddressCache(cursor)
+    buffer: List[tuple] = []
+    airport_count = 0
+    error_count = 0
+    warnings: List[Tuple[int, str]] = []
+    
+    with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        
+        for row_num, row in enumerate(reader, start=2):
+            try:
+                record = parse_airport_row(row, row_num, warnings)
+                if warnings:
+                    print_warnings(warnings)
+                if record is None:
+                    continue
+                
+                address_id = addresses.resolve(record[6], record[7], record[8])
+                buffer.append(record + (address_id,))
+            except Exception as e:
+                error_count += 1
+                print(f"错误: 处理第{row_num}行时出错: {e}")
+                continue
+            
+            if len(buffer) >= batch_size:
+                addresses.flush(cursor)
+                cursor.executemany(INSERT_AIRPORT_SQL, buffer)
+                conn.commit()
+                airport_count += len(buffer)
+                buffer = []
+                print(f"已处理 {airport_count} 条机场记录...")
+    
+    addresses.flush(cursor)
+    cursor.executemany(INSERT_AIRPORT_SQL, buffer)
+    conn.commit()
+    airport_count += len(buffer)
+    return airport_count, addresses.created, error_count
+
+def rebuild_source_hashes(cursor: sqlite3.Cursor) -> None:
+    """
+    根据airport表的现有内容重建airport_source_hash表
+    """
+    cursor.execute("DELETE FROM airport_source_hash")
+    cursor.execute(f"SELECT {', '.join(AIRPORT_FIELDS)} FROM airport")
+    hashes = [(record[0], record_hash(record)) for record in cursor.fetchall()]
+    cursor.executemany("INSERT INTO airport_source_hash (ident, hash) VALUES (?, ?)", hashes)
+
+def split_csv_chunks(csv_file_path: str, num_chunks: int) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    按字节范围把CSV数据部分切分为若干块，切分点总是落在引号之外的换行符之后，
+    因此字段内包含换行的记录不会被切断
+    
+    Returns:
+        (表头行文本, [(起始字节, 结束字节), ...])
+    """
+    with open(csv_file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return "", []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end = data.find(b'\n') + 1 or size
+            header = data[:header_end].decode('utf-8')
+            
+            boundaries = [header_end]
+            pos = header_end
+            quotes = 0
+            for i in range(1, num_chunks):
+                target = header_end + (size - header_end) * i // num_chunks
+                if target <= pos:
+                    continue
+                quotes += data[pos:target].count(b'"')
+                pos = target
+                # 前进到引号配对完整的下一个换行符
+                while pos < size:
+                    newline = data.find(b'\n', pos)
+                    if newline == -1:
+                        pos = size
+                        break
+                    quotes += data[pos:newline].count(b'"')
+                    pos = newline + 1
+                    if quotes % 2 == 0:
+                        break
+                if pos >= size:
+                    break
+                boundaries.append(pos)
+            boundaries.append(size)
+    
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+def parse_csv_chunk(args: Tuple[str, str, int, int]) -> Tuple[int, List[tuple], List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    工作进程：解析一个字节范围内的CSV记录
+    
+    行号从0开始按块内记录计数，由写入进程加上前面各块的记录数还原为文件中的行号。
+    
+    Returns:
+        (块内记录数, [(字段元组, 地址名称)], 警告列表, 错误列表)
+    """
+    csv_file_path, header, start, end = args
+    with open(csv_file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    
+    fieldnames = next(csv.reader(io.StringIO(header, newline=None)))
+    reader = csv.DictReader(io.StringIO(text, newline=None), fieldnames=fieldnames)
+    
+    results: List[tuple] = []
+    warnings: List[Tuple[int, str]] = []
+    errors: List[Tuple[int, str]] = []
+    row_count = 0
+    for row_count, row in enumerate(reader, start=1):
+        try:
+            record = parse_airport_row(row, row_count - 1, warnings)
+            if record is not None:
+                results.append((record, address_names(record[6], record[7])))
+        except Exception as e:
+            errors.append((row_count - 1, str(e)))
+    return row_count, results, warnings, errors
+
+def load_parallel(conn: sqlite3.Connection, csv_file_path: str, workers: int,
+                  batch_size: int = BULK_BATCH_SIZE) -> Tuple[int, int, int]:
+    """
+    并行导入：CSV按字节范围分块，由进程池解析和校验，
+    当前进程作为唯一的写入进程按块顺序写入数据库
+    
+    Returns:
+        (机场记录数, 新地址数, 错误记录数)
+    """
+    cursor = conn.cursor()
+    addresses = AddressCache(cursor)
+    header, chunks = split_csv_chunks(csv_file_path, workers * CHUNKS_PER_WORKER)
+    tasks = [(csv_file_path, header, start, end) for start, end in chunks]
+    buffer: List[tuple] = []
+    airport_count = 0
+    error_count = 0
+    row_offset = 2
+    
+    with multiprocessing.Pool(workers) as pool:
+        # imap 按提交顺序返回结果，保证与串行导入的写入顺序一致
+        for row_count, results, warnings, errors in pool.imap(parse_csv_chunk, tasks):
+            print_warnings(warnings, row_offset)
+            for row_num, message in errors:
+                print(f"错误: 处理第{row_num + row_offset}行时出错: {message}")
+            error_count += len(errors)
+            row_offset += row_count
+            
+            for record, names in results:
+                address_id = addresses.resolve(record[6], record[7], record[8], names)
+                buffer.append(record + (address_id,))
+            
+            if len(buffer) >= batch_size:
+                addresses.flush(cursor)
+                cursor.executemany(INSERT_AIRPORT_SQL, buffer)
+                conn.commit()
+                airport_count += len(buffer)
+                buffer = []
+                print(f"已处理 {airport_count} 条机场记录...")
+    
+    addresses.flush(cursor)
+    cursor.executemany(INSERT_AIRPORT_SQL, buffer)
+    conn.commit()
+    airport_count += len(buffer)
+    return airport_count, addresses.created, error_count
+
+def print_summary(cursor: sqlite3.Cursor, csv_file_path: str, db_file_path: str, error_count: int) -> None:
+    """
+    输出转换结果统计
+    """
+    # 统计信息
+    cursor.execute("SELECT COUNT(*) FROM airport")
+    total_airports = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(*) FROM address")
+    total_addresses = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(*) FROM country_stats")
+    total_countries = cursor.fetchone()[0]
+    
+    print(f"\n转换完成！")
+    print(f"输入文件: {csv_file_path}")
+    print(f"输出数据库: {db_file_path}")
+    print(f"总机场数: {total_airports}")
+    print(f"总地址数: {total_addresses}")
+    print(f"总国家数: {total_countries}")
+    print(f"错误记录数: {error_count}")
+    
+    # 显示一些统计信息
+    cursor.execute("""
+        SELECT type, COUNT(*) as count 
+        FROM airport 
+        WHERE type IS NOT NULL 
+        GROUP BY type 
+        ORDER BY count DESC 
+        LIMIT 10
+    """)
+    
+    print("\n机场类型统计（前10）:")
+    for airport_type, count in cursor.fetchall():
+        print(f"  {airport_type}: {count}")
+    
+    cursor.execute("""
+        SELECT country, COUNT(*) as count 
+        FROM address 
+        GROUP BY country 
+        ORDER BY count DESC 
+        LIMIT 10
+    """)
+    
+    print("\n国家统计（前10）:")
+    for country, count in cursor.fetchall():
+        print(f"  {country}: {count}")
+    
+    # 显示地址区域的机场统计
+    cursor.execute("""
+        SELECT 
+            COALESCE(a.country_name, a.country) as country_display,
+            COALESCE(a.region_name, a.region) as region_display,
+            a.municipality, 
+            COUNT(ap.id) as airport_count
+        FROM address a
+        LEFT JOIN airport ap ON a.id = ap.address_id
+        GROUP BY a.country, a.region, a.municipality
+        HAVING airport_count > 0
+        ORDER BY airport_count DESC
+        LIMIT 15
+    """)
+    
+    print("\n地址区域机场统计（前15）:")
+    for country_display, region_display, municipality, airport_count in cursor.fetchall():
+        location = f"{country_display}"
+        if region_display:
+            location += f", {region_display}"
+        if municipality:
+            location += f", {municipality}"
+        print(f"  {location}: {airport_count} 个机场")
+    
+    # 显示国家统计
+    print("\n国家机场统计 (前15个):")
+    cursor.execute("""
+        SELECT 
+            COALESCE(country_name, country_code) as country_display,
+            airport_count
+        FROM country_stats
+        ORDER BY airport_count DESC
+        LIMIT 15
+    """)
+    
+    for country_display, airport_count in cursor.fetchall():
+        print(f"  {country_display}: {airport_count} 个机场")
+    
+    print("\n数据库创建完成！")
+
+def convert_csv_to_sqlite(csv_file_path: str, db_file_path: str, mode: str = "bulk", show_summary: bool = True,
+                          workers: int = 1) -> float:
     """
     将CSV文件转换为SQLite数据库
     
     Args:
         csv_file_path: 输入CSV文件路径
         db_file_path: 输出SQLite数据库文件路径
+        mode: 导入模式，"bulk" 为批量导入，"row" 为逐行导入
+        show_summary: 是否输出统计信息
+        workers: 批量导入时的解析进程数，大于1时并行解析
+        
+    Returns:
+        导入数据（含建索引和统计表）所用的秒数
     """
     try:
         # 连接数据库
         conn = sqlite3.connect(db_file_path)
         cursor = conn.cursor()
         
-        # 创建表结构
+        start = time.perf_counter()
+        if table_exists(cursor, "airport"):
+            drop_spatial_triggers(cursor)
+            drop_search_triggers(cursor)
+            drop_stats_triggers(cursor)
+        if mode == "row":
+            # 创建表结构
+            create_database_schema(conn)
+            airport_count, address_count, error_count = load_row_by_row(conn, csv_file_path)
+        else:
+            # 批量导入时关闭同步写盘，二级索引在数据写入后统一创建
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA journal_mode = MEMORY").fetchone()
+            create_tables(conn)
+            conn.commit()
+            if workers > 1:
+                airport_count, address_count, error_count = load_parallel(conn, csv_file_path, workers)
+            else:
+                airport_count, address_count, error_count = load_bulk(conn, csv_file_path)
+            print("正在创建索引...")
+            create_indexes(conn)
+            conn.commit()
+        
+        # 填充国家和地区统计表
+        print("\n正在生成国家和地区统计数据...")
+        build_stats(cursor)
+        rebuild_source_hashes(cursor)
+        print("正在创建空间索引和全文索引...")
+        build_spatial_index(cursor)
+        build_search_index(cursor)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        
+        if mode != "row" and workers > 1:
+            mode = f"{mode}, {workers} 个解析进程"
+        print(f"\n导入模式: {mode}，新增地址: {address_count}，导入耗时: {elapsed:.2f} 秒")
+        if show_summary:
+            print_summary(cursor, csv_file_path, db_file_path, error_count)
+        return elapsed
+         
+    except FileNotFoundError:
+        print(f"错误: 找不到文件 {csv_file_path}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误: 转换过程中出错: {e}")
+        sys.exit(1)
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+def incremental_update(csv_file_path: str, db_file_path: str) -> None:
+    """
+    增量更新已有数据库：按ident比对内容哈希，只写入新增、变更和删除的记录，
+    国家和地区统计由airport表上的触发器同步
+    
+    Args:
+        csv_file_path: 输入CSV文件路径
+        db_file_path: 已有的SQLite数据库文件路径
+    """
+    if not os.path.exists(db_file_path):
+        print(f"数据库 {db_file_path} 不存在，执行完整导入")
+        convert_csv_to_sqlite(csv_file_path, db_file_path)
+        return
+    
+    try:
+        conn = sqlite3.connect(db_file_path)
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        has_spatial_index = table_exists(cursor, "airport_rtree")
+        has_search_index = table_exists(cursor, "airport_fts")
         create_database_schema(conn)
+        # 旧数据库没有空间索引或全文索引时，先根据现有记录建立，之后由触发器同步
+        if not has_spatial_index:
+            print("正在创建空间索引...")
+            build_spatial_index(cursor)
+        if not has_search_index:
+            print("正在创建全文索引...")
+            build_search_index(cursor)
+        if not has_stats_triggers(cursor):
+            print("正在生成统计表并创建统计触发器...")
+            build_stats(cursor)
         
-        # 读取CSV文件
+        cursor.execute("SELECT ident, hash FROM airport_source_hash")
+        stored = dict(cursor.fetchall())
+        if not stored:
+            # 旧数据库没有哈希表，先根据现有记录补齐
+            print("哈希表为空，根据现有记录生成...")
+            rebuild_source_hashes(cursor)
+            cursor.execute("SELECT ident, hash FROM airport_source_hash")
+            stored = dict(cursor.fetchall())
+        
+        # 解析CSV，同一ident出现多次时以最后一行为准
+        latest: Dict[str, Tuple[tuple, str]] = {}
+        error_count = 0
+        warnings: List[Tuple[int, str]] = []
         with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
-            
-            airport_count = 0
-            address_count = 0
-            error_count = 0
-            
             for row_num, row in enumerate(reader, start=2):
                 try:
-                    # 获取经纬度
-                    lat_str = row.get('latitude_deg', '').strip()
-                    lon_str = row.get('longitude_deg', '').strip()
-                    
-                    latitude = None
-                    longitude = None
-                    
-                    if lat_str and lon_str:
-                        try:
-                            latitude = float(lat_str)
-                            longitude = float(lon_str)
-                            
-                            # 验证经纬度范围
-                            if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-                                print(f"警告: 第{row_num}行经纬度超出有效范围")
-                                latitude = longitude = None
-                        except ValueError:
-                            print(f"警告: 第{row_num}行经纬度格式错误")
-                    
-                    # 处理海拔高度
-                    elevation_ft = None
-                    elevation_str = row.get('elevation_ft', '').strip()
-                    if elevation_str:
-                        try:
-                            elevation_ft = int(float(elevation_str))
-                        except ValueError:
-                            pass
-                    
-                    # 获取或创建地址记录
-                    country = row.get('iso_country', '').strip()
-                    region = row.get('iso_region', '').strip()
-                    municipality = row.get('municipality', '').strip()
-                    
-                    address_id = None
-                    if country:
-                        address_id = get_or_create_address(cursor, country, region, municipality)
-                        if cursor.rowcount > 0:  # 新创建的地址
-                            address_count += 1
-                    
-                    # 处理其他字段
-                    ident = row.get('ident', '').strip()
-                    if not ident:
-                        print(f"警告: 第{row_num}行缺少ident字段，跳过")
-                        continue
-                    
-                    airport_type = row.get('type', '').strip() or None
-                    name = row.get('name', '').strip() or None
-                    icao_code = row.get('icao_code', '').strip() or None
-                    iata_code = row.get('iata_code', '').strip() or None
-                    gps_code = row.get('gps_code', '').strip() or None
-                    local_code = row.get('local_code', '').strip() or None
-                    home_link = row.get('home_link', '').strip() or None
-                    wikipedia_link = row.get('wikipedia_link', '').strip() or None
-                    keywords = row.get('keywords', '').strip() or None
-                    
-                    # 插入机场记录
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO airport (
-                            ident, type, name, latitude_deg, longitude_deg, 
-                            elevation_ft, iso_country, iso_region, municipality,
-                            icao_code, iata_code, gps_code, local_code,
-                            home_link, wikipedia_link, keywords, address_id
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        ident, airport_type, name, latitude, longitude,
-                        elevation_ft, country or None, region or None, municipality or None,
-                        icao_code, iata_code, gps_code, local_code,
-                        home_link, wikipedia_link, keywords, address_id
-                    ))
-                    
-                    airport_count += 1
-                    
-                    # 每1000条记录提交一次
-                    if airport_count % 1000 == 0:
-                        conn.commit()
-                        print(f"已处理 {airport_count} 条机场记录...")
-                        
+                    record = parse_airport_row(row, row_num, warnings)
+                    if warnings:
+                        print_warnings(warnings)
+                    if record is not None:
+                        latest[record[0]] = (record, record_hash(record))
                 except Exception as e:
                     error_count += 1
                     print(f"错误: 处理第{row_num}行时出错: {e}")
-                    continue
         
-        # 最终提交
-        conn.commit()
+        inserts = [record for ident, (record, h) in latest.items() if ident not in stored]
+        updates = [record for ident, (record, h) in latest.items() if ident in stored and stored[ident] != h]
+        deletes = [ident for ident in stored if ident not in latest]
         
-        # 填充国家统计表
-        print("\n正在生成国家统计数据...")
-        cursor.execute("""
-            INSERT OR REPLACE INTO country_stats (
-                country_code, country_name, airport_count, 
-                large_airport_count, medium_airport_count, small_airport_count,
-                heliport_count, seaplane_base_count, other_count, last_updated
-            )
-            SELECT 
-                a.iso_country as country_code,
-                addr.country_name,
-                COUNT(a.id) as airport_count,
-                SUM(CASE WHEN a.type = 'large_airport' THEN 1 ELSE 0 END) as large_airport_count,
-                SUM(CASE WHEN a.type = 'medium_airport' THEN 1 ELSE 0 END) as medium_airport_count,
-                SUM(CASE WHEN a.type = 'small_airport' THEN 1 ELSE 0 END) as small_airport_count,
-                SUM(CASE WHEN a.type = 'heliport' THEN 1 ELSE 0 END) as heliport_count,
-                SUM(CASE WHEN a.type = 'seaplane_base' THEN 1 ELSE 0 END) as seaplane_base_count,
-                SUM(CASE WHEN a.type NOT IN ('large_airport', 'medium_airport', 'small_airport', 'heliport', 'seaplane_base') OR a.type IS NULL THEN 1 ELSE 0 END) as other_count,
-                CURRENT_TIMESTAMP as last_updated
-            FROM airport a
-            LEFT JOIN address addr ON a.address_id = addr.id
-            WHERE a.iso_country IS NOT NULL
-            GROUP BY a.iso_country, addr.country_name
-        """)
+        addresses = AddressCache(cursor)
+        rows = [record + (addresses.resolve(record[6], record[7], record[8]),) for record in inserts + updates]
+        # 地址连同名称要在写入机场前写入，统计触发器从address读取国家和地区名称
+        addresses.flush(cursor)
+        cursor.executemany(UPSERT_AIRPORT_SQL, rows)
+        cursor.executemany("DELETE FROM airport WHERE ident = ?", [(ident,) for ident in deletes])
         
+        cursor.executemany(
+            "INSERT OR REPLACE INTO airport_source_hash (ident, hash) VALUES (?, ?)",
+            [(record[0], latest[record[0]][1]) for record in inserts + updates],
+        )
+        cursor.executemany("DELETE FROM airport_source_hash WHERE ident = ?", [(ident,) for ident in deletes])
         conn.commit()
+        elapsed = time.perf_counter() - start
         
-        # 统计信息
-        cursor.execute("SELECT COUNT(*) FROM airport")
-        total_airports = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM address")
-        total_addresses = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM country_stats")
-        total_countries = cursor.fetchone()[0]
-        
-        print(f"\n转换完成！")
+        print(f"\n增量更新完成！")
         print(f"输入文件: {csv_file_path}")
-        print(f"输出数据库: {db_file_path}")
-        print(f"总机场数: {total_airports}")
-        print(f"总地址数: {total_addresses}")
-        print(f"总国家数: {total_countries}")
+        print(f"数据库: {db_file_path}")
+        print(f"新增: {len(inserts)}，更新: {len(updates)}，删除: {len(deletes)}，未变化: {len(latest) - len(inserts) - len(updates)}")
+        print(f"新增地址: {addresses.created}")
         print(f"错误记录数: {error_count}")
+        print(f"耗时: {elapsed:.2f} 秒")
         
-        # 显示一些统计信息
-        cursor.execute("""
-            SELECT type, COUNT(*) as count 
-            FROM airport 
-            WHERE type IS NOT NULL 
-            GROUP BY type 
-            ORDER BY count DESC 
-            LIMIT 10
-        """)
-        
-        print("\n机场类型统计（前10）:")
-        for airport_type, count in cursor.fetchall():
-            print(f"  {airport_type}: {count}")
-        
-        cursor.execute("""
-            SELECT country, COUNT(*) as count 
-            FROM address 
-            GROUP BY country 
-            ORDER BY count DESC 
-            LIMIT 10
-        """)
-        
-        print("\n国家统计（前10）:")
-        for country, count in cursor.fetchall():
-            print(f"  {country}: {count}")
-        
-        # 显示地址区域的机场统计
-        cursor.execute("""
-            SELECT 
-                COALESCE(a.country_name, a.country) as country_display,
-                COALESCE(a.region_name, a.region) as region_display,
-                a.municipality, 
-                COUNT(ap.id) as airport_count
-            FROM address a
-            LEFT JOIN airport ap ON a.id = ap.address_id
-            GROUP BY a.country, a.region, a.municipality
-            HAVING airport_count > 0
-            ORDER BY airport_count DESC
-            LIMIT 15
-        """)
-        
-        print("\n地址区域机场统计（前15）:")
-        for country_display, region_display, municipality, airport_count in cursor.fetchall():
-            location = f"{country_display}"
-            if region_display:
-                location += f", {region_display}"
-            if municipality:
-                location += f", {municipality}"
-            print(f"  {location}: {airport_count} 个机场")
-        
-        # 显示国家统计
-        print("\n国家机场统计 (前15个):")
-        cursor.execute("""
-            SELECT 
-                COALESCE(country_name, country_code) as country_display,
-                airport_count
-            FROM country_stats
-            ORDER BY airport_count DESC
-            LIMIT 15
-        """)
-        
-        for country_display, airport_count in cursor.fetchall():
-            print(f"  {country_display}: {airport_count} 个机场")
-        
-        print("\n数据库创建完成！")
-         
     except FileNotFoundError:
         print(f"错误: 找不到文件 {csv_file_path}")
         sys.exit(1)
     except Exception as e:
-        print(f"错误: 转换过程中出错: {e}")
+        print(f"错误: 增量更新过程中出错: {e}")
         sys.exit(1)
     finally:
         if 'conn' in locals():
             conn.close()
 
+def compare_modes(csv_file_path: str, db_file_path: str) -> None:
+    """
+    分别用逐行模式（写入临时文件）和批量模式（写入目标文件）导入，输出加速比
+    """
+    out_dir = os.path.dirname(os.path.abspath(db_file_path))
+    fd, row_db_path = tempfile.mkstemp(suffix=".db", dir=out_dir)
+    os.close(fd)
+    try:
+        row_elapsed = convert_csv_to_sqlite(csv_file_path, row_db_path, mode="row", show_summary=False)
+    finally:
+        os.remove(row_db_path)
+    bulk_elapsed = convert_csv_to_sqlite(csv_file_path, db_file_path, mode="bulk")
+    
+    print(f"\n逐行模式: {row_elapsed:.2f} 秒")
+    print(f"批量模式: {bulk_elapsed:.2f} 秒")
+    print(f"加速比: {row_elapsed / bulk_elapsed:.1f} 倍")
+
 def main():
     """
     主函数
     """
-    if len(sys.argv) != 3:
-        print("用法: python csv_to_sqlite.py <输入CSV文件> <输出SQLite数据库文件>")
-        print("示例: python csv_to_sqlite.py airports.csv airports.db")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="将机场CSV数据转换为SQLite数据库",
+        epilog="示例: python csv_to_sqlite.py airports.csv airports.db",
+    )
+    parser.add_argument("input_file", help="输入CSV文件")
+    parser.add_argument("output_file", help="输出SQLite数据库文件")
+    parser.add_argument("--row-by-row", action="store_true", help="使用逐行导入（旧模式）")
+    parser.add_argument("--compare", action="store_true", help="对比逐行模式与批量模式的耗时")
+    parser.add_argument("--incremental", action="store_true", help="按内容哈希增量更新已有数据库")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="批量导入时的CSV解析进程数，大于1时启用多进程解析（默认: 1）")
+    args = parser.parse_args()
     
-    convert_csv_to_sqlite(input_file, output_file)
+    if args.incremental:
+        incremental_update(args.input_file, args.output_file)
+    elif args.compare:
+        compare_modes(args.input_file, args.output_file)
+    else:
+        convert_csv_to_sqlite(args.input_file, args.output_file, mode="row" if args.row_by_row else "bulk",
+                              workers=args.workers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
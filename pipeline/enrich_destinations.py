@@ -3,109 +3,118 @@
 """
 Enrich destinations.json with latitude/longitude from airports.db
 - For each airport in direct_flights, look up coords by ICAO or IATA
+  (code_resolver loads all codes in one pass; ambiguous codes are reported)
 - Adds `latitude_deg` and `longitude_deg` to each airport entry
-- Writes a backup of the original file and updates the original JSON in-place
+- Streams departure records one at a time into a temp file (constant memory,
+  one read and one write pass), then atomically renames it over the original;
+  the original is kept as the backup via a hard link instead of a copy
 """
 
-import json
+import argparse
 import os
 import sqlite3
 import sys
 
+from code_resolver import CodeResolver
+from json_stream import iter_json_array, write_json_array
+
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(ROOT, 'pipeline', 'airports.db')
 JSON_PATH = os.path.join(ROOT, 'pipeline', 'destinations.json')
 BACKUP_PATH = os.path.join(ROOT, 'pipeline', 'destinations.backup.json')
 
 
-def is_valid(code: str) -> bool:
-    return isinstance(code, str) and code.strip() != ''
-
-
-def lookup_coords(cur: sqlite3.Cursor, icao: str, iata: str):
-    row = None
+def enrich_record(item, resolver, stats, ambiguous):
+    """为一个出发机场记录中 direct_flights 的机场补充经纬度"""
+    flights = item.get('direct_flights') if isinstance(item, dict) else None
+    if not isinstance(flights, list):
+        return item
+    for df in flights:
+        airports = df.get('airports') if isinstance(df, dict) else None
+        if not isinstance(airports, list):
+            continue
+        for ap in airports:
+            stats['total'] += 1
+            icao = ap.get('icao') or ''
+            iata = ap.get('iata') or ''
+            matched = resolver.match(icao, iata)
+            if matched:
+                field, code, location = matched
+                ap['latitude_deg'] = location.latitude_deg
+                ap['longitude_deg'] = location.longitude_deg
+                stats['enriched'] += 1
+                if (field, code) in resolver.ambiguous:
+                    ambiguous[(field, code)] = ambiguous.get((field, code), 0) + 1
+            else:
+                stats['missing'] += 1
+    return item
+
+
+def replace_with_backup(tmp_path, json_path, backup_path):
+    """
+    原文件保留为备份，临时文件原子地替换原文件
+
+    备份是原文件的硬链接（不复制内容），文件系统不支持硬链接时改为重命名。
+    """
+    if os.path.lexists(backup_path):
+        os.remove(backup_path)
     try:
-        if is_valid(icao):
-            row = cur.execute(
-                "SELECT latitude_deg, longitude_deg FROM airport WHERE UPPER(icao_code) = ? LIMIT 1",
-                (icao.strip().upper(),),
-            ).fetchone()
-        if row is None and is_valid(iata):
-            row = cur.execute(
-                "SELECT latitude_deg, longitude_deg FROM airport WHERE UPPER(iata_code) = ? LIMIT 1",
-                (iata.strip().upper(),),
-            ).fetchone()
-    except Exception:
-        row = None
-    return row
+        os.link(json_path, backup_path)
+    except OSError:
+        os.replace(json_path, backup_path)
+    os.replace(tmp_path, json_path)
 
 
 def main():
-    if not os.path.exists(DB_PATH):
-        print(f"错误: 找不到数据库 {DB_PATH}")
+    parser = argparse.ArgumentParser(description='为 destinations.json 的目的地补充经纬度')
+    parser.add_argument('--db', default=DB_PATH, help='airports.db 路径')
+    parser.add_argument('--json', default=JSON_PATH, help='destinations.json 路径')
+    parser.add_argument('--backup', default=BACKUP_PATH, help='原文件的备份路径')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到数据库 {args.db}")
         print("请先使用 pipeline 脚本生成 airports.db")
         sys.exit(1)
-    if not os.path.exists(JSON_PATH):
-        print(f"错误: 找不到 JSON 文件 {JSON_PATH}")
+    if not os.path.exists(args.json):
+        print(f"错误: 找不到 JSON 文件 {args.json}")
         sys.exit(1)
 
-    # 读取 JSON
     try:
-        with open(JSON_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"错误: 解析 JSON 失败: {e}")
+        resolver = CodeResolver.load(args.db)
+    except sqlite3.Error as e:
+        print(f"错误: 读取数据库失败: {e}")
         sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    total = 0
-    enriched = 0
-    missing = 0
+    stats = {'total': 0, 'enriched': 0, 'missing': 0}
+    ambiguous = {}
 
-    # 遍历 direct_flights 的机场
-    for item in data:
-        flights = item.get('direct_flights')
-        if not isinstance(flights, list):
-            continue
-        for df in flights:
-            airports = df.get('airports')
-            if not isinstance(airports, list):
-                continue
-            for ap in airports:
-                total += 1
-                icao = ap.get('icao') or ''
-                iata = ap.get('iata') or ''
-                row = lookup_coords(cur, icao, iata)
-                if row and row[0] is not None and row[1] is not None:
-                    ap['latitude_deg'] = row[0]
-                    ap['longitude_deg'] = row[1]
-                    enriched += 1
-                else:
-                    missing += 1
-
-    conn.close()
-
-    # 备份原文件
+    # 逐条读取出发机场记录，补充后写入临时文件，内存中只保留当前记录
+    tmp_path = args.json + '.tmp'
     try:
-        with open(JSON_PATH, 'r', encoding='utf-8') as f_in, open(BACKUP_PATH, 'w', encoding='utf-8') as f_bak:
-            f_bak.write(f_in.read())
-        print(f"🗂️  已生成备份: {BACKUP_PATH}")
-    except Exception as e:
-        print(f"错误: 写入备份失败: {e}")
+        with open(args.json, 'r', encoding='utf-8') as f_in, open(tmp_path, 'w', encoding='utf-8') as f_out:
+            records = (enrich_record(item, resolver, stats, ambiguous) for item in iter_json_array(f_in))
+            count = write_json_array(f_out, records)
+            f_out.flush()
+            os.fsync(f_out.fileno())
+    except (OSError, ValueError) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print(f"错误: 处理 JSON 失败: {e}")
         sys.exit(1)
 
-    # 写回更新后的 JSON
     try:
-        with open(JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"✅ 已补齐经纬度并写回: {JSON_PATH}")
-        print(f"总机场数: {total}, 已补齐: {enriched}, 缺失: {missing}")
-    except Exception as e:
-        print(f"错误: 写入更新后的 JSON 失败: {e}")
+        replace_with_backup(tmp_path, args.json, args.backup)
+    except OSError as e:
+        print(f"错误: 替换原文件失败: {e}")
         sys.exit(1)
+    print(f"🗂️  已生成备份: {args.backup}")
+    print(f"✅ 已补齐经纬度并写回: {args.json}")
+    print(f"出发机场: {count}, 总机场数: {stats['total']}, 已补齐: {stats['enriched']}, 缺失: {stats['missing']}")
+    for (field, code), n in sorted(ambiguous.items()):
+        ids = resolver.ambiguous[(field, code)]
+        print(f"⚠️  {field} {code} 被多个机场使用（{n} 处），已选用 id {ids[0]}，其他: {ids[1:]}")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
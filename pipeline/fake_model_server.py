@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local fake model server for get_destinations.py
+本地模拟模型服务，按 HTTPModelClient 的协议返回预设的直飞目的地JSON，
+用于在不调用Gemini的情况下测试和基准测试整个抓取流程：
+- 从prompt中解析出发机场的IATA/ICAO，按ICAO确定性地挑选目的地
+- 以逐行JSON分块流式输出，可设置响应延迟
+- 可按比例返回429/503，或按每分钟请求数限流，用于验证重试和限流
+- 可按比例输出出发机场不一致或结构错误的JSON，用于验证流式校验和提前中止
+- 支持多机场批量prompt，输出以ICAO为键，出错时可能遗漏部分机场
+- 可按输出速度（token/秒）模拟长输出的生成耗时，用于比较不同批量大小的吞吐
+
+示例:
+    python fake_model_server.py --port 8765 --csv airports.csv --latency 0.5
+    python get_destinations.py --model-url http://127.0.0.1:8765 --concurrency 16
+"""
+
+import argparse
+import csv
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+DEPARTURE_PATTERN = re.compile(r"获取 (.+?) \(IATA: (\w*), ICAO: (\w*)\)")
+# 批量prompt中每行一个出发机场
+BATCH_PATTERN = re.compile(r"^\d+\. (.+?) \(IATA: (\w*), ICAO: (\w*)\)$", re.MULTILINE)
+
+# 未提供CSV时使用的目的地
+DEFAULT_POOL = [
+    ("Beijing", "Beijing Capital International Airport", "PEK", "ZBAA"),
+    ("Beijing", "Beijing Daxing International Airport", "PKX", "ZBAD"),
+    ("Shanghai", "Shanghai Pudong International Airport", "PVG", "ZSPD"),
+    ("Shanghai", "Shanghai Hongqiao International Airport", "SHA", "ZSSS"),
+    ("Guangzhou", "Guangzhou Baiyun International Airport", "CAN", "ZGGG"),
+    ("Chengdu", "Chengdu Tianfu International Airport", "TFU", "ZUUU"),
+    ("Tokyo", "Tokyo Haneda Airport", "HND", "RJTT"),
+    ("Tokyo", "Narita International Airport", "NRT", "RJAA"),
+    ("Seoul", "Incheon International Airport", "ICN", "RKSI"),
+    ("Singapore", "Singapore Changi Airport", "SIN", "WSSS"),
+    ("Bangkok", "Suvarnabhumi Airport", "BKK", "VTBS"),
+    ("Dubai", "Dubai International Airport", "DXB", "OMDB"),
+    ("London", "London Heathrow Airport", "LHR", "EGLL"),
+    ("Paris", "Charles de Gaulle Airport", "CDG", "LFPG"),
+    ("Frankfurt", "Frankfurt Airport", "FRA", "EDDF"),
+    ("Amsterdam", "Amsterdam Airport Schiphol", "AMS", "EHAM"),
+    ("New York", "John F. Kennedy International Airport", "JFK", "KJFK"),
+    ("Los Angeles", "Los Angeles International Airport", "LAX", "KLAX"),
+    ("San Francisco", "San Francisco International Airport", "SFO", "KSFO"),
+    ("Sydney", "Sydney Kingsford Smith Airport", "SYD", "YSSY"),
+]
+
+
+def load_pool(csv_file: str) -> List[Tuple[str, str, str, str]]:
+    """从airports.csv读取有IATA和ICAO代码的大中型机场作为目的地"""
+    pool = []
+    with open(csv_file, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["type"] in ("large_airport", "medium_airport") and row["iata_code"] and row["icao_code"]:
+                pool.append((row["municipality"] or row["name"], row["name"], row["iata_code"], row["icao_code"]))
+    return pool or DEFAULT_POOL
+
+
+def canned_destinations(name: str, iata: str, icao: str, pool: List[Tuple[str, str, str, str]],
+                        min_routes: int, max_routes: int) -> Dict[str, Any]:
+    """按ICAO确定性地生成一个机场的直飞目的地"""
+    rng = random.Random(icao or iata or name)
+    count = min(len(pool), rng.randint(min_routes, max_routes))
+    cities: Dict[str, List[Dict[str, str]]] = {}
+    for city, airport_name, dest_iata, dest_icao in rng.sample(pool, count):
+        if dest_icao == icao:
+            continue
+        cities.setdefault(city, []).append({"name": airport_name, "iata": dest_iata, "icao": dest_icao})
+    return {
+        "departure_airport": {"name": name, "iata": iata, "icao": icao},
+        "direct_flights": [{"city": city, "airports": airports} for city, airports in cities.items()],
+    }
+
+
+class FakeModelServer(ThreadingHTTPServer):
+    """模拟模型服务，计数器可在进程内直接读取"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], pool: Optional[List[Tuple[str, str, str, str]]] = None,
+                 latency: float = 0.2, chunk_size: int = 256, error_rate: float = 0.0, bad_rate: float = 0.0,
+                 output_rate: Optional[float] = None,
+                 rpm_limit: Optional[int] = None, min_routes: int = 10, max_routes: int = 80, seed: int = 0):
+        super().__init__(address, FakeModelHandler)
+        self.pool = pool or DEFAULT_POOL
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.bad_rate = bad_rate
+        self.output_rate = output_rate
+        self.rpm_limit = rpm_limit
+        self.min_routes = min_routes
+        self.max_routes = max_routes
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent: deque = deque()
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "bad_output": 0, "aborted": 0,
+                      "in_flight": 0, "max_in_flight": 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self) -> Optional[int]:
+        """决定本次请求是否返回错误，返回错误状态码或None"""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.rpm_limit:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+                if len(self.recent) >= self.rpm_limit:
+                    self.stats["rate_limited"] += 1
+                    return 429
+                self.recent.append(now)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                status = self.rng.choice((429, 503))
+                self.stats["rate_limited" if status == 429 else "errors"] += 1
+                return status
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            return None
+
+    def release(self, ok: bool) -> None:
+        with self.lock:
+            self.stats["in_flight"] -= 1
+            self.stats["ok" if ok else "aborted"] += 1
+
+    def destinations(self, name: str, iata: str, icao: str, batch: bool) -> Optional[Dict[str, Any]]:
+        """一个出发机场的输出，按 bad_rate 出错；批量时出错也可能是遗漏该机场（返回None）"""
+        result = canned_destinations(name, iata, icao, self.pool, self.min_routes, self.max_routes)
+        with self.lock:
+            bad = self.bad_rate and self.rng.random() < self.bad_rate
+            if bad:
+                self.stats["bad_output"] += 1
+                mistake = self.rng.randrange(3 if batch else 2)
+        if not bad:
+            return result
+        if mistake == 0 and result["direct_flights"]:
+            # 后半段的一个目的地少了 airports 数组
+            flights = result["direct_flights"]
+            flights[len(flights) * 3 // 4]["airports"] = "unknown"
+        elif mistake == 2:
+            return None
+        else:
+            # 模型答成了另一个机场
+            result["departure_airport"]["icao"] = "XXXX"
+        return result
+
+    def render(self, prompt: str) -> str:
+        """根据prompt生成模型输出文本（带markdown代码块，和真实模型一样）"""
+        departures = BATCH_PATTERN.findall(prompt)
+        if departures:
+            output: Dict[str, Any] = {}
+            for name, iata, icao in departures:
+                result = self.destinations(name, iata, icao, batch=True)
+                if result is not None:
+                    output[icao] = result
+        else:
+            match = DEPARTURE_PATTERN.search(prompt)
+            name, iata, icao = match.groups() if match else ("Unknown Airport", "", "")
+            output = self.destinations(name, iata, icao, batch=False)
+        return "```json\n" + json.dumps(output, ensure_ascii=False, indent=2) + "\n```"
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    server: FakeModelServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/stats":
+            self.send_error(404)
+            return
+        with self.server.lock:
+            body = json.dumps(self.server.stats).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        if not self.path.endswith("/v1/generate"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length))
+            prompt = request["prompt"]
+        except (ValueError, KeyError):
+            self.send_error(400, "invalid request body")
+            return
+
+        status = self.server.admit()
+        if status is not None:
+            body = json.dumps({"error": "rate limited" if status == 429 else "unavailable"}).encode("utf-8")
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        ok = False
+        try:
+            text = self.server.render(prompt)
+            chunks = [text[i:i + self.server.chunk_size] for i in range(0, len(text), self.server.chunk_size)]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            output_tokens = max(1, len(text) // 4)
+            duration = self.server.latency
+            if self.server.output_rate:
+                duration += output_tokens / self.server.output_rate
+            delay = duration / max(1, len(chunks))
+            for chunk in chunks:
+                time.sleep(delay)
+                self.wfile.write(json.dumps({"text": chunk}, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+            usage = {"prompt_tokens": max(1, len(prompt) // 4), "output_tokens": output_tokens}
+            self.wfile.write(json.dumps({"usage": usage}).encode("utf-8") + b"\n")
+            ok = True
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.release(ok)
+
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> FakeModelServer:
+    """在后台线程启动模拟服务，port为0时自动选择端口"""
+    server = FakeModelServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟模型服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口（默认: 8765）")
+    parser.add_argument("--csv", default=None, help="从airports.csv选取目的地")
+    parser.add_argument("--latency", type=float, default=0.2, help="每个响应的总耗时，秒（默认: 0.2）")
+    parser.add_argument("--output-rate", type=float, default=None,
+                        help="输出速度，token/秒，提供时响应耗时再加上按输出长度计算的生成时间")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回429/503的比例（默认: 0）")
+    parser.add_argument("--bad-rate", type=float, default=0.0, help="输出错误JSON的比例（默认: 0）")
+    parser.add_argument("--rpm-limit", type=int, default=None, help="每分钟最多接受的请求数，超过返回429")
+    args = parser.parse_args()
+
+    pool = load_pool(args.csv) if args.csv else None
+    server = FakeModelServer((args.host, args.port), pool=pool, latency=args.latency,
+                             error_rate=args.error_rate, bad_rate=args.bad_rate,
+                             output_rate=args.output_rate, rpm_limit=args.rpm_limit)
+    print(f"模拟模型服务已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n统计: {json.dumps(server.stats, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
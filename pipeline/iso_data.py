@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ISO代码到真实名称的映射数据
+包含ISO 3166-1 alpha-2国家代码和ISO 3166-2地区代码的映射
+不要直接导入本模块，请通过 iso_mappings 中的访问函数使用（第一次使用时才加载）
+"""
+
+# ISO 3166-1 alpha-2 国家代码映射
+COUNTRY_CODES = {
+    'AD': 'Andorra',
+    'AE': 'United Arab Emirates',
+    'AF': 'Afghanistan',
+    'AG': 'Antigua and Barbuda',
+    'AI': 'Anguilla',
+    'AL': 'Albania',
+    'AM': 'Armenia',
+    'AO': 'Angola',
+    'AQ': 'Antarctica',
+    'AR': 'Argentina',
+    'AS': 'American Samoa',
+    'AT': 'Austria',
+    'AU': 'Australia',
+    'AW': 'Aruba',
+    'AX': 'Åland Islands',
+    'AZ': 'Azerbaijan',
+    'BA': 'Bosnia and Herzegovina',
+    'BB': 'Barbados',
+    'BD': 'Bangladesh',
+    'BE': 'Belgium',
+    'BF': 'Burkina Faso',
+    'BG': 'Bulgaria',
+    'BH': 'Bahrain',
+    'BI': 'Burundi',
+    'BJ': 'Benin',
+    'BL': 'Saint Barthélemy',
+    'BM': 'Bermuda',
+    'BN': 'Brunei Darussalam',
+    'BO': 'Bolivia',
+    'BQ': 'Bonaire, Sint Eustatius and Saba',
+    'BR': 'Brazil',
+    'BS': 'Bahamas',
+    'BT': 'Bhutan',
+    'BV': 'Bouvet Island',
+    'BW': 'Botswana',
+    'BY': 'Belarus',
+    'BZ': 'Belize',
+    'CA': 'Canada',
+    'CC': 'Cocos (Keeling) Islands',
+    'CD': 'Congo (Democratic Republic)',
+    'CF': 'Central African Republic',
+    'CG': 'Congo',
+    'CH': 'Switzerland',
+    'CI': 'Côte d\'Ivoire',
+    'CK': 'Cook Islands',
+    'CL': 'Chile',
+    'CM': 'Cameroon',
+    'CN': 'China',
+    'CO': 'Colombia',
+    'CR': 'Costa Rica',
+    'CU': 'Cuba',
+    'CV': 'Cabo Verde',
+    'CW': 'Curaçao',
+    'CX': 'Christmas Island',
+    'CY': 'Cyprus',
+    'CZ': 'Czechia',
+    'DE': 'Germany',
+    'DJ': 'Djibouti',
+    'DK': 'Denmark',
+    'DM': 'Dominica',
+    'DO': 'Dominican Republic',
+    'DZ': 'Algeria',
+    'EC': 'Ecuador',
+    'EE': 'Estonia',
+    'EG': 'Egypt',
+    'EH': 'Western Sahara',
+    'ER': 'Eritrea',
+    'ES': 'Spain',
+    'ET': 'Ethiopia',
+    'FI': 'Finland',
+    'FJ': 'Fiji',
+    'FK': 'Falkland Islands (Malvinas)',
+    'FM': 'Micronesia',
+    'FO': 'Faroe Islands',
+    'FR': 'France',
+    'GA': 'Gabon',
+    'GB': 'United Kingdom',
+    'GD': 'Grenada',
+    'GE': 'Georgia',
+    'GF': 'French Guiana',
+    'GG': 'Guernsey',
+    'GH': 'Ghana',
+    'GI': 'Gibraltar',
+    'GL': 'Greenland',
+    'GM': 'Gambia',
+    'GN': 'Guinea',
+    'GP': 'Guadeloupe',
+    'GQ': 'Equatorial Guinea',
+    'GR': 'Greece',
+    'GS': 'South Georgia and the South Sandwich Islands',
+    'GT': 'Guatemala',
+    'GU': 'Guam',
+    'GW': 'Guinea-Bissau',
+    'GY': 'Guyana',
+    'HK': 'Hong Kong',
+    'HM': 'Heard Island and McDonald Islands',
+    'HN': 'Honduras',
+    'HR': 'Croatia',
+    'HT': 'Haiti',
+    'HU': 'Hungary',
+    'ID': 'Indonesia',
+    'IE': 'Ireland',
+    'IL': 'Israel',
+    'IM': 'Isle of Man',
+    'IN': 'India',
+    'IO': 'British Indian Ocean Territory',
+    'IQ': 'Iraq',
+    'IR': 'Iran',
+    'IS': 'Iceland',
+    'IT': 'Italy',
+    'JE': 'Jersey',
+    'JM': 'Jamaica',
+    'JO': 'Jordan',
+    'JP': 'Japan',
+    'KE': 'Kenya',
+    'KG': 'Kyrgyzstan',
+    'KH': 'Cambodia',
+    'KI': 'Kiribati',
+    'KM': 'Comoros',
+    'KN': 'Saint Kitts and Nevis',
+    'KP': 'North Korea',
+    'KR': 'South Korea',
+    'KW': 'Kuwait',
+    'KY': 'Cayman Islands',
+    'KZ': 'Kazakhstan',
+    'LA': 'Laos',
+    'LB': 'Lebanon',
+    'LC': 'Saint Lucia',
+    'LI': 'Liechtenstein',
+    'LK': 'Sri Lanka',
+    'LR': 'Liberia',
+    'LS': 'Lesotho',
+    'LT': 'Lithuania',
+    'LU': 'Luxembourg',
+    'LV': 'Latvia',
+    'LY': 'Libya',
+    'MA': 'Morocco',
+    'MC': 'Monaco',
+    'MD': 'Moldova',
+    'ME': 'Montenegro',
+    'MF': 'Saint Martin (French part)',
+    'MG': 'Madagascar',
+    'MH': 'Marshall Islands',
+    'MK': 'North Macedonia',
+    'ML': 'Mali',
+    'MM': 'Myanmar',
+    'MN': 'Mongolia',
+    'MO': 'Macao',
+    'MP': 'Northern Mariana Islands',
+    'MQ': 'Martinique',
+    'MR': 'Mauritania',
+    'MS': 'Montserrat',
+    'MT': 'Malta',
+    'MU': 'Mauritius',
+    'MV': 'Maldives',
+    'MW': 'Malawi',
+    'MX': 'Mexico',
+    'MY': 'Malaysia',
+    'MZ': 'Mozambique',
+    'NA': 'Namibia',
+    'NC': 'New Caledonia',
+    'NE': 'Niger',
+    'NF': 'Norfolk Island',
+    'NG': 'Nigeria',
+    'NI': 'Nicaragua',
+    'NL': 'Netherlands',
+    'NO': 'Norway',
+    'NP': 'Nepal',
+    'NR': 'Nauru',
+    'NU': 'Niue',
+    'NZ': 'New Zealand',
+    'OM': 'Oman',
+    'PA': 'Panama',
+    'PE': 'Peru',
+    'PF': 'French Polynesia',
+    'PG': 'Papua New Guinea',
+    'PH': 'Philippines',
+    'PK': 'Pakistan',
+    'PL': 'Poland',
+    'PM': 'Saint Pierre and Miquelon',
+    'PN': 'Pitcairn',
+    'PR': 'Puerto Rico',
+    'PS': 'Palestine',
+    'PT': 'Portugal',
+    'PW': 'Palau',
+    'PY': 'Paraguay',
+    'QA': 'Qatar',
+    'RE': 'Réunion',
+    'RO': 'Romania',
+    'RS': 'Serbia',
+    'RU': 'Russian Federation',
+    'RW': 'Rwanda',
+    'SA': 'Saudi Arabia',
+    'SB': 'Solomon Islands',
+    'SC': 'Seychelles',
+    'SD': 'Sudan',
+    'SE': 'Sweden',
+    'SG': 'Singapore',
+    'SH': 'Saint Helena, Ascension and Tristan da Cunha',
+    'SI': 'Slovenia',
+    'SJ': 'Svalbard and Jan Mayen',
+    'SK': 'Slovakia',
+    'SL': 'Sierra Leone',
+    'SM': 'San Marino',
+    'SN': 'Senegal',
+    'SO': 'Somalia',
+    'SR': 'Suriname',
+    'SS': 'South Sudan',
+    'ST': 'Sao Tome and Principe',
+    'SV': 'El Salvador',
+    'SX': 'Sint Maarten (Dutch part)',
+    'SY': 'Syrian Arab Republic',
+    'SZ': 'Eswatini',
+    'TC': 'Turks and Caicos Islands',
+    'TD': 'Chad',
+    'TF': 'French Southern Territories',
+    'TG': 'Togo',
+    'TH': 'Thailand',
+    'TJ': 'Tajikistan',
+    'TK': 'Tokelau',
+    'TL': 'Timor-Leste',
+    'TM': 'Turkmenistan',
+    'TN': 'Tunisia',
+    'TO': 'Tonga',
+    'TR': 'Turkey',
+    'TT': 'Trinidad and Tobago',
+    'TV': 'Tuvalu',
+    'TW': 'Taiwan',
+    'TZ': 'Tanzania',
+    'UA': 'Ukraine',
+    'UG': 'Uganda',
+    'UM': 'United States Minor Outlying Islands',
+    'US': 'United States',
+    'UY': 'Uruguay',
+    'UZ': 'Uzbekistan',
+    'VA': 'Vatican City',
+    'VC': 'Saint Vincent and the Grenadines',
+    'VE': 'Venezuela',
+    'VG': 'Virgin Islands (British)',
+    'VI': 'Virgin Islands (U.S.)',
+    'VN': 'Viet Nam',
+    'VU': 'Vanuatu',
+    'WF': 'Wallis and Futuna',
+    'WS': 'Samoa',
+    'YE': 'Yemen',
+    'YT': 'Mayotte',
+    'ZA': 'South Africa',
+    'ZM': 'Zambia',
+    'ZW': 'Zimbabwe'
+}
+
+# 常见的ISO 3166-2地区代码映射（主要国家的州/省份）
+REGION_CODES = {
+    # 美国州代码
+    'US-AL': 'Alabama',
+    'US-AK': 'Alaska',
+    'US-AZ': 'Arizona',
+    'US-AR': 'Arkansas',
+    'US-CA': 'California',
+    'US-CO': 'Colorado',
+    'US-CT': 'Connecticut',
+    'US-DE': 'Delaware',
+    'US-FL': 'Florida',
+    'US-GA': 'Georgia',
+    'US-HI': 'Hawaii',
+    'US-ID': 'Idaho',
+    'US-IL': 'Illinois',
+    'US-IN': 'Indiana',
+    'US-IA': 'Iowa',
+    'US-KS': 'Kansas',
+    'US-KY': 'Kentucky',
+    'US-LA': 'Louisiana',
+    'US-ME': 'Maine',
+    'US-MD': 'Maryland',
+    'US-MA': 'Massachusetts',
+    'US-MI': 'Michigan',
+    'US-MN': 'Minnesota',
+    'US-MS': 'Mississippi',
+    'US-MO': 'Missouri',
+    'US-MT': 'Montana',
+    'US-NE': 'Nebraska',
+    'US-NV': 'Nevada',
+    'US-NH': 'New Hampshire',
+    'US-NJ': 'New Jersey',
+    'US-NM': 'New Mexico',
+    'US-NY': 'New York',
+    'US-NC': 'North Carolina',
+    'US-ND': 'North Dakota',
+    'US-OH': 'Ohio',
+    'US-OK': 'Oklahoma',
+    'US-OR': 'Oregon',
+    'US-PA': 'Pennsylvania',
+    'US-RI': 'Rhode Island',
+    'US-SC': 'South Carolina',
+    'US-SD': 'South Dakota',
+    'US-TN': 'Tennessee',
+    'US-TX': 'Texas',
+    'US-UT': 'Utah',
+    'US-VT': 'Vermont',
+    'US-VA': 'Virginia',
+    'US-WA': 'Washington',
+    'US-WV': 'West Virginia',
+    'US-WI': 'Wisconsin',
+    'US-WY': 'Wyoming',
+    'US-DC': 'District of Columbia',
+    
+    # 加拿大省份代码
+    'CA-AB': 'Alberta',
+    'CA-BC': 'British Columbia',
+    'CA-MB': 'Manitoba',
+    'CA-NB': 'New Brunswick',
+    'CA-NL': 'Newfoundland and Labrador',
+    'CA-NS': 'Nova Scotia',
+    'CA-ON': 'Ontario',
+    'CA-PE': 'Prince Edward Island',
+    'CA-QC': 'Quebec',
+    'CA-SK': 'Saskatchewan',
+    'CA-NT': 'Northwest Territories',
+    'CA-NU': 'Nunavut',
+    'CA-YT': 'Yukon',
+    
+    # 澳大利亚州代码
+    'AU-ACT': 'Australian Capital Territory',
+    'AU-NSW': 'New South Wales',
+    'AU-NT': 'Northern Territory',
+    'AU-QLD': 'Queensland',
+    'AU-SA': 'South Australia',
+    'AU-TAS': 'Tasmania',
+    'AU-VIC': 'Victoria',
+    'AU-WA': 'Western Australia',
+    
+    # 德国州代码
+    'DE-BW': 'Baden-Württemberg',
+    'DE-BY': 'Bavaria',
+    'DE-BE': 'Berlin',
+    'DE-BB': 'Brandenburg',
+    'DE-HB': 'Bremen',
+    'DE-HH': 'Hamburg',
+    'DE-HE': 'Hesse',
+    'DE-MV': 'Mecklenburg-Vorpommern',
+    'DE-NI': 'Lower Saxony',
+    'DE-NW': 'North Rhine-Westphalia',
+    'DE-RP': 'Rhineland-Palatinate',
+    'DE-SL': 'Saarland',
+    'DE-SN': 'Saxony',
+    'DE-ST': 'Saxony-Anhalt',
+    'DE-SH': 'Schleswig-Holstein',
+    'DE-TH': 'Thuringia',
+    
+    # 英国地区代码
+    'GB-ENG': 'England',
+    'GB-SCT': 'Scotland',
+    'GB-WLS': 'Wales',
+    'GB-NIR': 'Northern Ireland',
+    
+    # 法国地区代码（部分）
+    'FR-ARA': 'Auvergne-Rhône-Alpes',
+    'FR-BFC': 'Bourgogne-Franche-Comté',
+    'FR-BRE': 'Brittany',
+    'FR-CVL': 'Centre-Val de Loire',
+    'FR-COR': 'Corsica',
+    'FR-GES': 'Grand Est',
+    'FR-HDF': 'Hauts-de-France',
+    'FR-IDF': 'Île-de-France',
+    'FR-NOR': 'Normandy',
+    'FR-NAQ': 'Nouvelle-Aquitaine',
+    'FR-OCC': 'Occitanie',
+    'FR-PDL': 'Pays de la Loire',
+    'FR-PAC': 'Provence-Alpes-Côte d\'Azur',
+    
+    # 巴西州代码（部分）
+    'BR-AC': 'Acre',
+    'BR-AL': 'Alagoas',
+    'BR-AP': 'Amapá',
+    'BR-AM': 'Amazonas',
+    'BR-BA': 'Bahia',
+    'BR-CE': 'Ceará',
+    'BR-DF': 'Federal District',
+    'BR-ES': 'Espírito Santo',
+    'BR-GO': 'Goiás',
+    'BR-MA': 'Maranhão',
+    'BR-MT': 'Mato Grosso',
+    'BR-MS': 'Mato Grosso do Sul',
+    'BR-MG': 'Minas Gerais',
+    'BR-PA': 'Pará',
+    'BR-PB': 'Paraíba',
+    'BR-PR': 'Paraná',
+    'BR-PE': 'Pernambuco',
+    'BR-PI': 'Piauí',
+    'BR-RJ': 'Rio de Janeiro',
+    'BR-RN': 'Rio Grande do Norte',
+    'BR-RS': 'Rio Grande do Sul',
+    'BR-RO': 'Rondônia',
+    'BR-RR': 'Roraima',
+    'BR-SC': 'Santa Catarina',
+    'BR-SP': 'São Paulo',
+    'BR-SE': 'Sergipe',
+    'BR-TO': 'Tocantins'
+}
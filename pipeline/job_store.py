@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Durable job store for destination generation
+用SQLite记录每个机场的直飞目的地生成任务，使 get_destinations.py 可以中断后继续：
+- 状态: pending / in_flight / done / failed，记录尝试次数、最后的错误和结果JSON
+- 每个结果完成后立即提交，崩溃最多损失正在进行中的请求
+- 扩大范围（如加入medium_airport或更多国家）时只新增任务，已完成的不会重做
+- 所有已完成的结果可原子地导出为 destinations.json
+
+示例:
+    python job_store.py destinations.jobs.db              # 查看各状态数量
+    python job_store.py destinations.jobs.db --failed     # 列出失败的任务
+    python job_store.py destinations.jobs.db --export destinations.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from json_stream import write_json_array
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+
+class JobStore:
+    """
+    destination生成任务表
+
+    任务以出发机场的ICAO代码为主键，按加入顺序导出。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL").fetchone()
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS destination_job (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                icao TEXT NOT NULL UNIQUE,
+                iata TEXT,
+                name TEXT,
+                type TEXT,
+                iso_country TEXT,
+                municipality TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                result TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_destination_job_state ON destination_job(state)")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue(self, airports: Iterable[Dict[str, Any]]) -> int:
+        """
+        加入任务，已存在的机场（无论状态）保持不变
+
+        Returns:
+            新增的任务数
+        """
+        before = self.conn.total_changes
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO destination_job (icao, iata, name, type, iso_country, municipality, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (a["icao"], a.get("iata"), a.get("name"), a.get("type"), a.get("iso_country"), a.get("municipality"),
+             time.time())
+            for a in airports
+        ))
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def recover(self) -> int:
+        """
+        上次运行中断时仍为 in_flight 的任务恢复为 pending
+
+        Returns:
+            恢复的任务数
+        """
+        cursor = self.conn.execute(
+            "UPDATE destination_job SET state = ?, updated_at = ? WHERE state = ?", (PENDING, time.time(), IN_FLIGHT))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def retry_failed(self, icaos: Optional[Iterable[str]] = None) -> int:
+        """将失败的任务重新设为 pending，icaos 为None时处理全部失败任务"""
+        if icaos is None:
+            cursor = self.conn.execute(
+                "UPDATE destination_job SET state = ?, updated_at = ? WHERE state = ?", (PENDING, time.time(), FAILED))
+        else:
+            cursor = self.conn.executemany(
+                "UPDATE destination_job SET state = ?, updated_at = ? WHERE state = ? AND icao = ?",
+                ((PENDING, time.time(), FAILED, icao) for icao in icaos))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def pending(self, icaos: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        待处理的任务，按加入顺序
+
+        Args:
+            icaos: 只返回这些机场的任务（用于限定本次运行的范围），为None时返回全部
+        """
+        rows = self.conn.execute("""
+            SELECT icao, iata, name, type, iso_country, municipality, attempts
+            FROM destination_job WHERE state = ? ORDER BY seq
+        """, (PENDING,)).fetchall()
+        scope = set(icaos) if icaos is not None else None
+        keys = ("icao", "iata", "name", "type", "iso_country", "municipality", "attempts")
+        return [dict(zip(keys, row)) for row in rows if scope is None or row[0] in scope]
+
+    def start(self, icao: str) -> None:
+        self.conn.execute("""
+            UPDATE destination_job SET state = ?, attempts = attempts + 1, updated_at = ? WHERE icao = ?
+        """, (IN_FLIGHT, time.time(), icao))
+        self.conn.commit()
+
+    def finish(self, icao: str, result: Dict[str, Any]) -> None:
+        self.conn.execute("""
+            UPDATE destination_job SET state = ?, result = ?, last_error = NULL, updated_at = ? WHERE icao = ?
+        """, (DONE, json.dumps(result, ensure_ascii=False), time.time(), icao))
+        self.conn.commit()
+
+    def fail(self, icao: str, error: str) -> None:
+        self.conn.execute("""
+            UPDATE destination_job SET state = ?, last_error = ?, updated_at = ? WHERE icao = ?
+        """, (FAILED, error, time.time(), icao))
+        self.conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATES, 0)
+        for state, count in self.conn.execute("SELECT state, COUNT(*) FROM destination_job GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def failures(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute("""
+            SELECT icao, iata, name, attempts, last_error FROM destination_job WHERE state = ? ORDER BY seq
+        """, (FAILED,)).fetchall()
+        return [dict(zip(("icao", "iata", "name", "attempts", "last_error"), row)) for row in rows]
+
+    def results(self) -> Iterable[Dict[str, Any]]:
+        """按加入顺序逐个返回已完成任务的结果"""
+        for (result,) in self.conn.execute("SELECT result FROM destination_job WHERE state = ? ORDER BY seq", (DONE,)):
+            yield json.loads(result)
+
+    def export(self, output_path: str) -> int:
+        """
+        将所有已完成的结果写为 destinations.json
+
+        先写临时文件再替换，读取方不会看到写了一半的文件。
+
+        Returns:
+            写出的机场数
+        """
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            count = write_json_array(f, self.results())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看和导出直飞目的地生成任务")
+    parser.add_argument("db", help="任务数据库路径")
+    parser.add_argument("--failed", action="store_true", help="列出失败的任务")
+    parser.add_argument("--export", default=None, help="将已完成的结果导出为 destinations.json")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到任务数据库 {args.db}")
+        sys.exit(1)
+    store = JobStore(args.db)
+    counts = store.counts()
+    print(", ".join(f"{state}: {counts[state]}" for state in STATES))
+    if args.failed:
+        for job in store.failures():
+            print(f"{job['icao']:<6} {job['iata'] or '':<4} 尝试 {job['attempts']} 次  {job['name']}: {job['last_error']}")
+    if args.export:
+        count = store.export(args.export)
+        print(f"已导出 {count} 个机场到 {args.export}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
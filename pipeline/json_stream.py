@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming reader/writer for top-level JSON arrays
+逐个读写 destinations.json 这类顶层为数组的JSON文件，内存占用只与单个元素的大小有关：
+- iter_json_array: 分块读取文件，每解析出一个完整元素就返回
+- write_json_array: 逐个写出元素，输出与 json.dump(list, f, ensure_ascii=False, indent=2) 逐字节相同
+"""
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐个返回顶层JSON数组中的元素
+
+    Raises:
+        ValueError: 文件不是JSON数组或格式错误
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    expect_value = True
+
+    def fill() -> bool:
+        """读入更多内容，已到文件末尾时返回False"""
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if not fill():
+                raise ValueError("JSON数组不完整")
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise ValueError("顶层不是JSON数组")
+            started = True
+            pos += 1
+            continue
+        if char == "]":
+            pos += 1
+            break
+        if not expect_value:
+            if char != ",":
+                raise ValueError(f"期望 ',' 或 ']'，实际为 {char!r}")
+            expect_value = True
+            pos += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # 元素可能还没读完整；读到文件末尾仍无法解析时才是格式错误
+            if eof or not fill():
+                raise ValueError(f"无法解析数组元素: {e}") from e
+            continue
+        if end == len(buffer) and not eof and not isinstance(item, (dict, list, str)):
+            # 数字等标量可能被分块截断
+            if fill():
+                continue
+        pos = end
+        expect_value = False
+        yield item
+
+    rest = buffer[pos:] + f.read()
+    if rest.strip(WHITESPACE):
+        raise ValueError("JSON数组之后有多余的内容")
+
+
+def write_json_array(f: TextIO, items: Iterable[Any]) -> int:
+    """
+    逐个写出JSON数组的元素
+
+    Returns:
+        写出的元素数
+    """
+    count = 0
+    f.write("[")
+    for item in items:
+        f.write(",\n" if count else "\n")
+        # 只按 "\n" 拆分：splitlines() 还会在字符串中原样保留的 \x85、\u2028、\u2029 处断行
+        f.write("\n".join("  " + line for line in json.dumps(item, ensure_ascii=False, indent=2).split("\n")))
+        count += 1
+    f.write("\n]" if count else "]")
+    return count
+
+
+if __name__ == "__main__":
+    # 测试代码：输出与 json.dump 逐字节相同，并能分块读回
+    import io
+
+    samples = [
+        [],
+        [1, 2.5, "x"],
+        [{"name": "Line\u2028Sep\u2029Para\x85Next", "airports": [{"iata": "PEK", "lat": 40.08}]}, None],
+        [{"name": "Zürich \"Kloten\"\nnewline", "n": -12345678901234567890}],
+    ]
+    for items in samples:
+        out = io.StringIO()
+        write_json_array(out, items)
+        expected = json.dumps(items, ensure_ascii=False, indent=2)
+        assert out.getvalue() == expected, (out.getvalue(), expected)
+        assert json.loads(out.getvalue()) == items
+        assert list(iter_json_array(io.StringIO(expected), chunk_size=3)) == items
+    print(f"{len(samples)} 组样例与 json.dumps 一致")
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache for model responses
+按 prompt、模型名和生成参数（GenerateContentConfig）的哈希缓存模型输出，
+prompt模板、模型和温度都没变时不再重复生成：
+- 过期时间（TTL）之外的条目视为未命中并删除
+- 总大小超过上限时按最近访问时间淘汰（LRU）
+- 超过 refresh_older_than 的条目每次运行最多刷新 refresh_limit 个，
+  陈旧条目分批逐步刷新，而不是同时全部重新生成
+- 统计命中/未命中次数和节省的token数
+
+示例:
+    python llm_cache.py destinations.cache.db            # 查看缓存统计
+    python llm_cache.py destinations.cache.db --prune    # 删除过期条目并按大小上限淘汰
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from model_client import GenerationRequest, ModelClient, ModelResponse, TextCallback, emit_text
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DURATION_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$")
+
+DEFAULT_TTL = 90 * 86400
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def parse_duration(value: str) -> float:
+    """解析 "30d"、"12h"、"90m"、"3600" 这样的时长，返回秒数"""
+    match = DURATION_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"无法解析时长: {value}")
+    number, unit = match.groups()
+    return float(number) * DURATION_UNITS[unit or "s"]
+
+
+def cache_key(request: GenerationRequest) -> str:
+    """缓存键：prompt、模型名和生成参数的SHA-256"""
+    payload = json.dumps(
+        {"prompt": request.prompt, "model": request.model, "config": request.config()},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.refreshed = 0
+        self.evicted = 0
+        self.saved_prompt_tokens = 0
+        self.saved_output_tokens = 0
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return (f"缓存: 命中 {self.hits}, 未命中 {self.misses}（命中率 {rate:.1f}%）, 过期 {self.expired}, "
+                f"刷新 {self.refreshed}, 淘汰 {self.evicted}, "
+                f"节省token: 输入 {self.saved_prompt_tokens} / 输出 {self.saved_output_tokens}")
+
+
+class ResponseCache:
+    """
+    基于SQLite的模型响应缓存
+
+    Args:
+        db_path: 缓存数据库路径
+        ttl: 条目有效期（秒），None表示不过期
+        max_bytes: 缓存内容总大小上限，超过时按LRU淘汰
+        refresh_older_than: 超过该时长（秒）的条目视为陈旧，None表示不刷新
+        refresh_limit: 每次运行最多刷新的陈旧条目数
+    """
+
+    def __init__(self, db_path: str, ttl: Optional[float] = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 refresh_older_than: Optional[float] = None, refresh_limit: int = 50):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL").fetchone()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache(accessed_at)")
+        self.conn.commit()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh_older_than = refresh_older_than
+        self.refresh_limit = refresh_limit
+        self.stats = CacheStats()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, key: str) -> Optional[ModelResponse]:
+        """
+        查找缓存，过期或需要刷新的条目返回None（计为未命中）
+        """
+        row = self.conn.execute("""
+            SELECT response, prompt_tokens, output_tokens, created_at FROM response_cache WHERE key = ?
+        """, (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self.stats.misses += 1
+            return None
+        response, prompt_tokens, output_tokens, created_at = row
+        age = now - created_at
+        if self.ttl is not None and age > self.ttl:
+            self.delete(key)
+            self.stats.expired += 1
+            self.stats.misses += 1
+            return None
+        if (self.refresh_older_than is not None and age > self.refresh_older_than
+                and self.stats.refreshed < self.refresh_limit):
+            # 保留旧条目，刷新失败时下次仍可使用
+            self.stats.refreshed += 1
+            self.stats.misses += 1
+            return None
+
+        self.conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.stats.hits += 1
+        self.stats.saved_prompt_tokens += prompt_tokens
+        self.stats.saved_output_tokens += output_tokens
+        return ModelResponse(response, prompt_tokens, output_tokens)
+
+    def put(self, key: str, model: str, response: ModelResponse) -> None:
+        size = len(response.text.encode("utf-8"))
+        now = time.time()
+        old = self.conn.execute("SELECT size FROM response_cache WHERE key = ?", (key,)).fetchone()
+        self.conn.execute("""
+            INSERT OR REPLACE INTO response_cache
+                (key, model, response, prompt_tokens, output_tokens, size, created_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (key, model, response.text, response.prompt_tokens, response.output_tokens, size, now, now))
+        self.conn.commit()
+        self.total_bytes += size - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        row = self.conn.execute("SELECT size FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self.conn.commit()
+            self.total_bytes -= row[0]
+
+    def evict(self) -> int:
+        """按最近访问时间从旧到新删除条目，直到总大小不超过上限的90%"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        rows = self.conn.execute("SELECT key, size FROM response_cache ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self.total_bytes -= size
+            evicted += 1
+        self.conn.commit()
+        self.stats.evicted += evicted
+        return evicted
+
+    def prune(self) -> int:
+        """删除所有过期条目，并按大小上限淘汰"""
+        removed = 0
+        if self.ttl is not None:
+            cursor = self.conn.execute("DELETE FROM response_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            removed = cursor.rowcount
+            self.conn.commit()
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if self.total_bytes > self.max_bytes:
+            removed += self.evict()
+        return removed
+
+    def info(self) -> Dict[str, Any]:
+        count, oldest, newest = self.conn.execute(
+            "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM response_cache").fetchone()
+        return {"entries": count, "bytes": self.total_bytes, "oldest": oldest, "newest": newest}
+
+
+class CachedModelClient(ModelClient):
+    """
+    带缓存的模型客户端，包装任意 ModelClient
+
+    命中时把缓存的文本一次性交给 on_text，调用方无需区分是否命中。
+    """
+
+    def __init__(self, inner: ModelClient, cache: ResponseCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def generate(self, request: GenerationRequest, on_text: TextCallback = None) -> ModelResponse:
+        key = cache_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            await emit_text(on_text, cached.text)
+            return cached
+        response = await self.inner.generate(request, on_text)
+        self.cache.put(key, request.model, response)
+        return response
+
+    def invalidate(self, request: GenerationRequest) -> None:
+        self.cache.delete(cache_key(request))
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看和清理模型响应缓存")
+    parser.add_argument("db", help="缓存数据库路径")
+    parser.add_argument("--prune", action="store_true", help="删除过期条目并按大小上限淘汰")
+    parser.add_argument("--ttl", default="90d", help="条目有效期（默认: 90d）")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help="缓存大小上限，MB")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到缓存数据库 {args.db}")
+        sys.exit(1)
+    try:
+        cache = ResponseCache(args.db, ttl=parse_duration(args.ttl), max_bytes=int(args.max_mb * 1024 * 1024))
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    if args.prune:
+        print(f"已删除 {cache.prune()} 个条目")
+    info = cache.info()
+    print(f"条目: {info['entries']}，大小: {info['bytes'] / 1024 / 1024:.1f} MB")
+    if info["entries"]:
+        now = time.time()
+        print(f"最旧: {(now - info['oldest']) / 86400:.1f} 天前，最新: {(now - info['newest']) / 86400:.1f} 天前")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model clients for destination generation
+get_destinations.py 通过统一的 ModelClient 接口调用模型：
+- GeminiClient: 通过 google-genai 的异步流式接口调用Gemini
+- HTTPModelClient: 调用 fake_model_server.py 等兼容的HTTP服务，用于测试和基准测试
+两者都以流式方式返回文本，每收到一段文本就调用 on_text 回调，
+HTTP状态错误统一转换为 ModelError，便于调用方按状态码重试。
+"""
+
+import asyncio
+import inspect
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from rate_limit import RateLimiter, backoff_delay
+
+try:
+    import httpx
+    from google import genai
+    from google.genai import types
+    from google.genai import errors as genai_errors
+except ImportError:
+    httpx = None
+    genai = None
+    types = None
+    genai_errors = None
+
+DEFAULT_MODEL = "gemini-flash-lite-latest"
+DEFAULT_TEMPERATURE = 0.3
+
+# 预估的单次输出token数，用于TPM限流的预扣
+EXPECTED_OUTPUT_TOKENS = 2000
+
+# 可重试的HTTP状态码
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+TextCallback = Optional[Callable[[str], Any]]
+
+
+class ModelError(Exception):
+    """模型调用失败，status为HTTP状态码（网络错误时为None）"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRYABLE_STATUS
+
+
+class GenerationRequest:
+    """
+    一次生成请求：prompt、模型名和生成参数
+
+    expected_output_tokens 只用于限流预估（如批量请求按机场数放大），不影响生成和缓存键。
+    """
+
+    __slots__ = ("prompt", "model", "temperature", "expected_output_tokens")
+
+    def __init__(self, prompt: str, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE,
+                 expected_output_tokens: Optional[int] = None):
+        self.prompt = prompt
+        self.model = model
+        self.temperature = temperature
+        self.expected_output_tokens = expected_output_tokens
+
+    def config(self) -> Dict[str, Any]:
+        """生成参数，与 GenerateContentConfig 的字段一致"""
+        return {"response_modalities": ["TEXT"], "temperature": self.temperature}
+
+
+class ModelResponse:
+    """完整的模型输出和token用量"""
+
+    __slots__ = ("text", "prompt_tokens", "output_tokens")
+
+    def __init__(self, text: str, prompt_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数（约4个字符一个token），用于限流预估"""
+    return max(1, len(text) // 4)
+
+
+class ModelClient(ABC):
+    """
+    模型客户端接口
+
+    generate 流式读取输出，每收到一段文本调用 on_text（回调抛出的异常会中止生成并向上传递），
+    结束后返回完整的 ModelResponse。失败时抛出 ModelError。
+    """
+
+    @abstractmethod
+    async def generate(self, request: GenerationRequest, on_text: TextCallback = None) -> ModelResponse:
+        ...
+
+    def invalidate(self, request: GenerationRequest) -> None:
+        """调用方发现输出不可用时调用，带缓存的客户端据此丢弃该请求的缓存"""
+
+    async def close(self) -> None:
+        pass
+
+
+async def emit_text(on_text: TextCallback, text: str) -> None:
+    """调用 on_text 回调，回调可以是普通函数或协程函数"""
+    if on_text is not None:
+        result = on_text(text)
+        if inspect.isawaitable(result):
+            await result
+
+
+class GeminiClient(ModelClient):
+    """通过 google-genai 异步接口调用Gemini"""
+
+    def __init__(self, api_key: str):
+        if genai is None:
+            raise RuntimeError("需要安装 google-genai: pip install google-genai")
+        self.client = genai.Client(api_key=api_key)
+
+    async def generate(self, request: GenerationRequest, on_text: TextCallback = None) -> ModelResponse:
+        contents = [types.Content(role="user", parts=[types.Part.from_text(text=request.prompt)])]
+        config = types.GenerateContentConfig(**request.config())
+        parts = []
+        prompt_tokens = 0
+        output_tokens = 0
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=request.model, contents=contents, config=config,
+            )
+            async for chunk in stream:
+                if chunk.usage_metadata is not None:
+                    prompt_tokens = chunk.usage_metadata.prompt_token_count or prompt_tokens
+                    output_tokens = chunk.usage_metadata.candidates_token_count or output_tokens
+                if chunk.text:
+                    parts.append(chunk.text)
+                    await emit_text(on_text, chunk.text)
+        except genai_errors.APIError as e:
+            raise ModelError(str(e), status=e.code) from e
+        except (OSError, asyncio.TimeoutError, httpx.TransportError) as e:
+            # google-genai 的异步客户端基于 httpx，连接失败和超时是 httpx.TransportError（不是 OSError）
+            raise ModelError(f"网络错误: {e!r}") from e
+
+        text = "".join(parts)
+        return ModelResponse(text, prompt_tokens or estimate_tokens(request.prompt),
+                             output_tokens or estimate_tokens(text))
+
+
+class HTTPModelClient(ModelClient):
+    """
+    调用HTTP模型服务（fake_model_server.py 的协议）
+
+    POST {base_url}/v1/generate，请求体为 {"model", "prompt", "config"}；
+    响应为逐行JSON：若干 {"text": ...}，最后一行 {"usage": {"prompt_tokens", "output_tokens"}}。
+    """
+
+    def __init__(self, base_url: str, timeout: float = 120.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path.rstrip("/") + "/v1/generate"
+        self.timeout = timeout
+
+    async def generate(self, request: GenerationRequest, on_text: TextCallback = None) -> ModelResponse:
+        try:
+            return await asyncio.wait_for(self._generate(request, on_text), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            raise ModelError(f"网络错误: {e!r}") from e
+
+    async def _generate(self, request: GenerationRequest, on_text: TextCallback) -> ModelResponse:
+        body = json.dumps({
+            "model": request.model, "prompt": request.prompt, "config": request.config(),
+        }).encode("utf-8")
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(
+                f"POST {self.path} HTTP/1.0\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+
+            status_line = (await reader.readline()).decode("latin-1").split(None, 2)
+            status = int(status_line[1]) if len(status_line) > 1 else 0
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if status != 200:
+                detail = (await reader.read()).decode("utf-8", "replace")[:200]
+                retry_after = headers.get("retry-after")
+                raise ModelError(f"HTTP {status}: {detail}", status=status,
+                                 retry_after=float(retry_after) if retry_after else None)
+
+            parts = []
+            usage: Dict[str, int] = {}
+            async for raw in reader:
+                if not raw.strip():
+                    continue
+                message = json.loads(raw)
+                if "text" in message:
+                    parts.append(message["text"])
+                    await emit_text(on_text, message["text"])
+                if "usage" in message:
+                    usage = message["usage"]
+        finally:
+            writer.close()
+
+        text = "".join(parts)
+        return ModelResponse(text, usage.get("prompt_tokens") or estimate_tokens(request.prompt),
+                             usage.get("output_tokens") or estimate_tokens(text))
+
+
+class RateLimitedClient(ModelClient):
+    """
+    限流和重试，包装任意 ModelClient
+
+    每次实际请求前按预估token数从 RateLimiter 取令牌，完成后按实际用量修正；
+    可重试的错误（429/5xx/网络错误）按带抖动的指数退避重试，
+    但已经输出部分文本后才失败的请求不重试。
+    stats 提供时累计 requests、retries、prompt_tokens、output_tokens。
+    """
+
+    def __init__(self, inner: ModelClient, limiter: RateLimiter, max_retries: int = 5,
+                 stats: Any = None, expected_output_tokens: int = EXPECTED_OUTPUT_TOKENS):
+        self.inner = inner
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.stats = stats
+        self.expected_output_tokens = expected_output_tokens
+
+    async def generate(self, request: GenerationRequest, on_text: TextCallback = None) -> ModelResponse:
+        estimated = estimate_tokens(request.prompt) + (request.expected_output_tokens or self.expected_output_tokens)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated)
+            if self.stats is not None:
+                self.stats.requests += 1
+            emitted = []
+
+            async def forward(text: str) -> None:
+                emitted.append(len(text))
+                await emit_text(on_text, text)
+
+            try:
+                response = await self.inner.generate(request, forward if on_text is not None else None)
+            except ModelError as e:
+                # 失败的请求也可能计入配额，按预估值计
+                self.limiter.record(estimated, estimated)
+                # 已经交给 on_text 的部分输出无法撤回，重新生成会与之拼接，所以不在这里重试
+                if not e.retryable or attempt == self.max_retries or emitted:
+                    raise
+                if self.stats is not None:
+                    self.stats.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, retry_after=e.retry_after))
+                continue
+
+            self.limiter.record(estimated, response.total_tokens)
+            if self.stats is not None:
+                self.stats.prompt_tokens += response.prompt_tokens
+                self.stats.output_tokens += response.output_tokens
+            return response
+        raise ModelError("重试次数用尽")
+
+    def invalidate(self, request: GenerationRequest) -> None:
+        self.inner.invalidate(request)
+
+    async def close(self) -> None:
+        await self.inner.close()
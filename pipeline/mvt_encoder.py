@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mapbox Vector Tile encoder
+不依赖第三方库的MVT（Mapbox Vector Tile 2.1）编码器，只支持点要素，
+供 tile_builder.py 生成矢量瓦片
+"""
+
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+# protobuf wire type
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_BYTES = 2
+
+GEOM_POINT = 1
+CMD_MOVE_TO = 1
+
+DEFAULT_EXTENT = 4096
+
+# 一个点要素：(瓦片内x, 瓦片内y, [(属性名, 属性值), ...])
+PointFeature = Tuple[int, int, Sequence[Tuple[str, Any]]]
+
+
+def encode_varint(value: int) -> bytes:
+    """编码无符号varint"""
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def zigzag(value: int) -> int:
+    """sint32/sint64 的zigzag编码"""
+    return (value << 1) ^ (value >> 63)
+
+
+def encode_key(field: int, wire_type: int) -> bytes:
+    return encode_varint((field << 3) | wire_type)
+
+
+def encode_bytes_field(field: int, data: bytes) -> bytes:
+    return encode_key(field, WIRE_BYTES) + encode_varint(len(data)) + data
+
+
+def encode_packed(field: int, values: Sequence[int]) -> bytes:
+    return encode_bytes_field(field, b"".join(encode_varint(v) for v in values))
+
+
+def encode_value(value: Any) -> bytes:
+    """编码 Tile.Value 消息"""
+    if isinstance(value, bool):
+        return encode_key(7, WIRE_VARINT) + encode_varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return encode_key(5, WIRE_VARINT) + encode_varint(value)
+        return encode_key(6, WIRE_VARINT) + encode_varint(zigzag(value))
+    if isinstance(value, float):
+        return encode_key(3, WIRE_FIXED64) + struct.pack("<d", value)
+    return encode_bytes_field(1, str(value).encode("utf-8"))
+
+
+def encode_layer(name: str, features: List[PointFeature], extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    编码一个图层（Tile.Layer 消息）
+
+    属性名和属性值在图层内去重，值为None的属性不写入。
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for x, y, properties in features:
+        tags = []
+        for key, value in properties:
+            if value is None:
+                continue
+            key_index = keys.setdefault(key, len(keys))
+            value_key = (type(value), value)
+            value_index = values.setdefault(value_key, len(values))
+            tags.append(key_index)
+            tags.append(value_index)
+
+        geometry = (CMD_MOVE_TO & 0x7) | (1 << 3), zigzag(x), zigzag(y)
+        feature = b""
+        if tags:
+            feature += encode_packed(2, tags)
+        feature += encode_key(3, WIRE_VARINT) + encode_varint(GEOM_POINT)
+        feature += encode_packed(4, geometry)
+        encoded_features.append(encode_bytes_field(2, feature))
+
+    layer = bytearray()
+    layer += encode_key(15, WIRE_VARINT) + encode_varint(2)
+    layer += encode_bytes_field(1, name.encode("utf-8"))
+    for feature in encoded_features:
+        layer += feature
+    for key in keys:
+        layer += encode_bytes_field(3, key.encode("utf-8"))
+    for _, value in values:
+        layer += encode_bytes_field(4, encode_value(value))
+    layer += encode_key(5, WIRE_VARINT) + encode_varint(extent)
+    return bytes(layer)
+
+
+def encode_tile(layers: Dict[str, List[PointFeature]], extent: int = DEFAULT_EXTENT) -> bytes:
+    """
+    编码一个矢量瓦片（Tile 消息），图层按名称排序以保证输出可复现
+
+    Args:
+        layers: 图层名 -> 点要素列表
+        extent: 瓦片坐标范围
+
+    Returns:
+        未压缩的MVT二进制数据
+    """
+    tile = bytearray()
+    for name in sorted(layers):
+        if layers[name]:
+            tile += encode_bytes_field(3, encode_layer(name, layers[name], extent))
+    return bytes(tile)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PMTiles v3 archive writer
+不依赖第三方库的PMTiles v3写入器：
+- 瓦片按Hilbert曲线tile ID排序写入（clustered）
+- 内容相同的瓦片只存一份，连续的相同瓦片合并为一个run
+- 根目录超过16KB时拆分为叶目录
+"""
+
+import gzip
+import hashlib
+import json
+import struct
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from mvt_encoder import encode_varint
+
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+TILE_TYPE_MVT = 1
+
+HEADER_SIZE = 127
+# 头部加根目录必须位于文件前16KB内
+ROOT_DIR_MAX_SIZE = 16384 - HEADER_SIZE
+
+
+def zxy_to_tileid(z: int, x: int, y: int) -> int:
+    """
+    将 z/x/y 转换为PMTiles tile ID：低zoom的瓦片总数加上该zoom内的Hilbert曲线序号
+    """
+    if z > 31:
+        raise ValueError(f"zoom {z} 超出范围")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"瓦片 {z}/{x}/{y} 超出范围")
+    acc = ((1 << (2 * z)) - 1) // 3
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return acc + d
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    """gzip压缩，固定mtime以保证输出可复现"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# 目录项：(tile_id, offset, length, run_length)，run_length为0表示指向叶目录
+Entry = Tuple[int, int, int, int]
+
+
+def serialize_directory(entries: List[Entry]) -> bytes:
+    """按PMTiles v3规范序列化并压缩一个目录"""
+    out = bytearray(encode_varint(len(entries)))
+    last_id = 0
+    for tile_id, _, _, _ in entries:
+        out += encode_varint(tile_id - last_id)
+        last_id = tile_id
+    for _, _, _, run_length in entries:
+        out += encode_varint(run_length)
+    for _, _, length, _ in entries:
+        out += encode_varint(length)
+    for i, (_, offset, _, _) in enumerate(entries):
+        if i > 0 and offset == entries[i - 1][1] + entries[i - 1][2]:
+            out += encode_varint(0)
+        else:
+            out += encode_varint(offset + 1)
+    return gzip_bytes(bytes(out))
+
+
+def build_directories(entries: List[Entry]) -> Tuple[bytes, bytes]:
+    """
+    生成根目录和叶目录，根目录放不下时按叶目录大小逐步加倍拆分
+
+    Returns:
+        (根目录, 所有叶目录拼接后的数据)
+    """
+    root = serialize_directory(entries)
+    if len(root) <= ROOT_DIR_MAX_SIZE:
+        return root, b""
+
+    leaf_size = 4096
+    while True:
+        root_entries: List[Entry] = []
+        leaves = bytearray()
+        for i in range(0, len(entries), leaf_size):
+            chunk = entries[i:i + leaf_size]
+            leaf = serialize_directory(chunk)
+            root_entries.append((chunk[0][0], len(leaves), len(leaf), 0))
+            leaves += leaf
+        root = serialize_directory(root_entries)
+        if len(root) <= ROOT_DIR_MAX_SIZE:
+            return root, bytes(leaves)
+        leaf_size *= 2
+
+
+class PMTilesWriter:
+    """
+    PMTiles v3写入器
+
+    用法：依次调用 add_tile（顺序不限），最后调用 finish 写出整个归档。
+    瓦片数据在内存中按内容去重后暂存。
+    """
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self.tiles: Dict[int, bytes] = {}
+        self.contents: Dict[bytes, bytes] = {}
+
+    def add_tile(self, z: int, x: int, y: int, data: bytes) -> None:
+        """添加一个已压缩的瓦片"""
+        digest = hashlib.sha256(data).digest()
+        self.contents.setdefault(digest, data)
+        self.tiles[zxy_to_tileid(z, x, y)] = digest
+
+    def finish(self, metadata: Dict[str, Any], min_zoom: int, max_zoom: int,
+               bounds: Tuple[float, float, float, float], tile_compression: int = COMPRESSION_GZIP) -> Dict[str, int]:
+        """
+        写出头部、目录、元数据和瓦片数据
+
+        Args:
+            metadata: 写入归档的元数据（TileJSON风格）
+            min_zoom, max_zoom: 缩放级别范围
+            bounds: (min_lon, min_lat, max_lon, max_lat)
+            tile_compression: 瓦片压缩方式
+
+        Returns:
+            统计信息：addressed_tiles、tile_entries、tile_contents、各部分字节数
+        """
+        entries: List[Entry] = []
+        tile_data = bytearray()
+        offsets: Dict[bytes, int] = {}
+        for tile_id in sorted(self.tiles):
+            digest = self.tiles[tile_id]
+            data = self.contents[digest]
+            offset = offsets.get(digest)
+            if offset is None:
+                offset = offsets[digest] = len(tile_data)
+                tile_data += data
+            last = entries[-1] if entries else None
+            if last and last[1] == offset and last[0] + last[3] == tile_id:
+                entries[-1] = (last[0], last[1], last[2], last[3] + 1)
+            else:
+                entries.append((tile_id, offset, len(data), 1))
+
+        root, leaves = build_directories(entries)
+        metadata_bytes = gzip_bytes(json.dumps(metadata, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+        root_offset = HEADER_SIZE
+        metadata_offset = root_offset + len(root)
+        leaves_offset = metadata_offset + len(metadata_bytes)
+        data_offset = leaves_offset + len(leaves)
+
+        min_lon, min_lat, max_lon, max_lat = bounds
+        center_zoom = (min_zoom + max_zoom) // 2
+        header = b"PMTiles" + struct.pack(
+            "<BQQQQQQQQQQQBBBBBBiiiiBii",
+            3,
+            root_offset, len(root),
+            metadata_offset, len(metadata_bytes),
+            leaves_offset, len(leaves),
+            data_offset, len(tile_data),
+            len(self.tiles), len(entries), len(offsets),
+            1,  # clustered
+            COMPRESSION_GZIP,  # internal compression
+            tile_compression,
+            TILE_TYPE_MVT,
+            min_zoom, max_zoom,
+            round(min_lon * 1e7), round(min_lat * 1e7),
+            round(max_lon * 1e7), round(max_lat * 1e7),
+            center_zoom,
+            round((min_lon + max_lon) / 2 * 1e7), round((min_lat + max_lat) / 2 * 1e7),
+        )
+        assert len(header) == HEADER_SIZE
+
+        self.output.write(header)
+        self.output.write(root)
+        self.output.write(metadata_bytes)
+        self.output.write(leaves)
+        self.output.write(tile_data)
+
+        return {
+            "addressed_tiles": len(self.tiles),
+            "tile_entries": len(entries),
+            "tile_contents": len(offsets),
+            "directory_bytes": len(root) + len(leaves),
+            "tile_data_bytes": len(tile_data),
+            "total_bytes": data_offset + len(tile_data),
+        }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async rate limiting and retry backoff for model requests
+- TokenBucket: 按每分钟速率匀速补充的令牌桶
+- RateLimiter: 同时限制每分钟请求数（RPM）和每分钟token数（TPM）
+- backoff_delay: 带抖动的指数退避
+"""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    异步令牌桶
+
+    令牌以 rate_per_minute / 60 的速度连续补充，最多累积 capacity 个。
+    acquire 不足时等待；adjust 可以在得知实际用量后补扣或退还令牌（允许暂时为负）。
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute 必须大于0")
+        self.rate = rate_per_minute / 60.0
+        # 默认允许10秒的突发量
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        取出 amount 个令牌，不足时等待
+
+        超过桶容量的请求按容量计，避免永远等不到。
+
+        Returns:
+            等待的秒数
+        """
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        # 持锁等待，保证先到的请求先拿到令牌
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return time.monotonic() - start
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """按实际用量修正：delta为正时补扣，为负时退还"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """
+    请求数和token数双重限流，None表示不限制该项
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.waited = 0.0
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        if self.requests is not None:
+            self.waited += await self.requests.acquire(1)
+        if self.tokens is not None:
+            self.waited += await self.tokens.acquire(estimated_tokens)
+
+    def record(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """请求完成后按实际token数修正预估"""
+        if self.tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, maximum: float = 60.0,
+                  retry_after: Optional[float] = None) -> float:
+    """
+    第 attempt 次重试（从0开始）前的等待时间
+
+    指数退避上限内取随机值（full jitter），避免并发请求同时重试；
+    服务端给出 Retry-After 时至少等待该时长。
+    """
+    delay = random.uniform(0, min(maximum, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
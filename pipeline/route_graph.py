@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Route graph for airports.db
+把 destinations.json 载入 airports.db 的 route(origin_airport_id, dest_airport_id, dest_city) 边表
+（两端都有索引），并在内存中构建CSR（压缩稀疏行）邻接结构，提供：
+- 直飞目的地/出发地
+- 一次中转（A -> X -> B）和两次中转（A -> X -> Y -> B）的连接
+- k 次航班内可到达的所有机场
+CSR查询全部用NumPy向量化，同时提供等价的SQL实现用于对比。
+
+示例:
+    python route_graph.py load airports.db destinations.json
+    python route_graph.py connect airports.db ZUUU EGLL --stops 2
+    python route_graph.py reach airports.db ZUUU -k 2
+    python route_graph.py benchmark airports.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from code_resolver import CodeResolver
+from coord_store import np, require_numpy
+from json_stream import iter_json_array
+
+
+def create_route_table(conn: sqlite3.Connection) -> None:
+    """创建航线边表，主键覆盖按出发地查询，idx_route_dest 覆盖按目的地查询"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS route (
+            origin_airport_id INTEGER NOT NULL REFERENCES airport(id),
+            dest_airport_id INTEGER NOT NULL REFERENCES airport(id),
+            dest_city TEXT,
+            PRIMARY KEY (origin_airport_id, dest_airport_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_route_dest ON route(dest_airport_id, origin_airport_id)")
+
+
+def load_routes(conn: sqlite3.Connection, json_path: str) -> Dict[str, int]:
+    """
+    把 destinations.json 载入 route 表
+
+    文件逐条流式读取；文件中出现的出发机场，其原有航线整体替换，其他机场的航线保持不变。
+    出发机场和目的地都通过 code_resolver 解析为机场ID，解析不到的跳过并计数。
+    多条记录解析到同一出发机场时，旧航线只在第一次删除，之后的记录合并进来（重复航线保留先出现的）。
+
+    Returns:
+        统计: records, origins（不重复的出发机场数）, routes（实际写入的航线数）,
+        unresolved_origins, unresolved_destinations
+    """
+    create_route_table(conn)
+    resolver = CodeResolver(conn)
+    replaced = set()
+    stats = dict.fromkeys(("records", "origins", "routes", "unresolved_origins", "unresolved_destinations"), 0)
+    with open(json_path, "r", encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            stats["records"] += 1
+            departure = item.get("departure_airport") or {}
+            origin = resolver.resolve(departure.get("icao"), departure.get("iata"))
+            if origin is None:
+                stats["unresolved_origins"] += 1
+                continue
+            origin_id = origin.airport_id
+            edges: Dict[int, Optional[str]] = {}
+            for flight in item.get("direct_flights") or []:
+                for airport in flight.get("airports") or []:
+                    dest = resolver.resolve(airport.get("icao"), airport.get("iata"))
+                    if dest is None:
+                        stats["unresolved_destinations"] += 1
+                    elif dest.airport_id != origin_id:
+                        # 同一目的地出现在多个城市下时保留第一个
+                        edges.setdefault(dest.airport_id, flight.get("city"))
+            if origin_id not in replaced:
+                conn.execute("DELETE FROM route WHERE origin_airport_id = ?", (origin_id,))
+                replaced.add(origin_id)
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO route (origin_airport_id, dest_airport_id, dest_city) VALUES (?, ?, ?)",
+                ((origin_id, dest_id, city) for dest_id, city in edges.items()),
+            )
+            stats["routes"] += cursor.rowcount
+    stats["origins"] = len(replaced)
+    conn.commit()
+    return stats
+
+
+def _csr(rows, cols, size: int):
+    """由边列表构建CSR：indptr[i]:indptr[i+1] 是节点 i 的邻居（升序）"""
+    order = np.lexsort((cols, rows))
+    indices = cols[order].astype(np.int32)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, indices
+
+
+def _gather(indptr, indices, nodes):
+    """一次取出多个节点的全部邻居，返回 (所属节点, 邻居)"""
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    owners = np.repeat(nodes, lengths)
+    offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owners, indices[np.repeat(starts, lengths) + offsets]
+
+
+class RouteGraph:
+    """
+    航线图的CSR邻接结构
+
+    机场ID映射为连续的节点编号（ids 升序），出边和入边各一份CSR。
+    查询参数和结果都使用机场ID。
+    """
+
+    def __init__(self, origins, dests):
+        require_numpy()
+        origins = np.asarray(origins, dtype=np.int64)
+        dests = np.asarray(dests, dtype=np.int64)
+        self.ids = np.unique(np.concatenate([origins, dests]))
+        size = len(self.ids)
+        src = np.searchsorted(self.ids, origins)
+        dst = np.searchsorted(self.ids, dests)
+        self.out_ptr, self.out_idx = _csr(src, dst, size)
+        self.in_ptr, self.in_idx = _csr(dst, src, size)
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> "RouteGraph":
+        require_numpy()
+        edges = np.array(conn.execute("SELECT origin_airport_id, dest_airport_id FROM route").fetchall(),
+                         dtype=np.int64).reshape(-1, 2)
+        return cls(edges[:, 0], edges[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_idx)
+
+    def node(self, airport_id: int) -> Optional[int]:
+        """机场ID对应的节点编号，不在图中时返回None"""
+        index = int(np.searchsorted(self.ids, airport_id))
+        if index < len(self.ids) and self.ids[index] == airport_id:
+            return index
+        return None
+
+    def _out(self, node: int):
+        return self.out_idx[self.out_ptr[node]:self.out_ptr[node + 1]]
+
+    def _in(self, node: int):
+        return self.in_idx[self.in_ptr[node]:self.in_ptr[node + 1]]
+
+    def destinations(self, airport_id: int):
+        """直飞目的地的机场ID"""
+        node = self.node(airport_id)
+        return self.ids[self._out(node)] if node is not None else self.ids[:0]
+
+    def origins(self, airport_id: int):
+        """直飞到该机场的出发机场ID"""
+        node = self.node(airport_id)
+        return self.ids[self._in(node)] if node is not None else self.ids[:0]
+
+    def one_stop(self, origin_id: int, dest_id: int):
+        """一次中转的中转机场ID（A -> X -> B），升序"""
+        origin, dest = self.node(origin_id), self.node(dest_id)
+        if origin is None or dest is None or origin == dest:
+            return self.ids[:0]
+        hubs = np.intersect1d(self._out(origin), self._in(dest), assume_unique=True)
+        return self.ids[hubs]
+
+    def two_stop(self, origin_id: int, dest_id: int, limit: Optional[int] = None):
+        """
+        两次中转的 (X, Y) 机场ID对（A -> X -> Y -> B），形状 (n, 2)，按 X、Y 排序
+
+        X、Y 与起点、终点都不相同。
+        """
+        origin, dest = self.node(origin_id), self.node(dest_id)
+        if origin is None or dest is None or origin == dest:
+            return np.empty((0, 2), dtype=self.ids.dtype)
+        first = self._out(origin)
+        first = first[first != dest]
+        owners, second = _gather(self.out_ptr, self.out_idx, first)
+        last = np.zeros(len(self.ids), dtype=bool)
+        last[self._in(dest)] = True
+        mask = last[second] & (second != origin) & (second != dest) & (second != owners)
+        pairs = np.column_stack([self.ids[owners[mask]], self.ids[second[mask]]])
+        return pairs[:limit] if limit is not None else pairs
+
+    def reachable(self, origin_id: int, max_hops: int) -> Tuple[Any, Any]:
+        """
+        max_hops 次航班内可到达的机场（不含起点）
+
+        Returns:
+            (机场ID数组, 最少航班数数组)，按航班数、机场ID排序
+        """
+        origin = self.node(origin_id)
+        if origin is None:
+            return self.ids[:0], np.empty(0, dtype=np.int8)
+        hops = np.full(len(self.ids), -1, dtype=np.int8)
+        hops[origin] = 0
+        frontier = np.array([origin])
+        for step in range(1, max_hops + 1):
+            _, neighbors = _gather(self.out_ptr, self.out_idx, frontier)
+            neighbors = np.unique(neighbors)
+            frontier = neighbors[hops[neighbors] < 0]
+            if not len(frontier):
+                break
+            hops[frontier] = step
+        reached = np.flatnonzero(hops > 0)
+        order = np.lexsort((self.ids[reached], hops[reached]))
+        return self.ids[reached[order]], hops[reached[order]]
+
+
+def sql_one_stop(conn: sqlite3.Connection, origin_id: int, dest_id: int) -> List[int]:
+    rows = conn.execute("""
+        SELECT a.dest_airport_id FROM route a
+        JOIN route b ON b.origin_airport_id = a.dest_airport_id AND b.dest_airport_id = ?
+        WHERE a.origin_airport_id = ? AND a.dest_airport_id != ? AND ? != ?
+        ORDER BY a.dest_airport_id
+    """, (dest_id, origin_id, dest_id, origin_id, dest_id)).fetchall()
+    return [row[0] for row in rows]
+
+
+def sql_two_stop(conn: sqlite3.Connection, origin_id: int, dest_id: int) -> List[Tuple[int, int]]:
+    return conn.execute("""
+        SELECT a.dest_airport_id, b.dest_airport_id FROM route a
+        JOIN route b ON b.origin_airport_id = a.dest_airport_id
+        JOIN route c ON c.origin_airport_id = b.dest_airport_id AND c.dest_airport_id = :dest
+        WHERE a.origin_airport_id = :origin AND :origin != :dest
+          AND a.dest_airport_id != :dest
+          AND b.dest_airport_id NOT IN (:origin, :dest, a.dest_airport_id)
+        ORDER BY a.dest_airport_id, b.dest_airport_id
+    """, {"origin": origin_id, "dest": dest_id}).fetchall()
+
+
+def sql_reachable(conn: sqlite3.Connection, origin_id: int, max_hops: int) -> List[Tuple[int, int]]:
+    return conn.execute("""
+        WITH RECURSIVE reach(id, hops) AS (
+            SELECT ?, 0
+            UNION
+            SELECT r.dest_airport_id, reach.hops + 1 FROM reach
+            JOIN route r ON r.origin_airport_id = reach.id
+            WHERE reach.hops < ?
+        )
+        SELECT id, MIN(hops) AS hops FROM reach WHERE id != ? GROUP BY id ORDER BY hops, id
+    """, (origin_id, max_hops, origin_id)).fetchall()
+
+
+def _timed(func, *args) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def benchmark(conn: sqlite3.Connection, queries: int = 100, seed: int = 42) -> None:
+    """对比CSR与SQL在一次中转、两次中转和k次可达查询上的延迟，并校验结果一致"""
+    build_ms, graph = _timed(RouteGraph.from_db, conn)
+    print(f"CSR: {len(graph)} 个机场, {graph.edge_count} 条航线, 构建 {build_ms:.1f} ms")
+    rng = random.Random(seed)
+    origins = [int(x) for x in np.unique(graph.ids[np.repeat(np.arange(len(graph)), np.diff(graph.out_ptr))])]
+    if not origins:
+        print("route 表为空")
+        return
+    pairs = [(rng.choice(origins), int(rng.choice(graph.ids))) for _ in range(queries)]
+
+    cases = [
+        ("一次中转", lambda o, d: graph.one_stop(o, d).tolist(), lambda o, d: sql_one_stop(conn, o, d), pairs),
+        ("两次中转", lambda o, d: [tuple(p) for p in graph.two_stop(o, d).tolist()],
+         lambda o, d: sql_two_stop(conn, o, d), pairs[:max(1, queries // 4)]),
+    ]
+    for hops in (1, 2, 3):
+        cases.append((
+            f"{hops}次可达",
+            lambda o, k: list(zip(*(a.tolist() for a in graph.reachable(o, k)))),
+            lambda o, k: sql_reachable(conn, o, k),
+            [(o, hops) for o, _ in pairs[:max(1, queries // 4)]],
+        ))
+
+    print(f"{'查询':<8} {'次数':>5} {'CSR p50':>10} {'CSR p99':>10} {'SQL p50':>10} {'SQL p99':>10} {'结果数':>8}")
+    for name, csr_query, sql_query, args_list in cases:
+        csr_times, sql_times, sizes = [], [], []
+        for args in args_list:
+            csr_ms, csr_result = _timed(csr_query, *args)
+            sql_ms, sql_result = _timed(sql_query, *args)
+            if [tuple(r) if isinstance(r, (list, tuple)) else r for r in csr_result] != \
+                    [tuple(r) if isinstance(r, (list, tuple)) else r for r in sql_result]:
+                raise AssertionError(f"{name} 结果不一致: {args}")
+            csr_times.append(csr_ms)
+            sql_times.append(sql_ms)
+            sizes.append(len(csr_result))
+
+        def p(values, q):
+            return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+        print(f"{name:<8} {len(args_list):>5} {p(csr_times, 50):>8.3f}ms {p(csr_times, 99):>8.3f}ms "
+              f"{p(sql_times, 50):>8.3f}ms {p(sql_times, 99):>8.3f}ms {statistics.mean(sizes):>8.1f}")
+
+
+def _airport_label(conn: sqlite3.Connection, airport_id: int) -> str:
+    row = conn.execute("SELECT ident, iata_code, name FROM airport WHERE id = ?", (airport_id,)).fetchone()
+    if row is None:
+        return str(airport_id)
+    ident, iata, name = row
+    return f"{ident}{'/' + iata if iata else ''} {name}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="航线图: 载入航线、查询中转连接和可达机场")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("load", help="把 destinations.json 载入 route 表")
+    p.add_argument("db", help="airports.db 路径")
+    p.add_argument("json", help="destinations.json 路径")
+
+    p = sub.add_parser("connect", help="查询两个机场之间的中转连接")
+    p.add_argument("db", help="airports.db 路径")
+    p.add_argument("origin", help="出发机场代码（ICAO/IATA/ident）")
+    p.add_argument("dest", help="到达机场代码")
+    p.add_argument("--stops", type=int, choices=(1, 2), default=1, help="中转次数（默认: 1）")
+    p.add_argument("--limit", type=int, default=20, help="最多显示的连接数")
+
+    p = sub.add_parser("reach", help="k次航班内可到达的机场")
+    p.add_argument("db", help="airports.db 路径")
+    p.add_argument("origin", help="出发机场代码")
+    p.add_argument("-k", "--hops", type=int, default=2, help="最多航班数（默认: 2）")
+
+    p = sub.add_parser("benchmark", help="对比CSR与SQL的查询延迟")
+    p.add_argument("db", help="airports.db 路径")
+    p.add_argument("--queries", type=int, default=100, help="查询次数")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到数据库 {args.db}")
+        sys.exit(1)
+    conn = sqlite3.connect(args.db)
+
+    try:
+        if args.command == "load":
+            start = time.perf_counter()
+            stats = load_routes(conn, args.json)
+            print(f"载入 {stats['records']} 个出发机场记录（{time.perf_counter() - start:.1f} 秒）: "
+                  f"{stats['origins']} 个出发机场, {stats['routes']} 条航线, "
+                  f"出发机场未解析 {stats['unresolved_origins']}, 目的地未解析 {stats['unresolved_destinations']}")
+            return
+
+        if args.command == "benchmark":
+            benchmark(conn, args.queries)
+            return
+
+        resolver = CodeResolver(conn)
+        graph = RouteGraph.from_db(conn)
+        codes = [args.origin] + ([args.dest] if args.command == "connect" else [])
+        ids = []
+        for code in codes:
+            location = resolver.resolve(code, code)
+            if location is None:
+                print(f"错误: 找不到机场 {code}")
+                sys.exit(1)
+            ids.append(location.airport_id)
+
+        if args.command == "connect":
+            if args.stops == 1:
+                hubs = graph.one_stop(ids[0], ids[1]).tolist()
+                print(f"一次中转: {len(hubs)} 个")
+                for hub in hubs[:args.limit]:
+                    print(f"  via {_airport_label(conn, hub)}")
+            else:
+                pairs = graph.two_stop(ids[0], ids[1]).tolist()
+                print(f"两次中转: {len(pairs)} 个")
+                for first, second in pairs[:args.limit]:
+                    print(f"  via {_airport_label(conn, first)} -> {_airport_label(conn, second)}")
+        else:
+            reached, hops = graph.reachable(ids[0], args.hops)
+            for step in range(1, args.hops + 1):
+                print(f"{step} 次航班: {int((hops == step).sum())} 个机场")
+            print(f"共 {len(reached)} 个机场")
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
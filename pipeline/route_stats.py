@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Route distances and per-airport route statistics for destinations.json
+用NumPy一次性计算destinations.json中所有航线的距离和初始航向：
+- 每个目的地机场写入 distance_km 和 bearing_deg
+- 每个出发机场写入 route_stats：航线数、最长航线、航线距离中位数、国内/国际航线占比
+- 距离可选球面大圆（haversine，默认）或WGS84椭球（Vincenty）
+机场坐标和国家来自 coord_store.py 导出的坐标存储，目的地已有
+latitude_deg/longitude_deg（enrich_destinations.py 补齐）时直接使用。
+
+示例:
+    python coord_store.py export airports.db airports.coords
+    python route_stats.py destinations.json --store airports.coords
+    python route_stats.py destinations.json --store airports.coords --method vincenty -o routes.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from coord_store import CoordStore, haversine_km, np, require_numpy
+
+# WGS84 椭球参数
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+VINCENTY_MAX_ITERATIONS = 200
+VINCENTY_TOLERANCE = 1e-12
+
+
+def initial_bearing(lat1, lon1, lat2, lon2):
+    """球面上从点1到点2的初始航向（度，0-360，正北为0）"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlon = np.radians(lon2) - np.radians(lon1)
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def _vincenty_terms(lam, sin_u1, cos_u1, sin_u2, cos_u2):
+    """Vincenty迭代中由λ推出的各项"""
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+    cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+    sigma = np.arctan2(sin_sigma, cos_sigma)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+        cos2_alpha = 1 - sin_alpha ** 2
+        # 赤道上的航线 cos2_alpha 为0
+        cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+    return sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m
+
+
+def vincenty_inverse(lat1, lon1, lat2, lon2) -> Tuple[Any, Any]:
+    """
+    向量化的Vincenty反算：WGS84椭球上的距离（公里）和初始航向（度）
+
+    每轮只对尚未收敛的航线迭代；近对跖点等不收敛的航线退回球面大圆距离和航向。
+    """
+    lat1, lon1, lat2, lon2 = (np.asarray(v, dtype=np.float64) for v in (lat1, lon1, lat2, lon2))
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    big_l = np.radians(lon2) - np.radians(lon1)
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lam = big_l.copy()
+    active = np.arange(lam.size)
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        if active.size == 0:
+            break
+        sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m = _vincenty_terms(
+            lam[active], sin_u1[active], cos_u1[active], sin_u2[active], cos_u2[active])
+        c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        lam_next = big_l[active] + (1 - c) * WGS84_F * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+        done = np.abs(lam_next - lam[active]) < VINCENTY_TOLERANCE
+        lam[active] = lam_next
+        active = active[~done]
+
+    sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m = _vincenty_terms(
+        lam, sin_u1, cos_u1, sin_u2, cos_u2)
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+        - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)))
+    distance = WGS84_B * big_a * (sigma - delta_sigma) / 1000.0
+    bearing = np.degrees(np.arctan2(cos_u2 * np.sin(lam), cos_u1 * sin_u2 - sin_u1 * cos_u2 * np.cos(lam))) % 360.0
+
+    if active.size:
+        distance[active] = haversine_km(lat1[active], lon1[active], lat2[active], lon2[active])
+        bearing[active] = initial_bearing(lat1[active], lon1[active], lat2[active], lon2[active])
+    return distance, bearing
+
+
+def compute_routes(lat1, lon1, lat2, lon2, method: str = "haversine") -> Tuple[Any, Any]:
+    """
+    计算所有航线的距离（公里）和初始航向（度）
+    """
+    if method == "vincenty":
+        return vincenty_inverse(lat1, lon1, lat2, lon2)
+    if method != "haversine":
+        raise ValueError(f"未知的距离算法: {method}")
+    return haversine_km(lat1, lon1, lat2, lon2), initial_bearing(lat1, lon1, lat2, lon2)
+
+
+def _has_coords(ap: Dict[str, Any]) -> bool:
+    return isinstance(ap.get("latitude_deg"), (int, float)) and isinstance(ap.get("longitude_deg"), (int, float))
+
+
+def collect_edges(data: List[Dict[str, Any]], store: CoordStore) -> Dict[str, Any]:
+    """
+    展开所有航线为按列存储的数组
+
+    Returns:
+        字典：src/dst 经纬度、国家索引（-1表示未知）、所属出发机场序号、
+        目的地字典引用，以及各出发机场的目的地总数和无法解析的数量
+    """
+    src_rows: List[int] = []
+    dst_rows: List[int] = []
+    # 目的地已带经纬度时使用其自身坐标：(航线序号, 纬度, 经度)
+    overrides: List[Tuple[int, float, float]] = []
+    owner: List[int] = []
+    refs: List[Dict[str, Any]] = []
+    listed = [0] * len(data)
+    unresolved = [0] * len(data)
+    # 同一目的地在很多出发机场中重复出现，缓存代码解析结果
+    resolved: Dict[Tuple[Any, Any], Optional[int]] = {}
+
+    def resolve(icao: Any, iata: Any) -> Optional[int]:
+        key = (icao, iata)
+        if key not in resolved:
+            resolved[key] = store.resolve(icao, iata)
+        return resolved[key]
+
+    for item_index, item in enumerate(data):
+        departure = item.get("departure_airport") or {}
+        row = resolve(departure.get("icao"), departure.get("iata"))
+        flights = item.get("direct_flights")
+        if not isinstance(flights, list):
+            continue
+        for df in flights:
+            airports = df.get("airports") if isinstance(df, dict) else None
+            if not isinstance(airports, list):
+                continue
+            for ap in airports:
+                if not isinstance(ap, dict):
+                    continue
+                listed[item_index] += 1
+                dst_row = resolve(ap.get("icao"), ap.get("iata"))
+                has_coords = _has_coords(ap)
+                if row is None or (dst_row is None and not has_coords):
+                    unresolved[item_index] += 1
+                    continue
+                if has_coords:
+                    overrides.append((len(refs), ap["latitude_deg"], ap["longitude_deg"]))
+                src_rows.append(row)
+                dst_rows.append(-1 if dst_row is None else dst_row)
+                owner.append(item_index)
+                refs.append(ap)
+
+    # 按行号一次性取出坐标和国家
+    src = np.array(src_rows, dtype=np.int64)
+    dst = np.array(dst_rows, dtype=np.int64)
+    dst_known = dst >= 0
+    dst_lat = np.where(dst_known, store.latitude[dst], np.nan)
+    dst_lon = np.where(dst_known, store.longitude[dst], np.nan)
+    if overrides:
+        positions, lats, lons = zip(*overrides)
+        dst_lat[list(positions)] = lats
+        dst_lon[list(positions)] = lons
+    src_lat = np.asarray(store.latitude[src], dtype=np.float64)
+    src_lon = np.asarray(store.longitude[src], dtype=np.float64)
+    owners = np.array(owner, dtype=np.int64)
+
+    # 代码解析到了没有经纬度（NaN）的机场时，这条航线同样算作无法解析
+    valid = np.isfinite(src_lat) & np.isfinite(src_lon) & np.isfinite(dst_lat) & np.isfinite(dst_lon)
+    for item_index in owners[~valid].tolist():
+        unresolved[item_index] += 1
+    return {
+        "src_lat": src_lat[valid],
+        "src_lon": src_lon[valid],
+        "dst_lat": dst_lat[valid],
+        "dst_lon": dst_lon[valid],
+        "src_country": store.country_index[src].astype(np.int32)[valid],
+        "dst_country": np.where(dst_known, store.country_index[dst].astype(np.int32), -1)[valid],
+        "owner": owners[valid],
+        "refs": [ref for ref, ok in zip(refs, valid.tolist()) if ok],
+        "listed": listed,
+        "unresolved": unresolved,
+    }
+
+
+def aggregate(owner, distance, domestic, international, groups: int) -> Dict[str, Any]:
+    """
+    按出发机场分组聚合：航线数、最长航线下标、距离中位数、国内和国际航线数
+
+    先按 (出发机场, 距离) 排序，每组的最长航线是组内最后一个，中位数取组中间位置。
+    """
+    counts = np.bincount(owner, minlength=groups)
+    domestic_counts = np.bincount(owner, weights=domestic.astype(np.float64), minlength=groups)
+    international_counts = np.bincount(owner, weights=international.astype(np.float64), minlength=groups)
+    order = np.lexsort((distance, owner))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ends = starts + counts
+    has_routes = counts > 0
+
+    sorted_distance = distance[order]
+    longest = np.full(groups, -1, dtype=np.int64)
+    longest[has_routes] = order[ends[has_routes] - 1]
+    median = np.full(groups, np.nan)
+    lo = starts[has_routes] + (counts[has_routes] - 1) // 2
+    hi = starts[has_routes] + counts[has_routes] // 2
+    median[has_routes] = (sorted_distance[lo] + sorted_distance[hi]) / 2
+    return {"counts": counts, "domestic": domestic_counts, "international": international_counts,
+            "longest": longest, "median": median}
+
+
+def annotate(data: List[Dict[str, Any]], store: CoordStore, method: str = "haversine") -> Dict[str, Any]:
+    """
+    为destinations数据写入航线距离、航向和每个出发机场的route_stats
+
+    Returns:
+        统计：departures、routes、unresolved
+    """
+    edges = collect_edges(data, store)
+    distance, bearing = compute_routes(edges["src_lat"], edges["src_lon"], edges["dst_lat"], edges["dst_lon"], method)
+    # 只按坐标定位的目的地（dst_country 为 -1）和国家代码为空的机场国家未知，不计入国内/国际占比
+    missing = store.countries.index("") if "" in store.countries else -1
+    known = (edges["dst_country"] >= 0) & (edges["dst_country"] != missing) & (edges["src_country"] != missing)
+    domestic = known & (edges["dst_country"] == edges["src_country"])
+    international = known & ~domestic
+    stats = aggregate(edges["owner"], distance, domestic, international, len(data))
+
+    for ap, km, deg in zip(edges["refs"], distance.tolist(), bearing.tolist()):
+        ap["distance_km"] = round(km, 1)
+        ap["bearing_deg"] = round(deg, 1)
+
+    for item_index, item in enumerate(data):
+        count = int(stats["counts"][item_index])
+        route_stats: Dict[str, Any] = {
+            "route_count": count,
+            "unresolved_count": edges["unresolved"][item_index],
+            "longest_route": None,
+            "median_distance_km": None,
+            "domestic_share": None,
+            "international_share": None,
+            "unknown_country_count": 0,
+        }
+        if count:
+            longest = edges["refs"][int(stats["longest"][item_index])]
+            route_stats["longest_route"] = {
+                "name": longest.get("name"),
+                "iata": longest.get("iata"),
+                "icao": longest.get("icao"),
+                "distance_km": longest["distance_km"],
+            }
+            route_stats["median_distance_km"] = round(float(stats["median"][item_index]), 1)
+            domestic_count = int(stats["domestic"][item_index])
+            international_count = int(stats["international"][item_index])
+            known_count = domestic_count + international_count
+            route_stats["unknown_country_count"] = count - known_count
+            if known_count:
+                route_stats["domestic_share"] = round(domestic_count / known_count, 4)
+                route_stats["international_share"] = round(international_count / known_count, 4)
+        item["route_stats"] = route_stats
+
+    return {"departures": len(data), "routes": len(edges["refs"]), "unresolved": sum(edges["unresolved"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="计算destinations.json中航线的距离、航向和各机场航线统计")
+    parser.add_argument("input", help="destinations.json 路径")
+    parser.add_argument("--store", default="airports.coords", help="coord_store.py 导出的坐标存储目录")
+    parser.add_argument("-o", "--output", default=None, help="输出文件（默认写回输入文件）")
+    parser.add_argument("--method", choices=("haversine", "vincenty"), default="haversine",
+                        help="距离算法（默认: haversine）")
+    args = parser.parse_args()
+
+    try:
+        require_numpy()
+        store = CoordStore(args.store)
+        with open(args.input, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (RuntimeError, ValueError, FileNotFoundError) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    if not isinstance(data, list):
+        print("错误: destinations.json 必须是数组")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = annotate(data, store, args.method)
+    elapsed = time.perf_counter() - start
+
+    output = args.output or args.input
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, allow_nan=False)
+    os.replace(tmp_path, output)
+
+    print(f"✅ 已写入航线距离和统计: {output}")
+    print(f"出发机场: {stats['departures']}, 航线: {stats['routes']}, 无法解析: {stats['unresolved']}")
+    print(f"算法: {args.method}，计算耗时: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounding-box queries over airports.db
+基于airport_rtree空间索引（由csv_to_sqlite.py生成）按经纬度范围查询机场，
+支持跨越180°经线的范围，并提供与经纬度B-tree索引的性能对比
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+RESULT_COLUMNS = (
+    "id", "ident", "type", "name", "latitude_deg", "longitude_deg",
+    "iso_country", "icao_code", "iata_code",
+)
+
+# 带limit查询时优先返回的机场类型
+TYPE_ORDER = """
+    CASE a.type
+        WHEN 'large_airport' THEN 0
+        WHEN 'medium_airport' THEN 1
+        WHEN 'small_airport' THEN 2
+        WHEN 'seaplane_base' THEN 3
+        WHEN 'heliport' THEN 4
+        WHEN 'balloonport' THEN 5
+        ELSE 6
+    END
+"""
+
+# 基准测试使用的视口大小（经度跨度, 纬度跨度）
+VIEWPORTS = {
+    "city": (0.5, 0.3),
+    "region": (5.0, 3.0),
+    "country": (20.0, 12.0),
+    "continent": (70.0, 45.0),
+}
+
+
+def split_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> List[Tuple[float, float, float, float]]:
+    """
+    将查询范围拆分为不跨越180°经线的若干范围
+
+    min_lon > max_lon 表示范围跨越180°经线，例如 (170, -20, -170, 20)。
+    地图视口给出的未归一化经度如 (170, -20, 190, 20) 或 (-190, -20, -170, 20)
+    先归一化到 [-180, 180)（max_lon 为 (-180, 180]，保证恰为180°的东边界不变），再按跨线拆分。
+    """
+    if min_lat > max_lat:
+        min_lat, max_lat = max_lat, min_lat
+    min_lat = max(min_lat, -90.0)
+    max_lat = min(max_lat, 90.0)
+    if max_lon - min_lon >= 360:
+        return [(-180.0, min_lat, 180.0, max_lat)]
+    min_lon = (min_lon + 180.0) % 360.0 - 180.0
+    max_lon = 180.0 - (180.0 - max_lon) % 360.0
+    if min_lon > max_lon:
+        return [(min_lon, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lon, max_lat)]
+    return [(min_lon, min_lat, max_lon, max_lat)]
+
+
+def _build_query(boxes: List[Tuple[float, float, float, float]], box_sql: str,
+                 types: Optional[Iterable[str]], limit: Optional[int]) -> Tuple[str, List[Any]]:
+    """
+    组装范围查询SQL，{source} 占位符由调用方替换为带或不带索引提示的表名
+    """
+    params: List[Any] = []
+    box_clauses = []
+    for min_lon, min_lat, max_lon, max_lat in boxes:
+        box_clauses.append(box_sql)
+        params.extend([min_lon, max_lon, min_lat, max_lat] * (box_sql.count("?") // 4))
+
+    where = "(" + " OR ".join(box_clauses) + ")"
+    if types:
+        types = list(types)
+        where += f" AND a.type IN ({', '.join('?' for _ in types)})"
+        params.extend(types)
+
+    columns = ", ".join(f"a.{c}" for c in RESULT_COLUMNS)
+    sql = f"SELECT {columns} FROM {{source}} WHERE {where} ORDER BY {TYPE_ORDER}, a.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def airports_in_bbox(conn: sqlite3.Connection, min_lon: float, min_lat: float, max_lon: float, max_lat: float,
+                     types: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    使用R*Tree空间索引查询范围内的机场
+
+    Args:
+        conn: airports.db 数据库连接
+        min_lon, min_lat, max_lon, max_lat: 查询范围，min_lon > max_lon 时表示跨越180°经线，超出 ±180° 的经度自动回绕
+        types: 只返回这些类型的机场，为None时不过滤
+        limit: 最多返回的记录数，按大型、中型、小型机场等类型优先级返回
+
+    Returns:
+        机场字典列表
+    """
+    # R*Tree以32位浮点存储坐标，先用索引粗筛，再用原始经纬度精确过滤
+    box_sql = """(
+        a.id IN (
+            SELECT id FROM airport_rtree
+            WHERE max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ?
+        )
+        AND a.longitude_deg BETWEEN ? AND ? AND a.latitude_deg BETWEEN ? AND ?
+    )"""
+    sql, params = _build_query(split_bbox(min_lon, min_lat, max_lon, max_lat), box_sql, types, limit)
+    cursor = conn.execute(sql.format(source="airport a"), params)
+    return [dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def airports_in_bbox_btree(conn: sqlite3.Connection, min_lon: float, min_lat: float, max_lon: float, max_lat: float,
+                           types: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    使用经纬度复合B-tree索引（idx_airport_location）的同等查询，用于性能对比
+    """
+    box_sql = "(a.longitude_deg BETWEEN ? AND ? AND a.latitude_deg BETWEEN ? AND ?)"
+    sql, params = _build_query(split_bbox(min_lon, min_lat, max_lon, max_lat), box_sql, types, limit)
+    cursor = conn.execute(sql.format(source="airport a INDEXED BY idx_airport_location"), params)
+    return [dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def random_viewports(conn: sqlite3.Connection, size: Tuple[float, float], count: int,
+                     seed: int = 42) -> List[Tuple[float, float, float, float]]:
+    """
+    以随机机场为中心生成查询范围，经度超出±180°时折返为跨越180°经线的范围
+    """
+    rng = random.Random(seed)
+    centers = conn.execute("""
+        SELECT longitude_deg, latitude_deg FROM airport
+        WHERE latitude_deg IS NOT NULL AND longitude_deg IS NOT NULL
+        ORDER BY id
+    """).fetchall()
+    width, height = size
+    boxes = []
+    for _ in range(count):
+        lon, lat = rng.choice(centers)
+        min_lon = (lon - width / 2 + 540) % 360 - 180
+        max_lon = (lon + width / 2 + 540) % 360 - 180
+        boxes.append((min_lon, max(lat - height / 2, -90), max_lon, min(lat + height / 2, 90)))
+    return boxes
+
+
+def benchmark(db_path: str, queries: int = 200, limit: Optional[int] = None) -> None:
+    """
+    对比R*Tree与B-tree索引在不同视口大小下的查询耗时
+    """
+    conn = sqlite3.connect(db_path)
+    print(f"数据库: {db_path}，每种视口 {queries} 次查询，limit={limit}")
+    print(f"{'视口':<10}{'平均结果数':>10}{'R*Tree p50':>14}{'B-tree p50':>14}{'加速比':>10}")
+    for name, size in VIEWPORTS.items():
+        boxes = random_viewports(conn, size, queries)
+        timings = {}
+        counts = []
+        for func in (airports_in_bbox, airports_in_bbox_btree):
+            elapsed = []
+            for box in boxes:
+                start = time.perf_counter()
+                rows = func(conn, *box, limit=limit)
+                elapsed.append((time.perf_counter() - start) * 1000)
+                if func is airports_in_bbox:
+                    counts.append(len(rows))
+            timings[func.__name__] = statistics.median(elapsed)
+        rtree_ms = timings["airports_in_bbox"]
+        btree_ms = timings["airports_in_bbox_btree"]
+        print(f"{name:<10}{statistics.mean(counts):>10.0f}{rtree_ms:>11.3f} ms{btree_ms:>11.3f} ms{btree_ms / rtree_ms:>9.1f}x")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按经纬度范围查询机场")
+    parser.add_argument("db", help="airports.db 路径")
+    parser.add_argument("bbox", nargs="*", type=float, help="min_lon min_lat max_lon max_lat")
+    parser.add_argument("--types", type=str, default="", help="机场类型，逗号分隔")
+    parser.add_argument("--limit", type=int, default=None, help="最多返回的记录数")
+    parser.add_argument("--benchmark", action="store_true", help="对比R*Tree与B-tree索引的查询性能")
+    parser.add_argument("--queries", type=int, default=200, help="基准测试中每种视口的查询次数")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.db, args.queries, args.limit)
+        return
+    if len(args.bbox) != 4:
+        parser.error("需要提供 min_lon min_lat max_lon max_lat")
+
+    conn = sqlite3.connect(args.db)
+    types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+    rows = airports_in_bbox(conn, *args.bbox, types=types, limit=args.limit)
+    for row in rows:
+        print(f"{row['ident']:<8} {row['type'] or '':<15} {row['latitude_deg']:>10.4f} {row['longitude_deg']:>10.4f}  {row['name']}")
+    print(f"共 {len(rows)} 个机场")
+    conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.OperationalError as e:
+        print(f"错误: 查询失败: {e}", file=sys.stderr)
+        print("请先使用 csv_to_sqlite.py 重新生成 airports.db 以创建 airport_rtree 空间索引", file=sys.stderr)
+        sys.exit(1)
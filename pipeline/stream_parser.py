@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental JSON parser for streamed destination responses
+逐块解析模型流式输出的直飞目的地JSON：
+- 跳过开头的markdown代码块标记（```json）和结尾的 ```
+- 边接收边按 departure_airport / direct_flights 的结构校验，类型不符或出发机场
+  ICAO与请求不一致时立即抛出 StreamValidationError，不必等整个生成结束
+- 每个 direct_flights 元素完整后立即返回，下游处理可以与生成并行
+- BatchStreamParser 解析以ICAO为键的多机场批量响应，单个机场格式错误时只放弃该机场
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+NUMBER_PATTERN = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+LITERALS = {"true": True, "false": False, "null": None}
+WHITESPACE = " \t\r\n"
+FENCE = "```"
+FENCE_LANGUAGE = re.compile(r"[A-Za-z]*")
+
+PathItem = Union[str, int]
+
+# 值的种类
+OBJECT = "object"
+ARRAY = "array"
+STRING = "string"
+NUMBER = "number"
+BOOLEAN = "boolean"
+NULL = "null"
+
+CODE_FIELDS = ("name", "iata", "icao")
+REQUIRED_FIELDS = ("departure_airport", "direct_flights")
+
+
+class StreamValidationError(ValueError):
+    """模型输出不是合法的JSON，或不符合 destinations 的结构"""
+
+
+def expected_kinds(path: Tuple[PathItem, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    destinations 结构中某个位置允许的值种类，None表示不限制（未知字段）
+    """
+    depth = len(path)
+    if depth == 0:
+        return (OBJECT,)
+    if path[0] == "departure_airport":
+        if depth == 1:
+            return (OBJECT,)
+        if depth == 2 and path[1] in CODE_FIELDS:
+            return (STRING, NULL)
+        return None
+    if path[0] == "direct_flights":
+        if depth == 1:
+            return (ARRAY,)
+        if depth == 2:
+            return (OBJECT,)
+        if depth == 3 and path[2] == "city":
+            return (STRING, NULL)
+        if depth == 3 and path[2] == "airports":
+            return (ARRAY,)
+        if depth == 4 and path[2] == "airports":
+            return (OBJECT,)
+        if depth == 5 and path[2] == "airports" and path[4] in CODE_FIELDS:
+            return (STRING, NULL)
+    return None
+
+
+def _format_path(path: Tuple[PathItem, ...]) -> str:
+    return "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path) or "$"
+
+
+class _Frame:
+    """解析栈中的一个容器"""
+
+    __slots__ = ("kind", "value", "key", "state")
+
+    def __init__(self, kind: str, value: Any):
+        self.kind = kind
+        self.value = value
+        self.key: Optional[str] = None
+        # object: key / colon / value / comma；array: value / comma
+        self.state = "key" if kind == OBJECT else "value"
+
+
+class DestinationStreamParser:
+    """
+    destinations 响应的增量解析器
+
+    用法：每收到一段文本调用 feed()，返回本段中新完成的 direct_flights 元素；
+    生成结束后调用 close() 取得完整结果。
+
+    Args:
+        expected_icao: 请求的出发机场ICAO，提供时与 departure_airport.icao 不一致即报错
+    """
+
+    def __init__(self, expected_icao: Optional[str] = None):
+        self.expected_icao = (expected_icao or "").strip().upper() or None
+        self.buffer = ""
+        self.stack: List[_Frame] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.started = False
+        self.completed: List[Any] = []
+        self.consumed = 0
+        self.position = 0
+
+    def _path(self) -> Tuple[PathItem, ...]:
+        path: List[PathItem] = []
+        for frame in self.stack:
+            if frame.kind == OBJECT:
+                if frame.key is not None:
+                    path.append(frame.key)
+            else:
+                path.append(len(frame.value))
+        return tuple(path)
+
+    def _error(self, message: str) -> StreamValidationError:
+        return StreamValidationError(f"{message}（第 {self.position} 个字符附近）")
+
+    def _kinds(self, path: Tuple[PathItem, ...]) -> Optional[Tuple[str, ...]]:
+        return expected_kinds(path)
+
+    def _violation(self, path: Tuple[PathItem, ...], message: str) -> None:
+        """内容不符合格式"""
+        raise self._error(message)
+
+    def _check_kind(self, path: Tuple[PathItem, ...], kind: str) -> None:
+        allowed = self._kinds(path)
+        if allowed is not None and kind not in allowed:
+            self._violation(path, f"{_format_path(path)} 应为 {'/'.join(allowed)}，实际为 {kind}")
+
+    def _validate(self, path: Tuple[PathItem, ...], value: Any) -> None:
+        self._validate_entry(path, path, value, self.expected_icao)
+
+    def _validate_entry(self, path: Tuple[PathItem, ...], relative: Tuple[PathItem, ...], value: Any,
+                        expected_icao: Optional[str]) -> None:
+        """按单个机场的结构校验一个完整的值，relative 为相对于该机场结果的位置"""
+        if relative == ("departure_airport", "icao") and expected_icao is not None:
+            if not isinstance(value, str) or value.strip().upper() != expected_icao:
+                self._violation(path, f"出发机场ICAO不一致: 期望 {expected_icao}，实际为 {value}")
+        elif len(relative) == 2 and relative[0] == "direct_flights":
+            if not isinstance(value.get("airports"), list):
+                self._violation(path, f"{_format_path(path)} 缺少 airports 数组")
+            else:
+                self._flight_completed(path, value)
+        elif not relative:
+            for key in REQUIRED_FIELDS:
+                if key not in value:
+                    self._violation(path, f"{_format_path(path)} 缺少 {key}")
+
+    def _flight_completed(self, path: Tuple[PathItem, ...], flight: Dict[str, Any]) -> None:
+        self.completed.append(flight)
+
+    def _finish_value(self, path: Tuple[PathItem, ...], value: Any) -> None:
+        """一个值完整后：校验、放入父容器，必要时产出 direct_flights 元素"""
+        self._validate(path, value)
+        if not self.stack:
+            self.result = value
+            return
+        parent = self.stack[-1]
+        if parent.kind == OBJECT:
+            parent.value[parent.key] = value
+            parent.key = None
+        else:
+            parent.value.append(value)
+        parent.state = "comma"
+
+    def _skip_prefix(self) -> bool:
+        """跳过JSON之前的空白和markdown代码块标记，返回是否已到达JSON开头"""
+        while True:
+            stripped = self.buffer.lstrip(WHITESPACE)
+            self.consumed += len(self.buffer) - len(stripped)
+            self.buffer = stripped
+            if not self.buffer:
+                return False
+            if self.buffer.startswith(FENCE):
+                language = FENCE_LANGUAGE.match(self.buffer, len(FENCE))
+                if language.end() == len(self.buffer):
+                    # 语言标记可能还没收完
+                    return False
+                self.consumed += language.end()
+                self.buffer = self.buffer[language.end():]
+                continue
+            if len(self.buffer) < len(FENCE) and FENCE.startswith(self.buffer):
+                return False
+            self.position = self.consumed
+            if self.buffer[0] != "{":
+                raise self._error(f"JSON之前有多余的内容: {self.buffer[:20]!r}")
+            self.started = True
+            return True
+
+    def _check_suffix(self, final: bool) -> None:
+        """JSON结束后只允许空白和结尾的代码块标记"""
+        rest = self.buffer.strip(WHITESPACE)
+        self.position = self.consumed + len(self.buffer) - len(self.buffer.lstrip(WHITESPACE))
+        if rest.startswith(FENCE):
+            rest = rest[len(FENCE):].strip(WHITESPACE)
+        elif not final and FENCE.startswith(rest):
+            return
+        if rest:
+            raise self._error(f"JSON之后有多余的内容: {rest[:20]!r}")
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        输入一段文本
+
+        Returns:
+            本次新完成的 direct_flights 元素
+        """
+        self.buffer += text
+        self._parse(final=False)
+        completed, self.completed = self.completed, []
+        return completed
+
+    def close(self) -> Dict[str, Any]:
+        """
+        输入结束，返回完整结果
+
+        Raises:
+            StreamValidationError: JSON不完整或不合法
+        """
+        self._parse(final=True)
+        if self.result is None:
+            self.position = self.consumed + len(self.buffer)
+            raise self._error("JSON不完整")
+        return self.result
+
+    def _parse(self, final: bool) -> None:
+        if self.result is not None:
+            self._check_suffix(final)
+            return
+        if not self.started and not self._skip_prefix():
+            return
+
+        buffer = self.buffer
+        pos = 0
+        length = len(buffer)
+        while pos < length and self.result is None:
+            char = buffer[pos]
+            if char in WHITESPACE:
+                pos += 1
+                continue
+            self.position = self.consumed + pos
+            frame = self.stack[-1] if self.stack else None
+            state = frame.state if frame else "value"
+
+            if state == "comma":
+                if char == ",":
+                    frame.state = "key" if frame.kind == OBJECT else "value"
+                    pos += 1
+                    continue
+                closing = "}" if frame.kind == OBJECT else "]"
+                if char != closing:
+                    raise self._error(f"期望 ',' 或 '{closing}'，实际为 {char!r}")
+                pos += 1
+                self.stack.pop()
+                self._finish_value(self._path(), frame.value)
+                continue
+
+            if state == "colon":
+                if char != ":":
+                    raise self._error(f"期望 ':'，实际为 {char!r}")
+                frame.state = "value"
+                pos += 1
+                continue
+
+            if state == "key":
+                if char == "}" and not frame.value and frame.key is None:
+                    pos += 1
+                    self.stack.pop()
+                    self._finish_value(self._path(), frame.value)
+                    continue
+                if char != '"':
+                    raise self._error(f"期望字段名，实际为 {char!r}")
+                end = self._string_end(buffer, pos)
+                if end is None:
+                    break
+                frame.key = self._decode_string(buffer, pos)
+                frame.state = "colon"
+                pos = end
+                continue
+
+            # state == "value"
+            if char == "]" and frame is not None and frame.kind == ARRAY and not frame.value:
+                pos += 1
+                self.stack.pop()
+                self._finish_value(self._path(), frame.value)
+                continue
+            path = self._path()
+            if char == "{":
+                self._check_kind(path, OBJECT)
+                self.stack.append(_Frame(OBJECT, {}))
+                pos += 1
+            elif char == "[":
+                self._check_kind(path, ARRAY)
+                self.stack.append(_Frame(ARRAY, []))
+                pos += 1
+            elif char == '"':
+                self._check_kind(path, STRING)
+                end = self._string_end(buffer, pos)
+                if end is None:
+                    break
+                value = self._decode_string(buffer, pos)
+                pos = end
+                self._finish_value(path, value)
+            elif char == "-" or char.isdigit():
+                end = pos
+                while end < length and buffer[end] in NUMBER_CHARS:
+                    end += 1
+                if end == length and not final:
+                    # 数字可能还没收完
+                    break
+                number = buffer[pos:end]
+                if not NUMBER_PATTERN.fullmatch(number):
+                    raise self._error(f"无效的数字: {number!r}")
+                self._check_kind(path, NUMBER)
+                value = float(number) if any(c in number for c in ".eE") else int(number)
+                pos = end
+                self._finish_value(path, value)
+            else:
+                for literal, value in LITERALS.items():
+                    if buffer.startswith(literal, pos):
+                        self._check_kind(path, NULL if value is None else BOOLEAN)
+                        pos += len(literal)
+                        self._finish_value(path, value)
+                        break
+                else:
+                    if not final and literal_prefix(buffer[pos:]):
+                        break
+                    raise self._error(f"无法识别的内容: {buffer[pos:pos + 20]!r}")
+
+        self.consumed += pos
+        self.buffer = buffer[pos:]
+        if self.result is not None:
+            self._check_suffix(final)
+
+    @staticmethod
+    def _string_end(buffer: str, start: int) -> Optional[int]:
+        """字符串（从起始引号开始）结束后的位置，字符串还没收完时返回None"""
+        pos = start + 1
+        while True:
+            quote = buffer.find('"', pos)
+            if quote < 0:
+                return None
+            # 引号前连续反斜杠为偶数个时才是结束引号
+            backslashes = 0
+            i = quote - 1
+            while i > start and buffer[i] == "\\":
+                backslashes += 1
+                i -= 1
+            if backslashes % 2 == 0:
+                return quote + 1
+            pos = quote + 1
+
+    def _decode_string(self, buffer: str, start: int) -> str:
+        try:
+            value, _ = scanstring(buffer, start + 1, True)
+        except ValueError as e:
+            raise self._error(f"无效的字符串: {e}") from e
+        return value
+
+
+class BatchStreamParser(DestinationStreamParser):
+    """
+    多机场批量响应的增量解析器，顶层对象以出发机场ICAO为键，值为单个机场的结果
+
+    某个机场的内容不符合格式时只放弃该机场（原因记录在 rejected 中），其余机场照常解析；
+    JSON语法错误仍然中止整个响应，此前已完整解析的机场保留在 airports 中。
+    feed() 返回新完成的 (ICAO, direct_flights元素) 列表，close() 返回 ICAO 到结果的字典。
+    不在请求中的键原样跳过。
+
+    Args:
+        icaos: 请求中的出发机场ICAO
+    """
+
+    def __init__(self, icaos: List[str]):
+        super().__init__()
+        self.icaos = {icao.strip().upper() for icao in icaos}
+        self.airports: Dict[str, Dict[str, Any]] = {}
+        self.rejected: Dict[str, str] = {}
+
+    def _icao(self, path: Tuple[PathItem, ...]) -> Optional[str]:
+        """路径所属的请求中的机场，不属于任何机场时返回None"""
+        if not path or not isinstance(path[0], str):
+            return None
+        icao = path[0].strip().upper()
+        return icao if icao in self.icaos else None
+
+    def _kinds(self, path: Tuple[PathItem, ...]) -> Optional[Tuple[str, ...]]:
+        if not path:
+            return (OBJECT,)
+        icao = self._icao(path)
+        if icao is None or icao in self.rejected:
+            return None
+        return expected_kinds(path[1:])
+
+    def _violation(self, path: Tuple[PathItem, ...], message: str) -> None:
+        icao = self._icao(path)
+        if icao is None:
+            raise self._error(message)
+        self.rejected.setdefault(icao, str(self._error(message)))
+
+    def _validate(self, path: Tuple[PathItem, ...], value: Any) -> None:
+        icao = self._icao(path)
+        if icao is None or icao in self.rejected:
+            return
+        self._validate_entry(path, path[1:], value, icao)
+        if len(path) == 1 and icao not in self.rejected:
+            self.airports[icao] = value
+
+    def _flight_completed(self, path: Tuple[PathItem, ...], flight: Dict[str, Any]) -> None:
+        self.completed.append((self._icao(path), flight))
+
+    def close(self) -> Dict[str, Dict[str, Any]]:
+        super().close()
+        return self.airports
+
+
+def literal_prefix(text: str) -> bool:
+    """text 是否是 true/false/null 的不完整前缀"""
+    return any(literal.startswith(text) for literal in LITERALS)
+
+
+def parse_destinations(text: str, expected_icao: Optional[str] = None) -> Dict[str, Any]:
+    """一次性解析完整的模型输出"""
+    parser = DestinationStreamParser(expected_icao)
+    parser.feed(text)
+    return parser.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    data = sys.stdin.read()
+    print(json.dumps(parse_destinations(data), ensure_ascii=False, indent=2))
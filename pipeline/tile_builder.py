@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pure-Python PMTiles builder for airport points
+不依赖tippecanoe，直接将机场点数据生成PMTiles矢量瓦片归档：
+1. 所有点只投影一次到Web Mercator世界坐标
+2. 按zoom把点分桶到瓦片（含边缘缓冲区），按 zoom_rules 和每瓦片要素上限筛选
+3. 多进程并行编码MVT瓦片并gzip压缩
+4. 写出内容去重的PMTiles v3归档
+
+输入可以是 airports.csv、GeoJSON 或 GeoJSONSeq（可指定多个，如机场点加聚合点）。
+GeoJSON要素可通过 "tippecanoe": {"minzoom", "maxzoom", "layer"} 指定显示级别和图层。
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from csv_to_geojson import iter_features, zoom_rules
+from mvt_encoder import DEFAULT_EXTENT, encode_tile
+from pmtiles_writer import PMTilesWriter, gzip_bytes
+
+DEFAULT_LAYER = "airports"
+
+# README 中 tippecanoe --include 的默认属性，去掉 csv_to_geojson 不输出的 continent
+DEFAULT_INCLUDE = (
+    "name", "ident", "elevation_ft", "iso_country",
+    "iso_region", "icao_code", "iata_code", "type",
+)
+
+# 瓦片要素超出上限时优先保留的机场类型
+TYPE_PRIORITY = {
+    "large_airport": 0,
+    "medium_airport": 1,
+    "small_airport": 2,
+    "seaplane_base": 3,
+    "heliport": 4,
+    "balloonport": 5,
+    "closed": 6,
+}
+
+# Web Mercator可表示的最大纬度
+MAX_LATITUDE = 85.05112878
+
+# 边缘缓冲区大小，单位为瓦片宽度的1/256（与tippecanoe默认值相同）
+DEFAULT_BUFFER = 5
+
+# 单个要素：(世界坐标x, 世界坐标y, minzoom, maxzoom, 图层名, 属性)
+TileFeature = Tuple[float, float, int, int, str, Tuple[Tuple[str, Any], ...]]
+
+_worker_features: List[TileFeature] = []
+_worker_extent = DEFAULT_EXTENT
+
+
+def project(longitude: float, latitude: float) -> Tuple[float, float]:
+    """
+    经纬度投影为Web Mercator世界坐标，范围 [0, 1)，y轴向南
+    """
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def read_geojson_features(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    读取GeoJSON FeatureCollection或GeoJSONSeq（每行一个要素，可带RS分隔符）
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "{":
+            # 可能是FeatureCollection，也可能是每行一个要素的NDJSON
+            line = f.readline().strip().strip("\x1e")
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                obj = None
+            if obj is not None and obj.get("type") == "Feature":
+                yield obj
+                for line in f:
+                    line = line.strip().strip("\x1e")
+                    if line:
+                        yield json.loads(line)
+                return
+            f.seek(0)
+            yield from json.load(f).get("features", [])
+            return
+        for line in f:
+            line = line.strip().strip("\x1e")
+            if line:
+                yield json.loads(line)
+
+
+def load_features(paths: Sequence[str], include: Sequence[str]) -> List[TileFeature]:
+    """
+    读取所有输入并投影，按（类型优先级, 输入顺序）排序，
+    分桶时按此顺序追加，每个瓦片的要素列表天然按优先级排列
+    """
+    keyed = []
+    order = 0
+    for path in paths:
+        if path.lower().endswith(".csv"):
+            source = iter_features(path)
+        else:
+            source = read_geojson_features(path)
+        for feature in source:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            longitude, latitude = geometry["coordinates"][:2]
+            properties = feature.get("properties") or {}
+            options = feature.get("tippecanoe") or {}
+            airport_type = properties.get("type")
+            minzoom = options.get("minzoom", properties.get("minzoom", zoom_rules.get(airport_type, 0)))
+            maxzoom = options.get("maxzoom", 32)
+            layer = options.get("layer", DEFAULT_LAYER)
+            if layer == DEFAULT_LAYER:
+                props = tuple((key, properties[key]) for key in include if properties.get(key) is not None)
+            else:
+                # 其他图层（如聚合点）保留全部属性
+                props = tuple((key, value) for key, value in properties.items() if value is not None)
+            x, y = project(longitude, latitude)
+            priority = TYPE_PRIORITY.get(airport_type, len(TYPE_PRIORITY))
+            keyed.append(((priority, order), (x, y, int(minzoom), int(maxzoom), layer, props)))
+            order += 1
+    keyed.sort(key=lambda item: item[0])
+    return [feature for _, feature in keyed]
+
+
+def bucket_features(features: List[TileFeature], z: int, buffer: float) -> Dict[Tuple[int, int], List[int]]:
+    """
+    将该zoom可见的要素分配到瓦片，距离瓦片边缘小于缓冲区的要素同时放入相邻瓦片
+
+    Returns:
+        (x, y) -> 要素下标列表（按优先级排列）
+    """
+    n = 1 << z
+    tiles: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for index, (wx, wy, minzoom, maxzoom, _, _) in enumerate(features):
+        if not (minzoom <= z <= maxzoom):
+            continue
+        fx = wx * n
+        fy = wy * n
+        tx = int(fx)
+        ty = int(fy)
+        xs = [tx]
+        ys = [ty]
+        if fx - tx < buffer and tx > 0:
+            xs.append(tx - 1)
+        elif fx - tx > 1 - buffer and tx < n - 1:
+            xs.append(tx + 1)
+        if fy - ty < buffer and ty > 0:
+            ys.append(ty - 1)
+        elif fy - ty > 1 - buffer and ty < n - 1:
+            ys.append(ty + 1)
+        for x in xs:
+            for y in ys:
+                tiles[(x, y)].append(index)
+    return tiles
+
+
+def _init_worker(features: List[TileFeature], extent: int) -> None:
+    global _worker_features, _worker_extent
+    _worker_features = features
+    _worker_extent = extent
+
+
+def encode_tiles(task: Tuple[int, List[Tuple[int, int, List[int]]], Optional[int]]) -> List[Tuple[int, int, int, bytes, int]]:
+    """
+    工作进程：编码一组瓦片
+
+    Args:
+        task: (zoom, [(x, y, 要素下标列表)], 每个图层的要素上限，None表示不限)
+
+    Returns:
+        [(z, x, y, gzip后的MVT数据, 丢弃的要素数)]
+    """
+    z, tiles, max_features = task
+    n = 1 << z
+    extent = _worker_extent
+    results = []
+    for x, y, indices in tiles:
+        layers: Dict[str, List[Tuple[int, int, Tuple[Tuple[str, Any], ...]]]] = defaultdict(list)
+        dropped = 0
+        for index in indices:
+            wx, wy, _, _, layer, props = _worker_features[index]
+            features = layers[layer]
+            if max_features is not None and len(features) >= max_features:
+                dropped += 1
+                continue
+            px = int(round((wx * n - x) * extent))
+            py = int(round((wy * n - y) * extent))
+            features.append((px, py, props))
+        results.append((z, x, y, gzip_bytes(encode_tile(layers, extent)), dropped))
+    return results
+
+
+def build_tasks(tiles: Dict[Tuple[int, int], List[int]], z: int, max_features: Optional[int],
+                chunks: int) -> List[Tuple[int, List[Tuple[int, int, List[int]]], Optional[int]]]:
+    """将一个zoom的瓦片按顺序分成若干任务"""
+    items = [(x, y, indices) for (x, y), indices in sorted(tiles.items())]
+    size = max(1, math.ceil(len(items) / chunks))
+    return [(z, items[i:i + size], max_features) for i in range(0, len(items), size)]
+
+
+def layer_metadata(features: List[TileFeature], min_zoom: int, max_zoom: int) -> List[Dict[str, Any]]:
+    """生成TileJSON vector_layers描述"""
+    layers: Dict[str, Dict[str, str]] = defaultdict(dict)
+    zooms: Dict[str, List[int]] = {}
+    for _, _, minzoom, maxzoom, layer, props in features:
+        for key, value in props:
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            layers[layer][key] = "Number" if is_number else "String"
+        low, high = zooms.get(layer, (max_zoom, min_zoom))
+        zooms[layer] = [min(low, max(minzoom, min_zoom)), max(high, min(maxzoom, max_zoom))]
+    return [
+        {"id": layer, "fields": dict(sorted(fields.items())), "minzoom": zooms[layer][0], "maxzoom": zooms[layer][1]}
+        for layer, fields in sorted(layers.items())
+    ]
+
+
+def build_pmtiles(inputs: Sequence[str], output_path: str, min_zoom: int = 0, max_zoom: int = 12,
+                  max_features: int = 2000, workers: int = 1, include: Sequence[str] = DEFAULT_INCLUDE,
+                  extent: int = DEFAULT_EXTENT, buffer: int = DEFAULT_BUFFER) -> Dict[str, int]:
+    """
+    生成PMTiles归档
+
+    Args:
+        inputs: 输入文件（CSV、GeoJSON或GeoJSONSeq）
+        output_path: 输出PMTiles文件路径
+        min_zoom, max_zoom: 缩放级别范围
+        max_features: 每个瓦片每个图层最多保留的要素数，最大zoom不限制
+        workers: 编码瓦片的进程数
+        include: 写入airports图层的属性
+        extent: 瓦片坐标范围
+        buffer: 边缘缓冲区，单位为瓦片宽度的1/256
+
+    Returns:
+        归档统计信息
+    """
+    start = time.perf_counter()
+    features = load_features(inputs, include)
+    if not features:
+        raise ValueError("输入中没有点要素")
+    print(f"已读取并投影 {len(features)} 个要素")
+
+    writer_stats = {"dropped": 0}
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as output:
+        writer = PMTilesWriter(output)
+        pool = multiprocessing.Pool(workers, _init_worker, (features, extent)) if workers > 1 else None
+        if pool is None:
+            _init_worker(features, extent)
+        try:
+            for z in range(min_zoom, max_zoom + 1):
+                tiles = bucket_features(features, z, buffer / 256)
+                limit = None if z == max_zoom else max_features
+                tasks = build_tasks(tiles, z, limit, max(1, workers) * 4)
+                results = pool.imap(encode_tiles, tasks) if pool else map(encode_tiles, tasks)
+                dropped = 0
+                for batch in results:
+                    for tz, x, y, data, tile_dropped in batch:
+                        writer.add_tile(tz, x, y, data)
+                        dropped += tile_dropped
+                writer_stats["dropped"] += dropped
+                print(f"zoom {z}: {len(tiles)} 个瓦片，因要素上限丢弃 {dropped} 个要素")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        longitudes = [wx * 360.0 - 180.0 for wx, _, _, _, _, _ in features]
+        latitudes = [math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * wy)))) for _, wy, _, _, _, _ in features]
+        bounds = (min(longitudes), min(latitudes), max(longitudes), max(latitudes))
+        metadata = {
+            "name": os.path.splitext(os.path.basename(output_path))[0],
+            "format": "pbf",
+            "generator": "tile_builder.py",
+            "vector_layers": layer_metadata(features, min_zoom, max_zoom),
+        }
+        stats = writer.finish(metadata, min_zoom, max_zoom, bounds)
+    os.replace(tmp_path, output_path)
+
+    stats.update(writer_stats)
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="不依赖tippecanoe生成机场PMTiles矢量瓦片",
+        epilog="示例: python tile_builder.py airports.csv -o airports.pmtiles --workers 8",
+    )
+    parser.add_argument("inputs", nargs="+", help="输入文件：CSV、GeoJSON或GeoJSONSeq")
+    parser.add_argument("-o", "--output", required=True, help="输出PMTiles文件")
+    parser.add_argument("--minzoom", type=int, default=0, help="最小缩放级别（默认: 0）")
+    parser.add_argument("--maxzoom", type=int, default=12, help="最大缩放级别（默认: 12）")
+    parser.add_argument("--max-features", type=int, default=2000,
+                        help="最大zoom以下每个瓦片每个图层最多保留的要素数（默认: 2000）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="编码进程数（默认: CPU核数）")
+    parser.add_argument("--include", type=str, default=",".join(DEFAULT_INCLUDE), help="写入瓦片的属性，逗号分隔")
+    parser.add_argument("--buffer", type=int, default=DEFAULT_BUFFER, help="边缘缓冲区，单位为瓦片宽度的1/256（默认: 5）")
+    args = parser.parse_args()
+
+    include = [key.strip() for key in args.include.split(",") if key.strip()]
+    try:
+        stats = build_pmtiles(
+            args.inputs,
+            args.output,
+            min_zoom=args.minzoom,
+            max_zoom=args.maxzoom,
+            max_features=args.max_features,
+            workers=args.workers,
+            include=include,
+            buffer=args.buffer,
+        )
+    except FileNotFoundError as e:
+        print(f"错误: 找不到文件 {e.filename}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"错误: 生成瓦片时出错: {e}")
+        sys.exit(1)
+
+    print(f"\n生成完成！")
+    print(f"输出文件: {args.output}")
+    print(f"瓦片数: {stats['addressed_tiles']}，目录项: {stats['tile_entries']}，去重后瓦片内容: {stats['tile_contents']}")
+    print(f"文件大小: {stats['total_bytes'] / 1024 / 1024:.1f} MB（目录 {stats['directory_bytes'] / 1024:.1f} KB）")
+    print(f"耗时: {stats['seconds']} 秒")
+
+
+if __name__ == "__main__":
+    main()
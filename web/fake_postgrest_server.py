@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in PostgREST server for migrate.py
+本地模拟的 PostgREST（Supabase /rest/v1）服务，数据保存在内存中，用于在不连接 Supabase 的情况下
+测试和基准测试 migrate.py 的并发上传：
+- 支持 upsert（Prefer: resolution=merge-duplicates + on_conflict）、select、按 eq/neq/in/is.null/or/and 过滤的 select 和 delete
+- 可设置返回行数上限（和 PostgREST 的 db-max-rows 一样），查询和 upsert 回传的行超过上限时被截断
+- address、airport 等表自动分配自增 id
+- 每个请求的耗时 = 固定延迟 + 每行延迟，同时处理的请求数受 connections 限制（模拟数据库连接池）
+- 所有请求都可按比例返回 503，请求体超过上限时返回 413，用于验证重试、拆分和批量大小调整
+
+--check 用本服务端到端检查 migrate.py 的 --truncate 和带删除的 --sync，结束后远端数据应与本地一致；
+--check-load 在有延迟、503、413的服务上检查重试和拆分后的数据，并对比 --workers 1 与 --workers N 的吞吐。
+
+示例:
+    python fake_postgrest_server.py --port 8766 --latency 0.05 --error-rate 0.05
+    python migrate.py --url http://127.0.0.1:8766 --workers 8
+    python fake_postgrest_server.py --check ../pipeline/airports.db
+    python fake_postgrest_server.py --check-load ../pipeline/airports.db --check-workers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# 插入时自动分配 id 的表
+SERIAL_TABLES = ("address", "airport", "route")
+
+
+class FakePostgrestServer(ThreadingHTTPServer):
+    """模拟 PostgREST 服务，表数据和计数器可在进程内直接读取"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.02, row_latency: float = 0.0001,
+                 connections: int = 8, error_rate: float = 0.0, max_body: Optional[int] = None,
+                 max_rows: Optional[int] = None, seed: int = 0):
+        super().__init__(address, FakePostgrestHandler)
+        self.latency = latency
+        self.row_latency = row_latency
+        self.error_rate = error_rate
+        self.max_body = max_body
+        self.max_rows = max_rows
+        self.slots = threading.BoundedSemaphore(max(1, connections))
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # 表名 -> {id: 行}；没有 id 列的表使用内部序号
+        self.tables: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.next_ids: Dict[str, int] = {}
+        # (表名, 冲突列) -> {冲突列的值: 行序号}
+        self.indexes: Dict[Tuple[str, Tuple[str, ...]], Dict[Tuple[Any, ...], int]] = {}
+        self.stats = {"requests": 0, "upserts": 0, "rows": 0, "errors": 0, "too_large": 0, "selects": 0,
+                      "rows_returned": 0, "truncated": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self, body_size: int) -> Optional[int]:
+        """决定本次请求是否返回错误，返回错误状态码或None"""
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.max_body and body_size > self.max_body:
+                self.stats["too_large"] += 1
+                return 413
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503
+            return None
+
+    def work(self, rows: int) -> None:
+        """占用一个连接并按行数模拟执行耗时"""
+        with self.slots:
+            with self.lock:
+                self.stats["in_flight"] += 1
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            time.sleep(self.latency + self.row_latency * rows)
+            with self.lock:
+                self.stats["in_flight"] -= 1
+
+    def index(self, table: str, columns: Tuple[str, ...]) -> Dict[Tuple[Any, ...], int]:
+        key = (table, columns)
+        if key not in self.indexes:
+            rows = self.tables.get(table, {})
+            self.indexes[key] = {tuple(row.get(c) for c in columns): rid for rid, row in rows.items()}
+        return self.indexes[key]
+
+    def upsert(self, table: str, rows: List[Dict[str, Any]], on_conflict: Tuple[str, ...],
+               merge: bool) -> Tuple[int, Any]:
+        """写入多行，返回 (状态码, 写入后的行或错误)"""
+        with self.lock:
+            data = self.tables.setdefault(table, {})
+            conflict = on_conflict or (("id",) if table in SERIAL_TABLES else ())
+            index = self.index(table, conflict) if conflict else None
+            written = []
+            for row in rows:
+                rid = index.get(tuple(row.get(c) for c in conflict)) if index is not None else None
+                if rid is not None:
+                    if not merge:
+                        return 409, {"code": "23505", "message": "duplicate key value violates unique constraint",
+                                     "details": None, "hint": None}
+                    data[rid].update(row)
+                    written.append(data[rid])
+                    continue
+                rid = self.next_ids.get(table, 1)
+                if "id" in row and row["id"] is not None:
+                    rid = max(rid, row["id"])
+                self.next_ids[table] = rid + 1
+                new_row = dict(row)
+                if table in SERIAL_TABLES:
+                    new_row.setdefault("id", rid)
+                data[rid] = new_row
+                for (name, columns), mapping in self.indexes.items():
+                    if name == table:
+                        mapping[tuple(new_row.get(c) for c in columns)] = rid
+                written.append(new_row)
+            self.stats["upserts"] += 1
+            self.stats["rows"] += len(rows)
+            return 201, written
+
+    def project(self, rows: List[Dict[str, Any]], columns: str) -> List[Dict[str, Any]]:
+        """按 select 参数取列，并按 max_rows 截断"""
+        if self.max_rows is not None and len(rows) > self.max_rows:
+            self.stats["truncated"] += 1
+            rows = rows[:self.max_rows]
+        self.stats["rows_returned"] += len(rows)
+        if columns and columns != "*":
+            names = [c.strip() for c in columns.split(",")]
+            return [{c: row.get(c) for c in names} for row in rows]
+        return [dict(row) for row in rows]
+
+    def select(self, table: str, columns: str, filters: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            self.stats["selects"] += 1
+            data = self.tables.get(table, {})
+            predicate = compile_filters(filters)
+            keys = key_set(parse_logic(filters[0][1])) if len(filters) == 1 and filters[0][0] == "or" else None
+            if keys is not None:
+                # 按唯一键查询时使用索引，和数据库一样不扫描整张表
+                index = self.index(table, keys[0])
+                rows = [data[rid] for rid in (index.get(key) for key in keys[1]) if rid is not None]
+                rows = [row for row in rows if predicate(row)]
+            else:
+                rows = [row for row in data.values() if predicate(row)]
+            return self.project(rows, columns)
+
+    def delete(self, table: str, filters: List[Tuple[str, str]]) -> int:
+        with self.lock:
+            data = self.tables.get(table, {})
+            predicate = compile_filters(filters)
+            key = exact_key(filters)
+            rid = self.index(table, key[0]).get(key[1]) if key is not None else None
+            if rid is not None and predicate(data[rid]):
+                # 按唯一键逐行删除时使用索引；索引按原值存储，数字列等查不到时退回全表扫描
+                doomed = [rid]
+            else:
+                doomed = [rid for rid, row in data.items() if predicate(row)]
+            for rid in doomed:
+                row = data.pop(rid)
+                for (name, columns), mapping in self.indexes.items():
+                    key = tuple(row.get(c) for c in columns)
+                    if name == table and mapping.get(key) == rid:
+                        del mapping[key]
+            return len(doomed)
+
+
+def split_items(text: str) -> List[str]:
+    """按顶层逗号拆分，跳过括号和双引号内的逗号，保留原文"""
+    items, current, depth, quoted, escaped = [], "", 0, False, False
+    for char in text:
+        if escaped:
+            escaped = False
+        elif char == "\\" and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            items.append(current)
+            current = ""
+            continue
+        current += char
+    items.append(current)
+    return items
+
+
+def unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+        result, escaped = "", False
+        for char in value:
+            if escaped or char != "\\":
+                result += char
+                escaped = False
+            else:
+                escaped = True
+        return result
+    return value
+
+
+def parse_list(value: str) -> List[str]:
+    """解析 in.(a,"b,c") 的值列表"""
+    return [unquote(item) for item in split_items(value.strip()[1:-1])]
+
+
+def parse_logic(value: str) -> List[Tuple[str, str]]:
+    """把 or/and 的 (a.eq.1,and(b.is.null,c.eq."x")) 拆成 (列, 条件)，嵌套的 and/or 保持原样"""
+    conditions = []
+    for item in split_items(value.strip()[1:-1]):
+        for op in ("and", "or"):
+            if item.startswith(op + "("):
+                conditions.append((op, item[len(op):]))
+                break
+        else:
+            column, _, condition = item.partition(".")
+            conditions.append((column, condition))
+    return conditions
+
+
+def compile_filters(filters: List[Tuple[str, str]]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    把过滤条件编译为判断函数，只支持 eq / neq / in / is.null 以及 or/and 组合，值按字符串比较
+
+    or 的每一项都是同一组列上的 and(列.eq.值, 列.is.null, ...) 时（按唯一键查询），用集合判断。
+    """
+    predicates = [compile_condition(column, condition) for column, condition in filters]
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+def compile_condition(column: str, condition: str) -> Callable[[Dict[str, Any]], bool]:
+    if column == "and":
+        return compile_filters(parse_logic(condition))
+    if column == "or":
+        items = parse_logic(condition)
+        keys = key_set(items)
+        if keys is not None:
+            columns, values = keys
+            return lambda row: tuple(as_text(row.get(c)) for c in columns) in values
+        alternatives = [compile_condition(*item) for item in items]
+        return lambda row: any(predicate(row) for predicate in alternatives)
+    op, _, value = condition.partition(".")
+    if op == "eq":
+        value = unquote(value)
+        return lambda row: as_text(row.get(column)) == value
+    if op == "neq":
+        value = unquote(value)
+        return lambda row: as_text(row.get(column)) != value
+    if op == "in":
+        values = set(parse_list(value))
+        return lambda row: as_text(row.get(column)) in values
+    if op == "is" and value == "null":
+        return lambda row: row.get(column) is None
+    return lambda row: True
+
+
+def key_set(items: List[Tuple[str, str]]) -> Optional[Tuple[Tuple[str, ...], set]]:
+    """or 的各项都是同一组列上的 eq/is.null 时返回 (列, 值元组集合)，否则返回None"""
+    columns, values = None, set()
+    for op, group in items:
+        if op != "and":
+            return None
+        conditions = parse_logic(group)
+        names = tuple(column for column, _ in conditions)
+        if columns is None:
+            columns = names
+        if names != columns:
+            return None
+        key = []
+        for _, condition in conditions:
+            kind, _, value = condition.partition(".")
+            if kind == "eq":
+                key.append(unquote(value))
+            elif kind == "is" and value == "null":
+                key.append(None)
+            else:
+                return None
+        values.add(tuple(key))
+    return (columns, values) if columns is not None else None
+
+
+def exact_key(filters: List[Tuple[str, str]]) -> Optional[Tuple[Tuple[str, ...], Tuple[Any, ...]]]:
+    """过滤条件全是 列=eq.值 / 列=is.null 时返回 (列, 值元组)，否则返回None"""
+    columns, key = [], []
+    for column, condition in filters:
+        kind, _, value = condition.partition(".")
+        if kind == "eq":
+            key.append(unquote(value))
+        elif kind == "is" and value == "null":
+            key.append(None)
+        else:
+            return None
+        columns.append(column)
+    return (tuple(columns), tuple(key)) if columns else None
+
+
+def as_text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    server: FakePostgrestServer
+    protocol_version = "HTTP/1.1"
+    # 保持连接时响应头和响应体分两次写出，不关闭 Nagle 会让每个响应多等一个延迟 ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, status: int, payload: Any) -> None:
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, status: int, text: str) -> None:
+        """网关错误返回的不是JSON，和 Cloudflare/nginx 一样"""
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def admitted(self, body_size: int) -> bool:
+        """按 server.admit 的结果决定是否处理本次请求，拒绝时返回 413/503（所有方法都经过这里）"""
+        status = self.server.admit(body_size)
+        if status is None:
+            return True
+        if status == 413:
+            self.send_text(413, "<html><body><h1>413 Request Entity Too Large</h1></body></html>")
+        else:
+            self.send_text(status, "<html><body><h1>503 Service Temporarily Unavailable</h1></body></html>")
+        return False
+
+    def read_body(self) -> bytes:
+        """读完请求体；GET/DELETE 也可能带请求体（postgrest-py 的 DELETE 发送 {}），不读完会污染保持的连接"""
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def parse(self) -> Tuple[Optional[str], Dict[str, str], List[Tuple[str, str]]]:
+        """返回 (表名, 控制参数, 过滤条件)"""
+        parts = urlsplit(self.path)
+        prefix = "/rest/v1/"
+        table = parts.path[len(prefix):].strip("/") if parts.path.startswith(prefix) else None
+        params, filters = {}, []
+        for name, value in parse_qsl(parts.query, keep_blank_values=True):
+            if name in ("select", "on_conflict", "columns", "limit", "offset", "order"):
+                params[name] = value
+            else:
+                filters.append((name, value))
+        return table or None, params, filters
+
+    def do_GET(self) -> None:
+        raw = self.read_body()
+        if self.path.rstrip("/") == "/stats":
+            with self.server.lock:
+                self.send_json(200, self.server.stats)
+            return
+        table, params, filters = self.parse()
+        if table is None:
+            self.send_error(404)
+            return
+        if not self.admitted(len(raw)):
+            return
+        self.server.work(0)
+        self.send_json(200, self.server.select(table, params.get("select", "*"), filters))
+
+    def do_DELETE(self) -> None:
+        raw = self.read_body()
+        table, _, filters = self.parse()
+        if table is None:
+            self.send_error(404)
+            return
+        if not self.admitted(len(raw)):
+            return
+        self.server.work(0)
+        self.server.delete(table, filters)
+        self.send_json(204, None)
+
+    def do_POST(self) -> None:
+        table, params, _ = self.parse()
+        if table is None:
+            self.send_error(404)
+            return
+        raw = self.read_body()
+        if not self.admitted(len(raw)):
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self.send_json(400, {"code": "PGRST102", "message": "Empty or invalid json", "details": None, "hint": None})
+            return
+        rows = payload if isinstance(payload, list) else [payload]
+        prefer = self.headers.get("Prefer", "")
+        on_conflict = tuple(c for c in params.get("on_conflict", "").split(",") if c)
+        self.server.work(len(rows))
+        status, result = self.server.upsert(table, rows, on_conflict, "resolution=merge-duplicates" in prefer)
+        if status >= 400:
+            self.send_json(status, result)
+        elif "return=representation" in prefer:
+            with self.server.lock:
+                result = self.server.project(result, params.get("select", "*"))
+            self.send_json(status, result)
+        else:
+            self.send_json(status, None)
+
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> FakePostgrestServer:
+    """在后台线程启动模拟服务，port为0时自动选择端口"""
+    server = FakePostgrestServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def remote_state(server: FakePostgrestServer) -> Dict[str, set]:
+    """远端各表的唯一键集合，airport 带上按 address_id 找到的地址键，route 的两端换成 ident"""
+    with server.lock:
+        addresses = {row["id"]: (row["country"], row.get("region"), row.get("municipality"))
+                     for row in server.tables.get("address", {}).values()}
+        idents = {row["id"]: row["ident"] for row in server.tables.get("airport", {}).values()}
+        return {
+            "address": set(addresses.values()),
+            "airport": {(row["ident"], addresses.get(row.get("address_id")))
+                        for row in server.tables.get("airport", {}).values()},
+            "country_stats": {(row["country_code"], row.get("airport_count"))
+                              for row in server.tables.get("country_stats", {}).values()},
+            "route": {(idents.get(row["origin_airport_id"]), idents.get(row["dest_airport_id"]), row.get("dest_city"))
+                      for row in server.tables.get("route", {}).values()},
+        }
+
+
+def local_state(db_path: str) -> Dict[str, set]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            "address": set(conn.execute("SELECT country, region, municipality FROM address")),
+            "airport": {(ident, None if country is None else (country, region, municipality))
+                        for ident, country, region, municipality in conn.execute("""
+                            SELECT a.ident, addr.country, addr.region, addr.municipality
+                            FROM airport a LEFT JOIN address addr ON a.address_id = addr.id
+                        """)},
+            "country_stats": set(conn.execute("SELECT country_code, airport_count FROM country_stats")),
+            # 和 migrate.py 一样只比较两端机场都还在的航线
+            "route": set(conn.execute("""
+                SELECT o.ident, d.ident, r.dest_city FROM route r
+                JOIN airport o ON o.id = r.origin_airport_id
+                JOIN airport d ON d.id = r.dest_airport_id
+            """)) if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'route'").fetchone() else set(),
+        }
+    finally:
+        conn.close()
+
+
+def state_problems(name: str, db_path: str, server: FakePostgrestServer) -> List[str]:
+    """比较本地数据库和远端各表的唯一键集合"""
+    problems = []
+    expected, actual = local_state(db_path), remote_state(server)
+    for table in expected:
+        missing, extra_rows = expected[table] - actual[table], actual[table] - expected[table]
+        if missing or extra_rows:
+            problems.append(f"{name}: {table} 缺少 {len(missing)} 行，多出 {len(extra_rows)} 行")
+    return problems
+
+
+def check_migrate(db_path: str, workers: int = 4, max_rows: int = 300) -> List[str]:
+    """
+    端到端检查 migrate.py：先 --truncate 全量迁移，再在本地副本中删除一个国家的机场、地址和统计
+    以及一个出发机场的航线，用 --sync 同步，每一步之后比较远端和本地的数据
+
+    服务的返回行数上限 max_rows 远小于表的行数，upsert 回传的 id 被截断，airport 的 address_id
+    和航线两端的机场 id 必须靠按键查询补齐，比较时 airport 按地址键、航线按 ident 对照，映射丢失即不一致。
+
+    Returns:
+        不一致之处的描述，一致时为空列表
+    """
+    migrate = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrate.py")
+    server = start_fake_server(latency=0, row_latency=0, max_rows=max_rows)
+    workdir = tempfile.mkdtemp(prefix="migrate-check-")
+    problems: List[str] = []
+    try:
+        local = os.path.join(workdir, "airports.db")
+        shutil.copyfile(db_path, local)
+        base = [sys.executable, migrate, "--db", local, "--url", server.url, "--key", "check",
+                "--manifest", os.path.join(workdir, "manifest.db"), "--workers", str(workers)]
+
+        def step(name: str, *extra: str) -> None:
+            result = subprocess.run(base + list(extra), capture_output=True, text=True)
+            if result.returncode != 0:
+                problems.append(f"{name}: 退出码 {result.returncode}: {result.stderr.strip()[-500:]}")
+                return
+            problems.extend(state_problems(name, local, server))
+
+        step("--truncate", "--truncate")
+        conn = sqlite3.connect(local)
+        country = conn.execute("SELECT iso_country FROM airport WHERE iso_country IS NOT NULL "
+                               "GROUP BY iso_country ORDER BY COUNT(*) LIMIT 1").fetchone()
+        if country:
+            # 统计表由触发器维护，删除机场时随之删除该国家的 country_stats
+            conn.execute("DELETE FROM airport WHERE iso_country = ?", country)
+            conn.execute("DELETE FROM address WHERE country = ?", country)
+            conn.execute("DELETE FROM country_stats WHERE country_code = ?", country)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'route'").fetchone():
+            conn.execute("DELETE FROM route WHERE origin_airport_id = (SELECT MIN(origin_airport_id) FROM route)")
+        conn.commit()
+        conn.close()
+        step("--sync（删除）", "--sync")
+        step("--truncate（再次）", "--truncate")
+        if not server.stats["truncated"]:
+            problems.append(f"没有响应超过返回行数上限 {max_rows}，id 映射补查没有被检查到")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return problems
+
+
+def check_load(db_path: str, workers: int = 8, latency: float = 0.02, error_rate: float = 0.05,
+               max_body: int = 256 << 10, max_rows: Optional[int] = None) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    在有延迟、随机503（所有请求方法）和请求体上限的服务上，分别用 --workers 1 和 --workers N 做一次
+    --truncate 全量迁移：检查重试、413拆分和批量大小调整之后远端与本地仍一致，并记录两次的吞吐
+
+    返回行数上限默认不设（由 check_migrate 检查），否则按键补查 id 的串行请求会掩盖上传的并发效果。
+
+    Returns:
+        (不一致之处, 每次运行的 {"workers", "rows", "seconds", "upload_seconds", "requests", "errors", "too_large"})，
+        seconds 为进程总耗时，upload_seconds 为 migrate.py 报告的上传耗时（不含启动和生成计划）
+    """
+    migrate = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrate.py")
+    rows = sum(len(keys) for keys in local_state(db_path).values())
+    problems: List[str] = []
+    results: List[Dict[str, Any]] = []
+    for count in sorted({1, max(1, workers)}):
+        server = start_fake_server(latency=latency, error_rate=error_rate, max_body=max_body, max_rows=max_rows)
+        workdir = tempfile.mkdtemp(prefix="migrate-load-")
+        name = f"--workers {count}"
+        try:
+            local = os.path.join(workdir, "airports.db")
+            shutil.copyfile(db_path, local)
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, migrate, "--db", local, "--url", server.url, "--key", "check",
+                                     "--manifest", os.path.join(workdir, "manifest.db"), "--truncate",
+                                     "--workers", str(count)], capture_output=True, text=True)
+            seconds = time.perf_counter() - start
+            if result.returncode != 0:
+                problems.append(f"{name}: 退出码 {result.returncode}: {result.stderr.strip()[-500:]}")
+                continue
+            problems.extend(state_problems(name, local, server))
+            with server.lock:
+                stats = dict(server.stats)
+            if error_rate and not stats["errors"]:
+                problems.append(f"{name}: 没有请求收到503，重试没有被检查到")
+            if max_body and not stats["too_large"]:
+                problems.append(f"{name}: 没有请求超过请求体上限，413拆分没有被检查到")
+            upload = re.search(r"共迁移 \d+ 行，耗时 ([\d.]+) s", result.stdout)
+            results.append({"workers": count, "rows": rows, "seconds": seconds,
+                            "upload_seconds": float(upload.group(1)) if upload else seconds,
+                            "requests": stats["requests"], "errors": stats["errors"], "too_large": stats["too_large"]})
+        finally:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(workdir, ignore_errors=True)
+    return problems, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 PostgREST 服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8766, help="监听端口（默认: 8766）")
+    parser.add_argument("--latency", type=float, default=0.02, help="每个请求的固定耗时，秒（默认: 0.02）")
+    parser.add_argument("--row-latency", type=float, default=0.0001, help="每行的写入耗时，秒（默认: 0.0001）")
+    parser.add_argument("--connections", type=int, default=8, help="同时处理的请求数上限（默认: 8）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回503的比例（默认: 0）")
+    parser.add_argument("--max-body", type=int, default=None, help="请求体上限，字节，超过时返回413")
+    parser.add_argument("--max-rows", type=int, default=None, help="每个响应最多返回的行数（默认: 不限）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--check", type=str, default=None, metavar="DB",
+                        help="不启动服务，而是用该 airports.db 端到端检查 migrate.py 的 --truncate 和 --sync")
+    parser.add_argument("--check-load", type=str, default=None, metavar="DB",
+                        help="不启动服务，而是在有延迟、503和413的服务上检查 migrate.py 并对比单并发与多并发的吞吐")
+    parser.add_argument("--check-workers", type=int, default=8, help="--check-load 多并发时的 --workers（默认: 8）")
+    args = parser.parse_args()
+
+    if args.check_load:
+        problems, results = check_load(args.check_load, workers=args.check_workers)
+        print(f"{'workers':>7} {'行数':>8} {'总耗时':>8} {'上传耗时':>8} {'上传行/秒':>9} {'请求':>6} {'503':>5} {'413':>5}")
+        for r in results:
+            print(f"{r['workers']:>7} {r['rows']:>8} {r['seconds']:>7.1f}s {r['upload_seconds']:>7.1f}s "
+                  f"{r['rows'] / r['upload_seconds']:>9.0f} {r['requests']:>6} {r['errors']:>5} {r['too_large']:>5}")
+        if len(results) == 2:
+            print(f"--workers {results[1]['workers']} 相对 --workers 1: 上传加速 "
+                  f"{results[0]['upload_seconds'] / results[1]['upload_seconds']:.1f} 倍，"
+                  f"总耗时加速 {results[0]['seconds'] / results[1]['seconds']:.1f} 倍")
+        for problem in problems:
+            print(f"错误: {problem}")
+        if problems:
+            sys.exit(1)
+        print("重试、413拆分和批量大小调整之后远端与本地一致")
+        return
+
+    if args.check:
+        problems = check_migrate(args.check)
+        for problem in problems:
+            print(f"错误: {problem}")
+        if problems:
+            sys.exit(1)
+        print("migrate.py 的 --truncate 和带删除的 --sync 检查通过，远端与本地一致")
+        return
+
+    server = FakePostgrestServer((args.host, args.port), latency=args.latency, row_latency=args.row_latency,
+                                 connections=args.connections, error_rate=args.error_rate,
+                                 max_body=args.max_body, max_rows=args.max_rows, seed=args.seed)
+    print(f"模拟 PostgREST 服务已启动: {server.url}（统计: {server.url}/stats）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with server.lock:
+            print(json.dumps(server.stats, ensure_ascii=False))
+            print(json.dumps({name: len(rows) for name, rows in server.tables.items()}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+-- Migration: Add route edge table
+-- Date: 2026-10-17
+-- Description: One row per direct route, loaded from pipeline/route_graph.py,
+--              so airport pages can query routes instead of parsing airport.destinations
+
+CREATE TABLE route (
+    origin_airport_id INTEGER NOT NULL REFERENCES airport(id) ON DELETE CASCADE,
+    dest_airport_id INTEGER NOT NULL REFERENCES airport(id) ON DELETE CASCADE,
+    dest_city TEXT,
+    PRIMARY KEY (origin_airport_id, dest_airport_id)
+);
+
+CREATE INDEX idx_route_dest ON route(dest_airport_id, origin_airport_id);
@@ -4,6 +4,10 @@ export interface DestinationAirport {
   name: string;
   iata: string;
   icao: string;
+  latitude_deg?: number;
+  longitude_deg?: number;
+  distance_km?: number;
+  bearing_deg?: number;
 }
 
 export interface DestinationCity {
@@ -18,6 +22,30 @@ export interface Destinations {
     icao: string;
   };
   direct_flights: DestinationCity[];
+  route_stats?: RouteStats;
+}
+
+export interface RouteStats {
+  route_count: number;
+  unresolved_count: number;
+  longest_route: {
+    name: string;
+    iata: string;
+    icao: string;
+    distance_km: number;
+  } | null;
+  median_distance_km: number | null;
+  domestic_share: number | null;
+  international_share: number | null;
+  unknown_country_count?: number;
+}
+
+export interface Route {
+  dest_city: string | null;
+  airport: Pick<
+    Airport,
+    "id" | "ident" | "name" | "iata_code" | "icao_code" | "latitude_deg" | "longitude_deg" | "iso_country"
+  >;
 }
 
 export interface Airport {
@@ -249,6 +277,27 @@ export class AirportDatabase {
     };
   }
 
+  /**
+   * Get direct routes from an airport (route table, see migrations/002_add_route_table.sql)
+   */
+  async getRoutes(airportId: number): Promise<Route[]> {
+    const { data, error } = await this.client
+      .from("route")
+      .select(
+        "dest_city, airport:airport!route_dest_airport_id_fkey(id,ident,name,iata_code,icao_code,latitude_deg,longitude_deg,iso_country)",
+      )
+      .eq("origin_airport_id", airportId);
+
+    if (error) {
+      throw error;
+    }
+
+    return (data || []).map((row: any) => ({
+      dest_city: row.dest_city,
+      airport: row.airport,
+    }));
+  }
+
   /**
    * Get airports by country
    */